@@ -0,0 +1,62 @@
+"""
+Benchmark the fuzzy company search index against a synthetic NSE-sized universe.
+
+Usage:
+    python benchmarks/bench_search.py [--companies 5000] [--queries 2000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import make_names, search_queries  # noqa: E402
+from models.search_index import SearchIndex  # noqa: E402
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--companies", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = make_names(args.companies, rng)
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    for name in names:
+        index.add(name, rng.random())
+    index.warm()  # builds the lazily built fuzzy and ranking tables
+    build_ms = (time.perf_counter() - start) * 1000
+
+    queries = search_queries(names, args.queries, rng)
+
+    timings = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q, limit=5)
+        timings.append((time.perf_counter() - t0) * 1e6)
+
+    print(f"companies={len(names)} build={build_ms:.1f}ms")
+    print(
+        "search us: p50={:.1f} p90={:.1f} p99={:.1f} max={:.1f}".format(
+            percentile(timings, 0.5),
+            percentile(timings, 0.9),
+            percentile(timings, 0.99),
+            max(timings),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Measure cold start: import time of `agent` and time to the first answer.
+
+Each run starts a fresh interpreter that imports `agent` (which boots the
+stock service from an on-disk snapshot) and answers one routed query, so
+the numbers include everything a CLI or server start pays before it can
+reply. A synthetic snapshot is written to a temporary assets directory,
+so no network access or real market data is needed. One extra run with
+`python -X importtime` breaks the import down by the modules `agent`
+imports directly.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--companies 2000] [--top 15]
+        [--json results.json]
+"""
+import os
+import sys
+import json
+import tempfile
+import argparse
+import statistics
+import subprocess
+import time
+from typing import Any, Dict, List, Tuple
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import table_html  # noqa: E402
+from models.snapshot_file import write_snapshot  # noqa: E402
+from services.scraper.streaming_table_parser import StreamingTableParser  # noqa: E402
+
+CHILD = """
+import time
+t0 = time.perf_counter()
+import sys, json
+sys.path.insert(0, {src!r})
+import agent
+t1 = time.perf_counter()
+answer = agent.sa.answer_directly({query!r})
+t2 = time.perf_counter()
+# What the first model-backed question pays on top
+import langchain.chat_models, langgraph.prebuilt
+t3 = time.perf_counter()
+print(json.dumps({{
+    "import_s": t1 - t0,
+    "first_answer_s": t2 - t1,
+    "deferred_imports_s": t3 - t2,
+    "rows": len(agent.stock_service.snapshot),
+    "answered": answer is not None,
+}}))
+"""
+
+
+def write_assets(assets_dir: str, companies: int):
+    """A snapshot shaped like a real refresh, without the URL column (no scraping)."""
+    data = StreamingTableParser("https://example.com/").parse(table_html(companies, seed=5))
+    url = data[0].index("URL")
+    header = [c for i, c in enumerate(data[0]) if i != url]
+    rows = [[c for i, c in enumerate(r) if i != url] for r in data[1:]]
+    write_snapshot(os.path.join(assets_dir, "market.snap"), header, rows)
+
+
+def run_child(env: Dict[str, str], query: str) -> Tuple[float, Dict[str, Any]]:
+    t0 = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(src=SRC, query=query)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - t0
+    return wall, json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_breakdown(env: Dict[str, str]) -> List[Tuple[str, float]]:
+    """Cumulative import time (s) of each module `agent` imports directly."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import agent"],
+        env=env,
+        cwd=SRC,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    children: List[Tuple[str, float]] = []
+    pending: List[Tuple[str, float]] = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        # One space after the bar, then two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        module = name.strip()
+        if depth == 0:
+            if module == "agent":
+                children = pending
+            pending = []
+        elif depth == 1:
+            pending.append((module, int(cumulative) / 1e6))
+    return sorted(children, key=lambda c: -c[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--companies", type=int, default=2000)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--query", default="company 12")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as assets_dir:
+        write_assets(assets_dir, args.companies)
+        env = dict(os.environ, STOCK_AGENT_ASSETS_DIR=assets_dir)
+        run_child(env, args.query)  # warm the bytecode and OS file caches
+        runs = [run_child(env, args.query) for _ in range(args.runs)]
+        breakdown = import_breakdown(env)
+
+    # The child imports LangChain after answering; that is not part of startup
+    walls = [w - r["deferred_imports_s"] for w, r in runs]
+    results = {
+        "runs": args.runs,
+        "companies": args.companies,
+        "rows_loaded": runs[-1][1]["rows"],
+        "answered": all(r["answered"] for _, r in runs),
+    }
+    for key in ("import_s", "first_answer_s", "deferred_imports_s"):
+        results[key] = statistics.median(r[key] for _, r in runs)
+    results["process_to_answer_s"] = statistics.median(walls)
+    results["import_breakdown_s"] = dict(breakdown[: args.top])
+
+    print(f"{args.runs} cold starts, {results['rows_loaded']} rows in the snapshot (median):")
+    print(f"  import agent (incl. snapshot boot): {results['import_s'] * 1000:8.1f} ms")
+    print(f"  first routed answer:                {results['first_answer_s'] * 1000:8.1f} ms")
+    print(f"  process start to first answer:      {results['process_to_answer_s'] * 1000:8.1f} ms")
+    print(f"  deferred LangChain/LangGraph:       {results['deferred_imports_s'] * 1000:8.1f} ms")
+    print("Slowest direct imports of agent (cumulative, one -X importtime run):")
+    for module, seconds in breakdown[: args.top]:
+        print(f"  {module:45s} {seconds * 1000:8.1f} ms")
+    if not results["answered"]:
+        print(f"warning: {args.query!r} was not answered without the model")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Check parity between the streaming lxml table parser and the BeautifulSoup
+reference parser on a saved Moneycontrol-shaped page, then time both.
+
+Usage:
+    python benchmarks/bench_table_parse.py [--fixture PATH] [--rounds 20]
+
+Exits non-zero if the two parsers disagree.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.scraper.moneycontrol_scraper import MoneyControlScraper  # noqa: E402
+from services.scraper.streaming_table_parser import StreamingTableParser  # noqa: E402
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "moneycontrol_table.html")
+BASE_URL = "https://www.moneycontrol.com/markets/indian-indices/"
+
+
+def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def best_of(fn, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.fixture, "rb") as f:
+        html = f.read()
+
+    scraper = MoneyControlScraper(url=BASE_URL)
+    streaming = StreamingTableParser(BASE_URL)
+
+    expected = scraper.parse_with_bs4(html)
+    actual = list(streaming.iter_rows(chunked(html, MoneyControlScraper.CHUNK_SIZE)))
+    if expected != actual:
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            if a != b:
+                print(f"row {i} differs:\n  bs4:  {a}\n  lxml: {b}")
+                break
+        print(f"PARITY FAILED: bs4={len(expected)} rows, lxml={len(actual)} rows")
+        sys.exit(1)
+    print(f"parity ok: {len(actual)} rows ({len(html) / 1024:.0f} KiB page)")
+
+    bs4_ms = best_of(lambda: scraper.parse_with_bs4(html), args.rounds)
+    lxml_ms = best_of(
+        lambda: list(streaming.iter_rows(chunked(html, MoneyControlScraper.CHUNK_SIZE))),
+        args.rounds,
+    )
+    print(f"bs4 html.parser: {bs4_ms:.2f} ms")
+    print(f"lxml streaming:  {lxml_ms:.2f} ms ({bs4_ms / lxml_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+A local HTTP server standing in for Moneycontrol in benchmarks.
+
+Serves the index change tables (with ETag validation, like the real site,
+unless the URL asks for `validators=0`)
+and company pages as crawl4ai-style markdown, optionally after a fixed
+delay per request.
+
+Usage:
+    python benchmarks/fake_server.py [--port 8765] [--companies 2000]
+"""
+import time
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+from fixtures import company_page, table_html
+
+TABLE_PATH = "/markets/indian-indices/changeTableData"
+COMPANY_PREFIX = "/india/stockpricequote/"
+
+
+class FakeMoneycontrol:
+    """Serves synthetic change tables and company pages on localhost."""
+
+    def __init__(
+        self,
+        companies: int = 2000,
+        names: Optional[Sequence[str]] = None,
+        latency: float = 0.0,
+        port: int = 0,
+    ):
+        self.companies = companies
+        self.names = names
+        self.latency = latency
+        self.requests = 0
+        self._tables: Dict[int, bytes] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def table_url(self, index_id: int = 136, validators: bool = True) -> str:
+        """The change table URL; without `validators` every fetch is a full one."""
+        url = f"{self.base_url}{TABLE_PATH}?exName=N&indicesID={index_id}"
+        return url if validators else url + "&validators=0"
+
+    def table(self, index_id: int) -> bytes:
+        with self._lock:
+            if index_id not in self._tables:
+                html = table_html(self.companies, seed=index_id, names=self.names)
+                self._tables[index_id] = html.encode("utf-8")
+            return self._tables[index_id]
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str, etag: str = ""):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                with fake._lock:
+                    fake.requests += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                url = urlparse(self.path)
+                if url.path == TABLE_PATH:
+                    query = parse_qs(url.query)
+                    body = fake.table(int(query.get("indicesID", ["136"])[0]))
+                    etag = ""
+                    if query.get("validators") != ["0"]:
+                        etag = '"%s"' % hashlib.md5(body).hexdigest()
+                    if etag and self.headers.get("If-None-Match") == etag:
+                        self._send(304, b"", "text/html", etag)
+                    else:
+                        self._send(200, body, "text/html; charset=utf-8", etag)
+                elif url.path.startswith(COMPANY_PREFIX):
+                    # .../company<i>/C<i>
+                    i = int(url.path.rstrip("/").rsplit("/C", 1)[-1])
+                    self._send(200, company_page(i).encode("utf-8"), "text/markdown; charset=utf-8")
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+        return Handler
+
+    def start(self) -> "FakeMoneycontrol":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-moneycontrol", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeMoneycontrol":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--companies", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with FakeMoneycontrol(args.companies, latency=args.latency, port=args.port) as server:
+        print(f"Serving {server.table_url()} (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
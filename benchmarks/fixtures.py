@@ -0,0 +1,121 @@
+"""Synthetic data generators shared by the benchmarks."""
+import random
+from typing import List, Optional, Sequence
+
+TABLE_COLUMNS = ["Name", "LTP", "%Chg", "Chg", "High", "Low", "Volume", "Value (Rs. Cr.)"]
+
+WORDS = [
+    "tata", "reliance", "hdfc", "icici", "bank", "infosys", "motors", "steel",
+    "power", "industries", "finance", "capital", "pharma", "chemicals", "cement",
+    "textiles", "energy", "housing", "insurance", "life", "general", "auto",
+    "electric", "engineering", "ports", "airways", "foods", "consumer", "tech",
+    "systems", "solutions", "infra", "projects", "realty", "metals", "mining",
+    "paints", "tyres", "labs", "healthcare", "hospitals", "bharat", "hindustan",
+    "indian", "national", "adani", "bajaj", "mahindra", "larsen", "toubro",
+]
+
+SYLLABLES = ["ka", "ra", "vi", "sh", "an", "tr", "mo", "li", "de", "su", "pa", "ni", "go", "ve", "cho"]
+
+
+def make_names(n: int, rng: random.Random) -> List[str]:
+    """Names shaped like the NSE list: a distinctive brand plus common words."""
+    names = set()
+    while len(names) < n:
+        brand = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        words = [brand] + rng.sample(WORDS, rng.randint(0, 2))
+        suffix = rng.choice(["", " ltd"])
+        names.add(" ".join(words) + suffix)
+    return sorted(names)
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    i = rng.randrange(len(word))
+    return word[:i] + word[i + 1:]
+
+
+def search_queries(names: Sequence[str], n: int, rng: random.Random) -> List[str]:
+    """An even mix of exact words, prefixes and one-letter typos from `names`."""
+    queries = []
+    for _ in range(n):
+        word = rng.choice(rng.choice(names).split())
+        kind = rng.choice(["exact", "prefix", "typo"])
+        if kind == "prefix":
+            word = word[: max(1, len(word) // 2)]
+        elif kind == "typo":
+            word = misspell(word, rng)
+        queries.append(word)
+    return queries
+
+
+def table_html(rows: int, seed: int = 7, names: Optional[Sequence[str]] = None) -> str:
+    """
+    A page shaped like Moneycontrol's change table, with surrounding noise.
+    Companies are called "Company <i> Ltd" unless `names` is given.
+    """
+    rng = random.Random(seed)
+    out: List[str] = [
+        "<!DOCTYPE html><html><head><title>Market Terminal</title>",
+        "<script>var config = {a: 1, b: '<table>'};</script></head><body>",
+        "<div class='nav'><ul>" + "".join(f"<li><a href='/m/{i}'>Menu {i}</a></li>" for i in range(40)) + "</ul></div>",
+        "<div class='tbl'><table class='mctable1'><thead><tr>",
+    ]
+    out.extend(f"<th><span>{c}</span></th>" for c in TABLE_COLUMNS)
+    out.append("</tr></thead><tbody>")
+    for i in range(rows):
+        name = names[i] if names is not None else f"Company {i} Ltd"
+        title = names[i] if names is not None else f"Company {i}"
+        ltp = rng.uniform(10, 5000)
+        chg = rng.uniform(-5, 5)
+        out.append(
+            "<tr>"
+            f"<td class='name'><a href='/india/stockpricequote/sector/company{i}/C{i:04d}' title='{title}'>"
+            f"<b>{name}</b></a><span class='sm'> NSE</span></td>"
+            f"<td>{ltp:,.2f}</td><td>{chg:.2f}</td><td>{ltp * chg / 100:.2f}</td>"
+            f"<td>{ltp * 1.02:,.2f}</td><td>{ltp * 0.98:,.2f}</td>"
+            f"<td>{rng.randint(1000, 5_000_000):,}</td><td>{rng.uniform(0.1, 900):.2f}</td>"
+            "</tr>\n"
+        )
+    out.append("</tbody></table></div>")
+    out.append("<div class='footer'>" + "<p>Disclaimer text.</p>" * 200 + "</div>")
+    out.append("<table><tbody><tr><td>Second table</td></tr></tbody></table></body></html>")
+    return "".join(out)
+
+
+def company_page(i: int, seed: int = 7) -> str:
+    """A company page as crawl4ai markdown: navigation, prose and a fundamentals table."""
+    rng = random.Random(seed * 100_003 + i)
+    low = rng.uniform(10, 4000)
+    lines = [
+        "[Home](/) > [Markets](/markets) > [Stocks](/stocks)",
+        f"# Company {i} Ltd",
+        f"Company {i} Ltd is an Indian company with interests in "
+        + ", ".join(rng.sample(WORDS, 4))
+        + ". It was incorporated in "
+        + str(rng.randint(1950, 2015))
+        + " and is listed on the NSE and BSE.",
+        "| Metric | Value |",
+        "|---|---|",
+        f"| Market Cap (Rs Cr.) | {rng.uniform(100, 900_000):,.2f} |",
+        f"| P/E | {rng.uniform(5, 90):.2f} |",
+        f"| Industry P/E | {rng.uniform(10, 60):.2f} |",
+        f"| Book Value (Rs) | {rng.uniform(10, 900):.2f} |",
+        f"| Dividend Yield (%) | {rng.uniform(0, 6):.2f} |",
+        f"| Face Value (Rs) | {rng.choice([1, 2, 5, 10])} |",
+        f"| EPS (TTM) | {rng.uniform(-20, 200):.2f} |",
+        f"| 52 Week High | {low * rng.uniform(1.1, 2.5):,.2f} |",
+        f"| 52 Week Low | {low:,.2f} |",
+    ]
+    # The rest of a real page: news, peers and footer links
+    lines.extend(f"- [{rng.choice(WORDS).title()} news item {j}](/news/{j})" for j in range(150))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import os
+
+    path = os.path.join(os.path.dirname(__file__), "fixtures", "moneycontrol_table.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(table_html(500))
+    print("Wrote", path)
@@ -0,0 +1,192 @@
+"""
+Load-test the ASGI server with a local fake chat model.
+
+The fake model answers every question by calling get_stock_data with it
+and then summarising the tool output, so each request runs the real graph,
+tool and search path without any LLM call. The query mix includes plain
+lookups and screens that the pre-router answers without the model. The
+stock service is loaded with a synthetic table that has no URL column, so
+no detail pages are scraped either.
+
+Usage:
+    python benchmarks/load_test.py [--requests 500] [--concurrency 32]
+        [--sessions 50] [--companies 2000] [--model-latency 0.05] [--http]
+
+By default requests go through httpx's in-process ASGI transport; --http
+serves the app with uvicorn on a local port and load-tests it over TCP.
+"""
+import os
+import sys
+import time
+import uuid
+import socket
+import asyncio
+import argparse
+import statistics
+from typing import Any, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import httpx  # noqa: E402
+from langchain_core.language_models.chat_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+
+import agent as stock_agent  # noqa: E402
+from fixtures import table_html  # noqa: E402
+from server import create_app  # noqa: E402
+from services.scraper.streaming_table_parser import StreamingTableParser  # noqa: E402
+
+QUERIES = ["company 1", "how is company 42 doing", "compny 7", "top 5 gainers", "co", "company 12"]
+
+
+class FakeStockChatModel(BaseChatModel):
+    """Calls get_stock_data for the user's question, then echoes the result."""
+
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-stock"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeStockChatModel":
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> ChatResult:
+        last = messages[-1]
+        if isinstance(last, HumanMessage):
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "get_stock_data",
+                        "args": {"company_name": str(last.content)},
+                        "id": uuid.uuid4().hex,
+                    }
+                ],
+            )
+        else:
+            message = AIMessage(content=f"Here is what I found:\n{str(last.content)[:300]}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._reply(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._reply(messages)
+
+
+def load_synthetic_table(companies: int):
+    data = StreamingTableParser("https://example.com/").parse(table_html(companies, seed=3))
+    url = data[0].index("URL")
+    header = [c for i, c in enumerate(data[0]) if i != url]
+    rows = [[c for i, c in enumerate(r) if i != url] for r in data[1:]]
+    stock_agent.stock_service.load_rows(header, rows)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_load(client: httpx.AsyncClient, requests: int, concurrency: int, sessions: int):
+    latencies: List[float] = []
+    statuses: dict = {}
+    errors = 0
+    next_request = 0
+
+    async def worker():
+        nonlocal next_request, errors
+        while next_request < requests:
+            i = next_request
+            next_request += 1
+            body = {"message": QUERIES[i % len(QUERIES)], "session_id": f"load-{i % sessions}"}
+            t0 = time.perf_counter()
+            response = await client.post("/chat", json=body)
+            latencies.append(time.perf_counter() - t0)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 200 and '"type": "done"' not in response.text:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    ms = [x * 1000 for x in latencies]
+    print(f"{requests} requests, concurrency {concurrency}, {sessions} sessions")
+    print(f"throughput: {requests / elapsed:.1f} req/s ({elapsed:.2f} s)")
+    print(
+        f"latency ms: p50 {percentile(ms, 50):.1f}  p95 {percentile(ms, 95):.1f}  "
+        f"p99 {percentile(ms, 99):.1f}  mean {statistics.mean(ms):.1f}"
+    )
+    print(f"status codes: {statuses}; streams without 'done': {errors}")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main_async(args):
+    model = FakeStockChatModel(latency=args.model_latency)
+    app = create_app(
+        graph=stock_agent.build_agent(model=model),
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        refresh=False,
+    )
+    server: Optional[Any] = None
+    if args.http:
+        import uvicorn
+
+        port = free_port()
+        server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+        serve = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        client = httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}",
+            timeout=60,
+            limits=httpx.Limits(max_connections=args.concurrency),
+        )
+    else:
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60
+        )
+
+    async with client:
+        await run_load(client, args.warmup, min(args.concurrency, args.warmup or 1), args.sessions)
+        print("--- measured run ---")
+        await run_load(client, args.requests, args.concurrency, args.sessions)
+
+    if server is not None:
+        server.should_exit = True
+        await serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--companies", type=int, default=2000)
+    parser.add_argument("--model-latency", type=float, default=0.0,
+                        help="simulated seconds per fake model call")
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--http", action="store_true", help="serve over TCP with uvicorn")
+    args = parser.parse_args()
+
+    load_synthetic_table(args.companies)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Benchmark suite for the hot paths, with saved baselines.
+
+Cases, all on synthetic data (those marked * run at every --companies size):
+  trie_autocomplete *  CompactTrie.autocomplete (ranked) on company-name prefixes
+  find_matches *       StockServiceImpl.find_matches: trie, then fuzzy search
+  load_csv *           StockServiceImpl._load_csv: full rebuild from the CSV export
+  boot_snapshot *      StockServiceImpl._load_snapshot_file: memory-mapped boot
+  table_parse *        StreamingTableParser on a Moneycontrol-shaped page
+  stock_from_dict      Stock.from_dict for one table row, without scraping
+  table_scrape         MoneyControlScraper.scrape from a local fake server
+  table_scrape_304     the same with an unchanged table (ETag revalidation)
+  get_stock_data_cold  StockAgent.get_stock_data, detail pages from the fake
+                       server through the scrape scheduler; caches cleared
+  get_stock_data_warm  the same with the detail pages already cached
+
+Each case reports per-operation latency percentiles, throughput and the
+peak traced memory of its setup plus a few operations. --save writes the
+results as a baseline; --compare prints the change against one and exits
+non-zero if any case got slower or bigger by more than --threshold.
+Every case is timed --repeat times and the fastest pass is kept, to damp
+run-to-run noise; on a busy machine raise --repeat or --threshold.
+
+Usage:
+    python benchmarks/suite.py [--companies 5000,20000,100000] [--only find_matches,load_csv]
+        [--save baseline.json] [--compare baseline.json] [--threshold 0.15]
+"""
+import gc
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import tempfile
+import importlib
+import tracemalloc
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import requests  # noqa: E402
+
+from fake_server import FakeMoneycontrol  # noqa: E402
+from fixtures import make_names, search_queries, table_html  # noqa: E402
+from models.company_profile import CompanyProfile  # noqa: E402
+from models.snapshot_file import write_snapshot  # noqa: E402
+from models.stock import Stock  # noqa: E402
+from models.compact_trie import CompactTrie  # noqa: E402
+from services.scraper.csv_writer import CsvDataWriter  # noqa: E402
+from services.scraper.moneycontrol_scraper import MoneyControlScraper  # noqa: E402
+from services.scraper.streaming_table_parser import StreamingTableParser  # noqa: E402
+from services.stock_service_impl import StockServiceImpl  # noqa: E402
+from utils.content_cache import ContentCache  # noqa: E402
+from utils.scrape_scheduler import ScrapeScheduler  # noqa: E402
+
+BASE_URL = "https://www.moneycontrol.com/"
+# Operations replayed under tracemalloc to measure peak memory
+MEMORY_OPS = 20
+# (metric, True if higher is better) compared against a baseline
+COMPARED = [("p50_ms", False), ("p95_ms", False), ("ops_per_s", True), ("peak_mb", False)]
+
+Op = Callable[[int], Any]
+
+
+class Case:
+    """A named hot path: `setup()` prepares the data and returns one operation."""
+
+    def __init__(self, name: str, setup: Callable[[], Op], ops: int):
+        self.name = name
+        self.setup = setup
+        self.ops = ops
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+@lru_cache(maxsize=None)
+def names_for(companies: int) -> Tuple[str, ...]:
+    return tuple(make_names(companies, random.Random(7)))
+
+
+@lru_cache(maxsize=None)
+def page_for(companies: int) -> bytes:
+    return table_html(companies, names=names_for(companies)).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def table_for(companies: int, base_url: str = BASE_URL) -> Tuple[List[str], List[List[str]]]:
+    data = StreamingTableParser(base_url).parse(page_for(companies))
+    return data[0], data[1:]
+
+
+def queries_for(companies: int, n: int = 2000) -> List[str]:
+    return search_queries(names_for(companies), n, random.Random(11))
+
+
+def case_trie_autocomplete(companies: int) -> Op:
+    rng = random.Random(3)
+    scores = {name.lower(): rng.random() for name in names_for(companies)}
+    trie = CompactTrie.build(scores, scores)
+    prefixes = [name.lower()[: rng.randint(1, 6)] for name in rng.sample(names_for(companies), 500)]
+    return lambda i: trie.autocomplete(prefixes[i % len(prefixes)], limit=5, ranked=True)
+
+
+def _service(workdir: str, companies: int) -> StockServiceImpl:
+    assets = os.path.join(workdir, f"assets-{companies}")
+    os.makedirs(assets, exist_ok=True)
+    return StockServiceImpl(assets_dir=assets)
+
+
+def case_find_matches(workdir: str, companies: int) -> Op:
+    service = _service(workdir, companies)
+    service.load_rows(*table_for(companies))
+    queries = queries_for(companies)
+    return lambda i: service.find_matches(queries[i % len(queries)], limit=5)
+
+
+def case_load_csv(workdir: str, companies: int) -> Op:
+    service = _service(workdir, companies)
+    header, rows = table_for(companies)
+    CsvDataWriter().write_data([header] + rows, service.csv_path)
+    return lambda i: service._load_csv()
+
+
+def case_boot_snapshot(workdir: str, companies: int) -> Op:
+    service = _service(workdir, companies)
+    header, rows = table_for(companies)
+    write_snapshot(service.snapshot_path, header, rows)
+    return lambda i: service._load_snapshot_file()
+
+
+def case_table_parse(companies: int) -> Op:
+    page = page_for(companies)
+    chunk = MoneyControlScraper.CHUNK_SIZE
+    chunks = [page[i : i + chunk] for i in range(0, len(page), chunk)]
+    return lambda i: list(StreamingTableParser(BASE_URL).iter_rows(chunks))
+
+
+def case_stock_from_dict(companies: int) -> Op:
+    header, rows = table_for(companies)
+    dicts = [dict(zip(header, row)) for row in rows[:2000]]
+    return lambda i: Stock.from_dict(dicts[i % len(dicts)], lazy=True)
+
+
+def case_table_scrape(server: FakeMoneycontrol, revalidate: bool) -> Op:
+    # One scraper, as in a refresh loop; without validators every fetch is full
+    scraper = MoneyControlScraper(url=server.table_url(validators=revalidate))
+    scraper.scrape()
+    return lambda i: scraper.scrape()
+
+
+def _http_fetch(session: requests.Session):
+    """A ScrapeScheduler fetch function that GETs pages instead of driving a browser."""
+
+    async def fetch(url: str, timeout: float) -> Any:
+        def get() -> str:
+            response = session.get(url, timeout=timeout)
+            response.raise_for_status()
+            return response.text
+
+        async def load() -> str:
+            return CompanyProfile.from_markdown(await asyncio.to_thread(get)).dumps()
+
+        return await ContentCache.instance().fetch(url, load)
+
+    return fetch
+
+
+@lru_cache(maxsize=None)
+def agent_for(workdir: str, server: FakeMoneycontrol, companies: int):
+    """The module-level StockAgent, booted empty and loaded with the fake server's table."""
+    os.environ["STOCK_AGENT_ASSETS_DIR"] = os.path.join(workdir, "agent-assets")
+    os.makedirs(os.environ["STOCK_AGENT_ASSETS_DIR"], exist_ok=True)
+    agent = importlib.import_module("agent")
+    agent.sa.stock_service.load_rows(*table_for(companies, server.base_url + "/"))
+    ScrapeScheduler.configure(fetch=_http_fetch(requests.Session()), domain_interval=0)
+    return agent.sa
+
+
+def case_get_stock_data(workdir: str, server: FakeMoneycontrol, companies: int, cold: bool) -> Op:
+    sa = agent_for(workdir, server, companies)
+    queries = [name.lower() for name in random.Random(5).sample(names_for(companies), 200)]
+    if not cold:
+        # A small working set whose pages are all fetched before timing starts
+        queries = queries[:20]
+        for q in queries:
+            sa.get_stock_data(q)
+
+    def op(i: int):
+        sa.result_cache.clear()
+        if cold:
+            ContentCache.configure()
+        answer = sa.get_stock_data(queries[i % len(queries)])
+        if "unavailable" in answer:
+            raise RuntimeError("A detail page was not fetched:\n" + answer)
+
+    return op
+
+
+def build_cases(workdir: str, sizes: Sequence[int], server: FakeMoneycontrol) -> List[Case]:
+    cases: List[Case] = []
+    for n in sizes:
+        cases += [
+            Case(f"trie_autocomplete[{n}]", lambda n=n: case_trie_autocomplete(n), 2000),
+            Case(f"find_matches[{n}]", lambda n=n: case_find_matches(workdir, n), 2000),
+            Case(f"load_csv[{n}]", lambda n=n: case_load_csv(workdir, n), 5),
+            Case(f"boot_snapshot[{n}]", lambda n=n: case_boot_snapshot(workdir, n), 10),
+            Case(f"table_parse[{n}]", lambda n=n: case_table_parse(n), 5),
+        ]
+    small = server.companies
+    cases += [
+        Case("stock_from_dict", lambda: case_stock_from_dict(small), 20000),
+        Case("table_scrape", lambda: case_table_scrape(server, revalidate=False), 20),
+        Case("table_scrape_304", lambda: case_table_scrape(server, revalidate=True), 200),
+        Case("get_stock_data_cold", lambda: case_get_stock_data(workdir, server, small, True), 30),
+        Case("get_stock_data_warm", lambda: case_get_stock_data(workdir, server, small, False), 200),
+    ]
+    return cases
+
+
+def run_case(case: Case, repeat: int = 3) -> Dict[str, float]:
+    """Time `case.ops` operations `repeat` times and keep the fastest pass."""
+    op = case.setup()
+    op(0)  # warm up
+    best: Tuple[float, List[float]] = (float("inf"), [])
+    for _ in range(repeat):
+        timings = []
+        started = time.perf_counter()
+        for i in range(case.ops):
+            t0 = time.perf_counter()
+            op(i)
+            timings.append(time.perf_counter() - t0)
+        best = min(best, (time.perf_counter() - started, timings), key=lambda b: b[0])
+    elapsed, timings = best
+
+    # Memory is measured in a second pass; tracing would skew the timings
+    gc.collect()
+    tracemalloc.start()
+    op = case.setup()
+    for i in range(min(case.ops, MEMORY_OPS)):
+        op(i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ms = [t * 1000 for t in timings]
+    return {
+        "ops": case.ops,
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "mean_ms": sum(ms) / len(ms),
+        "ops_per_s": case.ops / elapsed,
+        "peak_mb": peak / 2**20,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Print each case against the baseline; return the regressed metrics."""
+    regressions = []
+    print(f"\nAgainst baseline (regression threshold {threshold:.0%}):")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"  {name}: not in the baseline")
+            continue
+        cells = []
+        for metric, higher_is_better in COMPARED:
+            if not base.get(metric):
+                continue
+            change = current[metric] / base[metric] - 1
+            worse = -change if higher_is_better else change
+            flag = " !" if worse > threshold else ""
+            if flag:
+                regressions.append(f"{name} {metric}")
+            cells.append(f"{metric} {change:+.0%}{flag}")
+        print(f"  {name:28s} " + "  ".join(cells))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", default="5000",
+                        help="comma-separated universe sizes for the search and load cases")
+    parser.add_argument("--only", default="", help="comma-separated case name prefixes to run")
+    parser.add_argument("--save", help="write the results to this baseline file")
+    parser.add_argument("--compare", help="compare against this baseline file")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed passes per case; the fastest is reported")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative change that counts as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.companies.split(",") if s.strip()]
+    only = [p for p in args.only.split(",") if p]
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as workdir, FakeMoneycontrol(min(sizes)) as server:
+        cases = [c for c in build_cases(workdir, sizes, server)
+                 if not only or any(c.name.startswith(p) for p in only)]
+        print(f"{'case':28s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'ops/s':>10s} {'peak MB':>8s}")
+        try:
+            for case in cases:
+                r = results[case.name] = run_case(case, args.repeat)
+                print(
+                    f"{case.name:28s} {r['p50_ms']:9.3f} {r['p95_ms']:9.3f} {r['p99_ms']:9.3f} "
+                    f"{r['ops_per_s']:10.1f} {r['peak_mb']:8.1f}"
+                )
+        finally:
+            Stock.shutdown_executor()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "meta": {
+                        "python": platform.python_version(),
+                        "machine": platform.machine(),
+                        "companies": sizes,
+                        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("Regressed: " + ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
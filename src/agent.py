@@ -1,26 +1,31 @@
 import os
-import csv
+import asyncio
 import sys
 import logging
-import json
-from typing import List, Dict, Optional, Any
-from langchain_core.messages import AIMessage
-from langchain_core.runnables.config import RunnableConfig
+import time
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Dict, Optional, Any, Sequence, Tuple
 
-from services.stock_service import StockService
 from services.stock_service_impl import StockServiceImpl
+from services.tick_store import TickStore
+from services.query_router import QueryRouter, RoutedCall, normalize_query
 from models.stock import Stock
-from models.trie import Trie
-from services.scraper.scraping_service import ScrapingService
-from services.scraper.moneycontrol_scraper import MoneyControlScraper
-from services.scraper.csv_writer import CsvDataWriter
-from langgraph.prebuilt import create_react_agent
-from langchain.chat_models import init_chat_model
-from langgraph.checkpoint.memory import InMemorySaver
-from langchain_core.tools import tool
+from utils.content_cache import ContentCache
+from utils.metrics import Metrics, timed
+from utils.result_cache import ResultCache
+from utils.scrape_scheduler import ScrapeScheduler
 
 from dotenv import load_dotenv
 
+# LangChain, LangGraph, the scrapers and crawl4ai are imported on first use,
+# so the CLI and server can answer from the on-disk snapshot straight away.
+if TYPE_CHECKING:
+    from langchain_core.runnables.config import RunnableConfig
+    from langgraph.checkpoint.memory import InMemorySaver
+    from services.scraper.refresh_scheduler import RefreshScheduler
+    from services.scraper.scraping_service import ScrapingService
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -29,48 +34,277 @@ class StockAgent:
     def __init__(
         self,
         stock_service: StockServiceImpl,
+        tick_store: Optional[TickStore] = None,
+        detail_timeout: float = 20.0,
+        result_cache: Optional[ResultCache] = None,
     ):
         self.stock_service = stock_service
-        self.scraping_service = ScrapingService(
-            scraper=MoneyControlScraper(), data_writer=CsvDataWriter()
+        # Overall deadline for the detail pages of one get_stock_data call
+        self.detail_timeout = detail_timeout
+        # Price history of every refresh, partitioned by day
+        self.tick_store = tick_store or TickStore(
+            os.path.join(self.stock_service.assets_dir, "ticks")
+        )
+        # Answers exact lookups and known screens without the model
+        self.router = QueryRouter(self.stock_service)
+        # Rendered tool results, invalidated by every new snapshot
+        self.result_cache = result_cache or ResultCache()
+        # Built on first refresh; see `refresh_scheduler`
+        self._refresh_scheduler: Optional["RefreshScheduler"] = None
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def refresh_scheduler(self) -> "RefreshScheduler":
+        """The market refresh loop, built (with its scrapers) on first use."""
+        with self._refresh_lock:
+            if self._refresh_scheduler is None:
+                self._refresh_scheduler = self._build_refresh_scheduler()
+            return self._refresh_scheduler
+
+    @property
+    def scraping_service(self) -> "ScrapingService":
+        return self.refresh_scheduler.scraping_service
+
+    def _build_refresh_scheduler(self) -> "RefreshScheduler":
+        from services.scraper.binary_snapshot_writer import BinarySnapshotWriter
+        from services.scraper.multi_index_scraper import MultiIndexScraper
+        from services.scraper.refresh_scheduler import RefreshScheduler
+        from services.scraper.scraping_service import ScrapingService
+
+        # Comma-separated Moneycontrol index IDs to merge into one snapshot
+        index_ids = [
+            int(i)
+            for i in os.environ.get("MONEYCONTROL_INDEX_IDS", "136").split(",")
+            if i.strip()
+        ]
+        scraping_service = ScrapingService(
+            scraper=MultiIndexScraper.from_index_ids(index_ids),
+            data_writer=BinarySnapshotWriter(
+                rank_by=self.stock_service.rank_by,
+                csv_export_path=self.stock_service.csv_path,
+            ),
+            # Refreshed rows go straight into the stock service; the snapshot
+            # file is only written behind it for the next startup.
+            sinks=[self.stock_service, self.tick_store],
         )
+        return RefreshScheduler(
+            scraping_service,
+            output_filename=self.stock_service.snapshot_path,
+        )
+
+    def start_background_refresh(self):
+        """Keep serving the loaded snapshot while a refresh runs in the background."""
+        self.refresh_scheduler.start()
+        self.refresh_scheduler.request_refresh()
+
+    def shutdown(self):
+        """Stop the refresh loop, flush pending writes and close the browser."""
+        with self._refresh_lock:
+            scheduler = self._refresh_scheduler
+        if scheduler is not None:
+            scheduler.stop()
+            scheduler.scraping_service.close()
+            # Releases the pooled HTTP session of the table scrapers
+            close_scraper = getattr(scheduler.scraping_service.scraper, "close", None)
+            if close_scraper is not None:
+                close_scraper()
+        self.tick_store.close()
+        try:
+            Stock.shutdown_executor()
+        except Exception:
+            logger.exception("Error shutting down executor")
+
+    def _cached(self, key: Tuple[Any, ...]) -> Tuple[int, Optional[str]]:
+        version = self.stock_service.snapshot.version
+        return version, self.result_cache.get(key, version)
+
+    def _remember(
+        self, key: Tuple[Any, ...], version: int, answer: str, rows: Sequence[Stock] = ()
+    ) -> str:
+        # Results missing a detail page are not cached, so a later call retries it
+        if all(s.details_ready() for s in rows):
+            self.result_cache.put(key, version, answer)
+        return answer
 
     def get_stock_data(self, company_name: str) -> str:
+        key = ("get_stock_data", normalize_query(company_name))
+        version, cached = self._cached(key)
+        if cached is not None:
+            return cached
         rows = self.stock_service.find_matches(company_name, limit=5)
+        # Every match is rendered with its details, so scrape them concurrently
+        Stock.prefetch(rows)
+        answer = self._render_matches(rows, time.monotonic() + self.detail_timeout)
+        return self._remember(key, version, answer, rows)
+
+    async def aget_stock_data(self, company_name: str) -> str:
+        key = ("get_stock_data", normalize_query(company_name))
+        version, cached = self._cached(key)
+        if cached is not None:
+            return cached
+        rows = await self.stock_service.afind_matches(
+            company_name, limit=5, timeout=self.detail_timeout
+        )
+        # The details were already awaited together; render whatever arrived
+        answer = self._render_matches(rows, time.monotonic())
+        return self._remember(key, version, answer, rows)
+
+    @timed("agent.direct_answer")
+    def answer_directly(self, query: str) -> Optional[str]:
+        """Answer `query` without the model if it is a plain lookup or screen."""
+        call = self.router.route(query)
+        if call is None:
+            return None
+        if call.tool == "screen_stocks":
+            return self._screen_answer(call)
+        key = ("lookup", call.args["company_name"])
+        version, cached = self._cached(key)
+        if cached is not None:
+            return cached
+        stock = self.stock_service.get_stock(call.args["company_name"])
+        if stock is None:
+            return None
+        Stock.prefetch([stock])
+        answer = self._render_matches([stock], time.monotonic() + self.detail_timeout)
+        return self._remember(key, version, answer, [stock])
+
+    @timed("agent.direct_answer")
+    async def aanswer_directly(self, query: str) -> Optional[str]:
+        call = self.router.route(query)
+        if call is None:
+            return None
+        if call.tool == "screen_stocks":
+            return self._screen_answer(call)
+        key = ("lookup", call.args["company_name"])
+        version, cached = self._cached(key)
+        if cached is not None:
+            return cached
+        stock = self.stock_service.get_stock(call.args["company_name"])
+        if stock is None:
+            return None
+        await Stock.aprefetch([stock], timeout=self.detail_timeout)
+        answer = self._render_matches([stock], time.monotonic())
+        return self._remember(key, version, answer, [stock])
+
+    def _screen_answer(self, call: RoutedCall) -> str:
+        return f"{call.title}:\n" + self.screen_stocks(**call.args)
+
+    def _render_matches(self, rows: List[Stock], deadline: float) -> str:
+        """Render matches, waiting for their details until `deadline` (monotonic)."""
         if not rows:
             return "I couldn't find any stock matching your query. Try a company name or symbol."
-
         if len(rows) == 1:
-            return "Found 1 matching stock:\n" + rows[0].pretty()
+            return "Found 1 matching stock:\n" + rows[0].compact(
+                timeout=max(0.0, deadline - time.monotonic())
+            )
         response = ""
         for s in rows:
-            response += s.pretty() + "\n\n"
+            response += s.compact(timeout=max(0.0, deadline - time.monotonic())) + "\n\n"
         return response
 
-    def update_stock_data(self) -> str:
-        """Update the stock data from the source."""
+    def screen_stocks(
+        self,
+        conditions: Optional[List[str]] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        limit: int = 10,
+    ) -> str:
+        key = (
+            "screen_stocks",
+            tuple(normalize_query(c) for c in conditions or ()),
+            (sort_by or "").strip().lower(),
+            descending,
+            limit,
+        )
+        version, cached = self._cached(key)
+        if cached is not None:
+            return cached
         try:
-            self.scraping_service.run(
-                output_filename=os.path.join(
-                    self.stock_service.assets_dir, "moneycontrol_stocks.csv"
-                )
+            rows = self.stock_service.screen(
+                conditions or [], sort_by=sort_by, descending=descending, limit=limit
             )
-            # Re-initialize the stock service to load the new data
-            self.stock_service.boot(checkpointer)
-            return "Stock data updated successfully."
-        except Exception as e:
-            logger.exception("Error updating stock data")
-            return f"An error occurred while updating stock data: {e}"
+        except (KeyError, ValueError) as e:
+            return f"Invalid screening query: {e}"
+        if not rows:
+            answer = "No stocks matched the screening criteria."
+        else:
+            answer = "\n".join(s.summary() for s in rows)
+        return self._remember(key, version, answer)
+
+    def get_price_history(
+        self,
+        company_name: str,
+        window_minutes: Optional[int] = None,
+        interval_minutes: int = 60,
+    ) -> str:
+        rows = self.stock_service.find_matches(company_name, limit=1)
+        if not rows:
+            return "I couldn't find any stock matching your query. Try a company name or symbol."
+        name = str(rows[0].get("Name", ""))
+        end = time.time()
+        start = end - window_minutes * 60 if window_minutes else self.tick_store.day_start()
+
+        change = self.tick_store.change(name, start, end)
+        if change is None:
+            return f"No price history has been recorded for {name} in that window yet."
+        first, last, pct = change
+        bars = self.tick_store.ohlc(name, start, end, interval=max(interval_minutes, 1) * 60)
+        lines = [f"{name}: {first:g} -> {last:g} ({pct:+.2f}%) since {_clock(start)}"]
+        lines.append("Time | Open | High | Low | Close | Volume")
+        for bar in bars:
+            lines.append(
+                f"{_clock(bar.start)} | {bar.open:g} | {bar.high:g} | {bar.low:g} | "
+                f"{bar.close:g} | {bar.volume:g}"
+            )
+        return "\n".join(lines)
+
+    def update_stock_data(self) -> str:
+        """Request a background refresh and report the age of the current data."""
+        self.refresh_scheduler.request_refresh()
+        snapshot = self.stock_service.snapshot
+        if not len(snapshot):
+            return "No stock data is loaded yet. A refresh has been started; try again shortly."
+        minutes = int(snapshot.age() // 60)
+        loaded_at = datetime.fromtimestamp(snapshot.loaded_at).strftime("%H:%M:%S")
+        return (
+            f"The current stock data was loaded at {loaded_at} ({minutes} min ago). "
+            "A refresh has been started in the background and newer data will be "
+            "used automatically as soon as it arrives."
+        )
+
+
+def _clock(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime("%d %b %H:%M")
 
 
 base_dir = os.path.dirname(__file__)
-assets_dir = os.path.join(base_dir, "assets")
+assets_dir = os.environ.get("STOCK_AGENT_ASSETS_DIR") or os.path.join(base_dir, "assets")
+ContentCache.configure(disk_dir=os.path.join(assets_dir, "page_cache"))
 stock_service = StockServiceImpl(assets_dir=assets_dir)
-checkpointer = InMemorySaver()
-stock_service.boot(checkpointer)
+# Memory-maps the last snapshot written to disk, so this stays cheap
+stock_service.boot()
 sa = StockAgent(stock_service=stock_service)
 
-@tool
+
+def _snapshot_stats() -> Dict[str, Any]:
+    snapshot = stock_service.snapshot
+    return {"version": snapshot.version, "rows": len(snapshot), "age_seconds": snapshot.age()}
+
+
+def _scrape_stats() -> Dict[str, Any]:
+    scheduler = ScrapeScheduler.current()
+    return scheduler.stats() if scheduler is not None else {}
+
+
+# Exported as gauges next to the spans; see utils.metrics
+metrics = Metrics.instance()
+metrics.register_collector("snapshot", _snapshot_stats)
+metrics.register_collector("router", sa.router.stats)
+metrics.register_collector("result_cache", sa.result_cache.stats)
+metrics.register_collector("scrapes", _scrape_stats)
+
+
+@timed("tool", tool="get_stock_data")
 def get_stock_data(company_name: str) -> str:
     """
     Get stock data for a specific company.
@@ -78,41 +312,154 @@ def get_stock_data(company_name: str) -> str:
     return sa.get_stock_data(company_name)
 
 
-@tool
+@timed("tool", tool="get_stock_data")
+async def _aget_stock_data(company_name: str) -> str:
+    return await sa.aget_stock_data(company_name)
+
+
+@timed("tool", tool="screen_stocks")
+def screen_stocks(
+    conditions: Optional[List[str]] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = True,
+    limit: int = 10,
+) -> str:
+    """
+    Screen the whole market table, e.g. top gainers, most active or price ranges.
+
+    conditions: filters such as "Volume > 1000000" or "LTP between 100 and 500".
+    sort_by: numeric column to sort by, e.g. "%Chg" for gainers/losers or "Volume".
+    descending: sort order; use False for top losers or cheapest stocks.
+    limit: maximum number of stocks to return.
+    """
+    return sa.screen_stocks(conditions, sort_by, descending, limit)
+
+
+@timed("tool", tool="get_price_history")
+def get_price_history(
+    company_name: str,
+    window_minutes: Optional[int] = None,
+    interval_minutes: int = 60,
+) -> str:
+    """
+    Get how a company's price has moved, e.g. "how has X moved today".
+
+    window_minutes: how far back to look; defaults to since the start of today.
+    interval_minutes: size of each OHLC bar in the returned table.
+    """
+    return sa.get_price_history(company_name, window_minutes, interval_minutes)
+
+
+@timed("tool", tool="update_stock_data")
 def update_stock_data() -> str:
     """
-    Update the stock data from the source. This is useful if the user suspects the data is stale.
+    Refresh the stock data from the source in the background. This is useful if the
+    user suspects the data is stale; it returns immediately with the age of the
+    current data.
     """
     return sa.update_stock_data()
 
 
-if __name__ == "__main__":
-    logging.basicConfig(
-        level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s"
-    )
+def build_tools() -> List[Any]:
+    """The agent's LangChain tools; each docstring above is its description."""
+    from langchain_core.tools import StructuredTool, tool
 
-    # Update the stock data on startup
-    logger.info("Updating stock data on startup...")
-    update_response = sa.update_stock_data()
-    logger.info(update_response)
+    return [
+        # Sync for agent.invoke; agent.ainvoke awaits all detail pages together
+        StructuredTool.from_function(
+            func=get_stock_data, coroutine=_aget_stock_data, name="get_stock_data"
+        ),
+        tool(screen_stocks),
+        tool(get_price_history),
+        tool(update_stock_data),
+    ]
 
-    if not os.environ.get("GOOGLE_API_KEY"):
-        raise ValueError(
-            "GOOGLE_API_KEY environment variable must be set for StockAgent to work."
-        )
 
-    model = init_chat_model(
-        "gemini-2.5-flash", model_provider="google_genai", temperature=0
+def run_config(thread_id: str) -> "RunnableConfig":
+    """The config for one conversation's agent runs, with its model calls timed."""
+    from utils.model_metrics import ModelCallMetrics
+
+    return {"configurable": {"thread_id": thread_id}, "callbacks": [ModelCallMetrics()]}
+
+
+async def remember_exchange(agent, config: "RunnableConfig", question: str, answer: str):
+    """Add a routed question and its answer to the conversation, for follow-ups."""
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    await agent.aupdate_state(
+        config,
+        {"messages": [HumanMessage(content=question), AIMessage(content=answer)]},
+        as_node="agent",
     )
-    checkpointer = InMemorySaver()
-    agent = create_react_agent(
+
+
+def build_agent(model=None, checkpointer: Optional["InMemorySaver"] = None):
+    """
+    Compile the agent graph. One graph can serve many conversations at once;
+    each is kept apart by the `thread_id` in its config.
+    """
+    from langchain.chat_models import init_chat_model
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.prebuilt import create_react_agent
+
+    if model is None:
+        if not os.environ.get("GOOGLE_API_KEY"):
+            raise ValueError(
+                "GOOGLE_API_KEY environment variable must be set for StockAgent to work."
+            )
+        model = init_chat_model(
+            "gemini-2.5-flash", model_provider="google_genai", temperature=0
+        )
+    return create_react_agent(
         model=model,
-        tools=[get_stock_data, update_stock_data],
-        checkpointer=checkpointer,
+        tools=build_tools(),
+        checkpointer=checkpointer or InMemorySaver(),
         prompt="You are an stock market assistant.",
     )
 
-    config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+
+async def _chat(agent, config: "RunnableConfig"):
+    from langchain_core.messages import AIMessage
+
+    print("StockAgent ready. Type a query (Ctrl-C to exit):")
+    while True:
+        q = (await asyncio.to_thread(input, "> ")).strip()
+        if not q:
+            continue
+        direct = await sa.aanswer_directly(q)
+        if direct is not None:
+            print(f"\n{direct}\n")
+            await remember_exchange(agent, config, q, direct)
+            continue
+        response = await agent.ainvoke(
+            {"messages": [{"role": "user", "content": q}]}, config
+        )
+        messages = response.get("messages", [])
+        if messages and isinstance(messages[-1], AIMessage):
+            ai_response = messages[-1].content
+            print(f"\n{ai_response}\n")
+            with open("response.md", "w", encoding="utf-8") as f:
+                f.write(ai_response)
+        else:
+            # Fallback to printing all messages for debugging
+            print("Could not get a final answer. Dumping all messages:")
+            for m in messages:
+                m.pretty_print()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s"
+    )
+
+    # Answer from the snapshot loaded at import while the startup refresh
+    # runs in the background; the refresh publishes straight into the service
+    logger.info("Refreshing stock data in the background...")
+    sa.start_background_refresh()
+
+    agent = build_agent()
+
+    config = run_config("1")
 
     try:
         if "--test" in sys.argv:
@@ -121,30 +468,9 @@ if __name__ == "__main__":
                 print("\nQuery:", q)
 
         else:
-            print("StockAgent ready. Type a query (Ctrl-C to exit):")
-            while True:
-                q = input("> ").strip()
-                if not q:
-                    continue
-                response = agent.invoke(
-                    {"messages": [{"role": "user", "content": q}]}, config
-                )
-                messages = response.get("messages", [])
-                if messages and isinstance(messages[-1], AIMessage):
-                    ai_response = messages[-1].content
-                    print(f"\n{ai_response}\n")
-                    with open("response.md", "w", encoding="utf-8") as f:
-                        f.write(ai_response)
-                else:
-                    # Fallback to printing all messages for debugging
-                    print("Could not get a final answer. Dumping all messages:")
-                    for m in messages:
-                        m.pretty_print()
+            asyncio.run(_chat(agent, config))
 
     except (KeyboardInterrupt, EOFError):
         print("\nGoodbye")
     finally:
-        try:
-            Stock.shutdown_executor()
-        except Exception:
-            logger.exception("Error shutting down executor")
+        sa.shutdown()
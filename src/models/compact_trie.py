@@ -0,0 +1,513 @@
+import os
+import mmap
+import math
+import heapq
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_MAGIC = b"CTRIE002"
+# magic, nodes, edges, words, blob bytes, nodes with a top-k list, top-k ids
+_HEADER = struct.Struct("<8sQQQQQQ")
+_ALIGN = 8
+
+# Ranked lookups of prefixes up to TOP_DEPTH characters are served from
+# precomputed lists of the TOP_K best words, like `Trie`'s cached tops
+TOP_K = 10
+TOP_DEPTH = 3
+# Listed words kept in the overlay plus delisted tombstones before a rebuild
+MAX_OVERLAY = 256
+
+
+def _padding(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+class CompactTrie:
+    """
+    An immutable, array-backed trie with the same API as `Trie`.
+
+    Nodes are numbered breadth-first and stored in flat arrays: the edges of
+    node `n` are `labels/targets[edge_start[n]:edge_start[n + 1]]`, sorted by
+    label so a child is found by binary search. Because the trie is built
+    from a sorted word list, the words below any node form a contiguous
+    range `[word_lo[n], word_hi[n])`, so unranked completion is a slice and
+    ranked completion a top-k over that slice of `scores`. Nodes within
+    `TOP_DEPTH` characters of the root, whose slices are the largest, also
+    keep their `TOP_K` best word ids, so short ranked prefixes cost
+    O(prefix + k).
+
+    Listings and delistings (`with_changes`) do not rebuild the arrays:
+    new words go into a small sorted overlay and removed ones become
+    tombstones until enough of them accumulate.
+
+    The arrays can be written to a file and memory-mapped back with `load`,
+    so startup does not rebuild the index.
+    """
+
+    def __init__(self):
+        self._edge_start: Sequence[int] = array("i", [0, 0])
+        self._labels: Sequence[int] = array("I")
+        self._targets: Sequence[int] = array("i")
+        self._word_lo: Sequence[int] = array("i", [0])
+        self._word_hi: Sequence[int] = array("i", [0])
+        self._scores: Sequence[float] = array("d")
+        self._word_offsets: Sequence[int] = array("q", [0])
+        self._blob: bytes = b""
+        # Best word ids of node n (n < len(_top_start) - 1) are
+        # `_top_ids[_top_start[n]:_top_start[n + 1]]`
+        self._top_start: Sequence[int] = array("i", [0, 0])
+        self._top_ids: Sequence[int] = array("i")
+        self._mmap: Optional[mmap.mmap] = None
+        self._pending: Dict[str, Optional[float]] = {}
+        # Incremental changes on top of the arrays; see `with_changes`
+        self._deleted: FrozenSet[int] = frozenset()
+        self._extra: Dict[str, Optional[float]] = {}
+        self._extra_words: List[str] = []
+
+    @classmethod
+    def build(
+        cls, words: Iterable[str], scores: Optional[Dict[str, Optional[float]]] = None
+    ) -> "CompactTrie":
+        """Bulk-build a trie from words, optionally with a ranking score per word."""
+        trie = cls()
+        trie._build(sorted(set(words)), scores or {})
+        return trie
+
+    def _build(self, words: List[str], scores: Dict[str, Optional[float]]):
+        edge_start = array("i")
+        labels = array("I")
+        targets = array("i")
+        word_lo = array("i")
+        word_hi = array("i")
+
+        # Breadth-first over (lo, hi, depth) ranges of the sorted word list:
+        # the children of a node are the runs of equal characters at `depth`.
+        queue: List[Tuple[int, int, int]] = [(0, len(words), 0)]
+        head = 0
+        while head < len(queue):
+            lo, hi, depth = queue[head]
+            head += 1
+            edge_start.append(len(labels))
+            word_lo.append(lo)
+            word_hi.append(hi)
+            i = lo
+            while i < hi and len(words[i]) <= depth:
+                i += 1  # the word ending at this node sorts first
+            while i < hi:
+                char = words[i][depth]
+                j = i + 1
+                while j < hi and words[j][depth] == char:
+                    j += 1
+                labels.append(ord(char))
+                targets.append(len(queue))
+                queue.append((i, j, depth + 1))
+                i = j
+        edge_start.append(len(labels))
+
+        encoded = [w.encode("utf-8") for w in words]
+        offsets = array("q", [0])
+        for b in encoded:
+            offsets.append(offsets[-1] + len(b))
+
+        self._edge_start = edge_start
+        self._labels = labels
+        self._targets = targets
+        self._word_lo = word_lo
+        self._word_hi = word_hi
+        self._scores = array(
+            "d", (s if (s := scores.get(w)) is not None else math.nan for w in words)
+        )
+        self._word_offsets = offsets
+        self._blob = b"".join(encoded)
+        self._rank_shallow_nodes()
+
+    def _shallow_levels(self) -> List[Tuple[int, int]]:
+        """Node id ranges of depths 1 to TOP_DEPTH; nodes are numbered breadth-first."""
+        levels: List[Tuple[int, int]] = []
+        a, b = 0, 1
+        for _ in range(TOP_DEPTH):
+            a, b = b, b + self._edge_start[b] - self._edge_start[a]
+            levels.append((a, b))
+        return levels
+
+    def _rank_shallow_nodes(self):
+        """Compute the top-k word ids of every node down to TOP_DEPTH."""
+        levels = self._shallow_levels()
+        shallow = levels[-1][1]
+        count = len(self._scores)
+        scores = np.asarray(self._scores, dtype=np.float64)
+        ids = np.arange(count)
+        # Same order as the ranked fallback: by descending score, unscored
+        # words last, ties by position
+        order = np.lexsort((ids, np.where(np.isnan(scores), np.inf, -scores)))
+        word_lo = np.asarray(self._word_lo[:shallow], dtype=np.int64)
+        word_hi = np.asarray(self._word_hi[:shallow], dtype=np.int64)
+
+        sizes = np.zeros(shallow, dtype=np.int64)
+        chunks = []
+        for a, b in levels:
+            if a == b or not count:
+                continue
+            lo, hi = word_lo[a:b], word_hi[a:b]
+            # Node ranges of one depth are disjoint and in word order
+            owner = np.searchsorted(lo, order, side="right") - 1
+            inside = (owner >= 0) & (order < hi[np.maximum(owner, 0)])
+            ranked, owner = order[inside], owner[inside]
+            by_node = np.argsort(owner, kind="stable")
+            ranked, owner = ranked[by_node], owner[by_node]
+            first = np.searchsorted(owner, np.arange(b - a))
+            keep = np.arange(len(owner)) - first[owner] < TOP_K
+            chunks.append(ranked[keep])
+            sizes[a:b] = np.minimum(hi - lo, TOP_K)
+
+        start = np.zeros(shallow + 1, dtype=np.int32)
+        np.cumsum(sizes, out=start[1:])
+        top_ids = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32)
+        self._top_start = array("i", start.astype(np.int32).tobytes())
+        self._top_ids = array("i", top_ids.astype(np.int32).tobytes())
+
+    def __len__(self) -> int:
+        self._flush()
+        return len(self._scores) - len(self._deleted) + len(self._extra)
+
+    def words(self) -> List[str]:
+        self._flush()
+        deleted = self._deleted
+        base = (self._word(i) for i in range(len(self._scores)) if i not in deleted)
+        return list(heapq.merge(base, self._extra_words))
+
+    def _score_map(self) -> Dict[str, Optional[float]]:
+        """Every word and its score, including the overlay, without tombstones."""
+        scores: Dict[str, Optional[float]] = {}
+        for i in range(len(self._scores)):
+            if i not in self._deleted:
+                s = self._scores[i]
+                scores[self._word(i)] = None if math.isnan(s) else s
+        scores.update(self._extra)
+        return scores
+
+    def with_scores(self, scores: Dict[str, Optional[float]]) -> "CompactTrie":
+        """
+        A trie over the same words with new ranking scores.
+        The node and word arrays are shared; only the scores and the
+        top-k lists are new.
+        """
+        self._flush()
+        trie = CompactTrie()
+        for name in (
+            "_edge_start", "_labels", "_targets", "_word_lo",
+            "_word_hi", "_word_offsets", "_blob", "_deleted", "_extra_words",
+        ):
+            setattr(trie, name, getattr(self, name))
+        trie._scores = array(
+            "d",
+            (
+                s if (s := scores.get(self._word(i))) is not None else math.nan
+                for i in range(len(self._scores))
+            ),
+        )
+        trie._extra = {w: scores.get(w) for w in self._extra_words}
+        trie._rank_shallow_nodes()
+        return trie
+
+    def with_changes(
+        self,
+        scores: Dict[str, Optional[float]],
+        added: Iterable[str] = (),
+        removed: Iterable[str] = (),
+    ) -> "CompactTrie":
+        """
+        A trie with `added` words inserted, `removed` words deleted and new scores.
+
+        The arrays are shared: added words go into a small sorted overlay and
+        removed ones become tombstones, both consulted at lookup time. Once
+        they outgrow MAX_OVERLAY or 2% of the words, the arrays are rebuilt.
+        """
+        self._flush()
+        extra = dict(self._extra)
+        deleted = set(self._deleted)
+        for word in removed:
+            if word in extra:
+                del extra[word]
+            else:
+                i = self._find(word)
+                if i >= 0:
+                    deleted.add(i)
+        for word in added:
+            i = self._find(word)
+            if i >= 0:
+                deleted.discard(i)  # listed again
+            else:
+                extra[word] = None
+        if len(extra) + len(deleted) > max(MAX_OVERLAY, len(self._scores) // 50):
+            words = [self._word(i) for i in range(len(self._scores)) if i not in deleted]
+            return CompactTrie.build(words + list(extra), scores)
+        trie = CompactTrie()
+        trie._deleted = frozenset(deleted)
+        trie._extra_words = sorted(extra)
+        return self._share_into(trie).with_scores(scores)
+
+    def _share_into(self, trie: "CompactTrie") -> "CompactTrie":
+        for name in (
+            "_edge_start", "_labels", "_targets", "_word_lo", "_word_hi",
+            "_scores", "_word_offsets", "_blob", "_top_start", "_top_ids",
+        ):
+            setattr(trie, name, getattr(self, name))
+        return trie
+
+    def _word(self, i: int) -> str:
+        return bytes(self._blob[self._word_offsets[i] : self._word_offsets[i + 1]]).decode("utf-8")
+
+    def _find(self, word: str) -> int:
+        """The id of `word` in the arrays (tombstoned or not), or -1."""
+        node = 0
+        for char in word:
+            node = self._child(node, char)
+            if node < 0:
+                return -1
+        i = self._word_lo[node]
+        return i if i < self._word_hi[node] and self._word(i) == word else -1
+
+    def insert(self, word: str, score: Optional[float] = None):
+        """
+        Queues a word for insertion.
+        The arrays are rebuilt once, on the next lookup, for all queued words.
+        """
+        self._pending[word] = score
+
+    def _flush(self):
+        if not self._pending:
+            return
+        scores = self._score_map()
+        scores.update(self._pending)
+        self._pending = {}
+        self.close()
+        self._deleted = frozenset()
+        self._extra = {}
+        self._extra_words = []
+        self._build(sorted(scores), scores)
+
+    def _child(self, node: int, char: str) -> int:
+        lo, hi = self._edge_start[node], self._edge_start[node + 1]
+        code = ord(char)
+        i = bisect_left(self._labels, code, lo, hi)
+        if i < hi and self._labels[i] == code:
+            return self._targets[i]
+        return -1
+
+    def _extra_with_prefix(self, prefix: str) -> List[str]:
+        words = self._extra_words
+        out = []
+        i = bisect_left(words, prefix)
+        while i < len(words) and words[i].startswith(prefix):
+            out.append(words[i])
+            i += 1
+        return out
+
+    def _extra_depth(self, prefix: str) -> int:
+        """Length of the longest part of `prefix` that some overlay word starts with."""
+        words = self._extra_words
+        for depth in range(len(prefix), 0, -1):
+            i = bisect_left(words, prefix[:depth])
+            if i < len(words) and words[i].startswith(prefix[:depth]):
+                return depth
+        return 0
+
+    def _live(self, node: int) -> bool:
+        """True if some word below `node` is not a tombstone."""
+        deleted = self._deleted
+        return not deleted or any(
+            i not in deleted for i in range(self._word_lo[node], self._word_hi[node])
+        )
+
+    def starts_with(self, prefix: str) -> bool:
+        """Returns True if some inserted word starts with the whole `prefix`."""
+        self._flush()
+        prefix = (prefix or "").strip().lower()
+        if not prefix:
+            return False
+        node = 0
+        for char in prefix:
+            node = self._child(node, char)
+            if node < 0:
+                break
+        if node >= 0 and self._live(node):
+            return True
+        return self._extra_depth(prefix) == len(prefix) if self._extra_words else False
+
+    def autocomplete(
+        self, prefix: str, limit: Optional[int] = None, ranked: bool = False
+    ) -> List[str]:
+        """
+        Returns a list of words for autocompletion, like `Trie.autocomplete`.
+
+        A misspelled prefix falls back to its longest valid part; words are
+        returned in sorted order, or by descending score with `ranked=True`.
+        """
+        self._flush()
+        prefix = (prefix or "").strip().lower()
+        if not prefix:
+            return []
+
+        path = [0]
+        for char in prefix:
+            child = self._child(path[-1], char)
+            if child < 0:
+                break
+            path.append(child)
+        # Back off from nodes whose words were all delisted
+        while len(path) > 1 and self._deleted and not self._live(path[-1]):
+            path.pop()
+        node, depth = path[-1], len(path) - 1
+        if not self._extra_words and not self._deleted:
+            if depth == 0:
+                return []
+            return [self._word(i) for i in self._completions(node, limit, ranked)]
+
+        extra_depth = self._extra_depth(prefix) if self._extra_words else 0
+        stem_depth = max(depth, extra_depth)
+        if stem_depth == 0:
+            return []
+        base = self._completions(node, limit, ranked) if depth == stem_depth else []
+        extra = self._extra_with_prefix(prefix[:stem_depth]) if extra_depth == stem_depth else []
+        if not ranked:
+            merged = list(heapq.merge((self._word(i) for i in base), extra))
+            return merged if limit is None else merged[:limit]
+
+        def key(score: Optional[float], word: str) -> Tuple[float, str]:
+            return (math.inf if score is None or math.isnan(score) else -score, word)
+
+        candidates = [key(self._scores[i], self._word(i)) for i in base]
+        candidates.extend(key(self._extra[w], w) for w in extra)
+        best = sorted(candidates) if limit is None else heapq.nsmallest(limit, candidates)
+        return [word for _, word in best]
+
+    def _completions(self, node: int, limit: Optional[int], ranked: bool) -> List[int]:
+        """Ids of the first `limit` live words below `node`, sorted or ranked."""
+        deleted = self._deleted
+        if ranked and limit is not None and limit <= TOP_K and node < len(self._top_start) - 1:
+            start, end = self._top_start[node], self._top_start[node + 1]
+            ids = [i for i in self._top_ids[start:end] if i not in deleted][:limit]
+            # Tombstones can leave a cached list short; the range below is exact
+            if len(ids) == limit or len(ids) == end - start:
+                return ids
+
+        lo, hi = self._word_lo[node], self._word_hi[node]
+        if not ranked:
+            if not deleted:
+                return list(range(lo, hi if limit is None else min(hi, lo + limit)))
+            ids = []
+            for i in range(lo, hi):
+                if i not in deleted:
+                    ids.append(i)
+                    if limit is not None and len(ids) >= limit:
+                        break
+            return ids
+
+        scores = self._scores
+
+        def key(i: int) -> Tuple[float, int]:
+            s = scores[i]
+            return (math.inf if math.isnan(s) else -s, i)
+
+        ids = range(lo, hi) if not deleted else [i for i in range(lo, hi) if i not in deleted]
+        return sorted(ids, key=key) if limit is None else heapq.nsmallest(limit, ids, key=key)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the trie into its memory-mappable layout."""
+        self._flush()
+        if self._extra_words or self._deleted:
+            scores = self._score_map()
+            return CompactTrie.build(scores, scores).to_bytes()
+        sections = [
+            _HEADER.pack(
+                _MAGIC,
+                len(self._word_lo),
+                len(self._labels),
+                len(self._scores),
+                len(self._blob),
+                len(self._top_start) - 1,
+                len(self._top_ids),
+            ),
+            array("i", self._edge_start).tobytes(),
+            array("I", self._labels).tobytes(),
+            array("i", self._targets).tobytes(),
+            array("i", self._word_lo).tobytes(),
+            array("i", self._word_hi).tobytes(),
+            array("d", self._scores).tobytes(),
+            array("q", self._word_offsets).tobytes(),
+            array("i", self._top_start).tobytes(),
+            array("i", self._top_ids).tobytes(),
+            bytes(self._blob),
+        ]
+        return b"".join(data + b"\0" * _padding(len(data)) for data in sections)
+
+    def save(self, path: str):
+        """Write the trie to `path` in a memory-mappable layout."""
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def from_buffer(cls, view: memoryview) -> "CompactTrie":
+        """
+        Wrap a serialized trie without copying it.
+        `view` must start at an 8-byte aligned offset of the underlying buffer.
+        """
+        magic, nodes, edges, words, blob_len, shallow, tops = _HEADER.unpack_from(view, 0)
+        if magic != _MAGIC:
+            raise ValueError("buffer does not contain a compact trie")
+
+        offset = _HEADER.size + _padding(_HEADER.size)
+
+        def take(fmt: str, count: int, itemsize: int):
+            nonlocal offset
+            size = count * itemsize
+            section = view[offset : offset + size]
+            offset += size + _padding(size)
+            return section.cast(fmt) if fmt else section
+
+        trie = cls()
+        trie._edge_start = take("i", nodes + 1, 4)
+        trie._labels = take("I", edges, 4)
+        trie._targets = take("i", edges, 4)
+        trie._word_lo = take("i", nodes, 4)
+        trie._word_hi = take("i", nodes, 4)
+        trie._scores = take("d", words, 8)
+        trie._word_offsets = take("q", words + 1, 8)
+        trie._top_start = take("i", shallow + 1, 4)
+        trie._top_ids = take("i", tops, 4)
+        trie._blob = take("", blob_len, 1)
+        return trie
+
+    @classmethod
+    def load(cls, path: str) -> "CompactTrie":
+        """Memory-map a trie written by `save`."""
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            trie = cls.from_buffer(memoryview(mm))
+        except ValueError:
+            mm.close()
+            raise ValueError(f"{path} is not a compact trie file")
+        trie._mmap = mm
+        return trie
+
+    def close(self):
+        """Release the memory map, if the trie was loaded from a file."""
+        if self._mmap is None:
+            return
+        for name in (
+            "_edge_start", "_labels", "_targets", "_word_lo",
+            "_word_hi", "_scores", "_word_offsets", "_top_start", "_top_ids", "_blob",
+        ):
+            value = getattr(self, name)
+            if isinstance(value, memoryview):
+                value.release()
+        self._mmap.close()
+        self._mmap = None
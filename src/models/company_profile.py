@@ -0,0 +1,160 @@
+import re
+import json
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+_NUMBER = r"(-?\d[\d,]*(?:\.\d+)?|-?\.\d+)"
+# Characters allowed between a label and its value: unit notes, markdown, currency
+_GAP = r"[\s:|*_\-–=(),.%a-z₹]{0,24}?"
+
+# (field, label pattern) in lower-cased text; the first match on a page wins
+_LABELS: List[Tuple[str, str]] = [
+    ("market_cap", r"(?:market|mkt\.?) cap(?:itali[sz]ation)?"),
+    ("industry_pe", r"(?:industry|sector) p/?e"),
+    ("pe", r"(?<!industry )(?<!sector )\bp/?e\b(?: ratio)?(?: \(?ttm\)?)?"),
+    ("pb", r"\bp/?b\b(?: ratio)?|price to book"),
+    ("book_value", r"book value(?: per share)?"),
+    ("eps", r"\beps\b(?: \(?ttm\)?)?"),
+    ("dividend_yield", r"div(?:idend)?\.? yield"),
+    ("face_value", r"face value"),
+    ("roe", r"\broe\b|return on equity"),
+    ("debt_to_equity", r"debt to equity|\bd/e\b"),
+    ("week52_high", r"52[ -]?w(?:ee)?k high"),
+    ("week52_low", r"52[ -]?w(?:ee)?k low"),
+]
+_FIELD_RES: List[Tuple[str, Pattern]] = [
+    (name, re.compile(rf"(?:{label}){_GAP}{_NUMBER}(\s*(?:l|lakh|k|thousand)\s*cr)?"))
+    for name, label in _LABELS
+]
+_RANGE_RE = re.compile(rf"52[ -]?w(?:ee)?k (?:range|h/l|high/low){_GAP}{_NUMBER}\s*[-–/]\s*{_NUMBER}")
+_CRORE_SCALE = {"l": 1e5, "lakh": 1e5, "k": 1e3, "thousand": 1e3}
+
+_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_EMPHASIS_RE = re.compile(r"[*_`#>]+")
+
+
+def _number(text: str) -> Optional[float]:
+    try:
+        return float(text.replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _format(v: float) -> str:
+    return f"{v:,.2f}".rstrip("0").rstrip(".")
+
+
+@dataclass
+class CompanyProfile:
+    """
+    Key fundamentals extracted from a company page, plus a short summary.
+
+    This is what is kept of a scraped page instead of its full markdown.
+    Market cap is in crore rupees; ratios and yields are plain numbers.
+    """
+
+    market_cap: Optional[float] = None
+    pe: Optional[float] = None
+    industry_pe: Optional[float] = None
+    pb: Optional[float] = None
+    book_value: Optional[float] = None
+    eps: Optional[float] = None
+    dividend_yield: Optional[float] = None
+    face_value: Optional[float] = None
+    roe: Optional[float] = None
+    debt_to_equity: Optional[float] = None
+    week52_high: Optional[float] = None
+    week52_low: Optional[float] = None
+    summary: str = ""
+
+    # Short labels used by `render`, in display order
+    LABELS = {
+        "market_cap": "MCap(Cr)",
+        "pe": "P/E",
+        "industry_pe": "Ind P/E",
+        "pb": "P/B",
+        "book_value": "BV",
+        "eps": "EPS",
+        "dividend_yield": "Div%",
+        "face_value": "FV",
+        "roe": "ROE%",
+        "debt_to_equity": "D/E",
+        "week52_high": "52wH",
+        "week52_low": "52wL",
+    }
+
+    @classmethod
+    def from_markdown(cls, markdown: str, max_summary: int = 400) -> "CompanyProfile":
+        """Extract fundamentals and a summary of at most `max_summary` characters."""
+        text = _EMPHASIS_RE.sub("", _LINK_RE.sub(r"\1", markdown or ""))
+        lowered = text.lower()
+        values: Dict[str, float] = {}
+        for name, pattern in _FIELD_RES:
+            m = pattern.search(lowered)
+            if m is None:
+                continue
+            value = _number(m.group(1))
+            if value is None:
+                continue
+            if name == "market_cap" and m.group(2):
+                value *= _CRORE_SCALE[m.group(2).split()[0].strip()]
+            values[name] = value
+        m = _RANGE_RE.search(lowered)
+        if m is not None:
+            bounds = [_number(m.group(1)), _number(m.group(2))]
+            if None not in bounds:
+                values.setdefault("week52_low", min(bounds))
+                values.setdefault("week52_high", max(bounds))
+        return cls(summary=cls._summarize(text, max_summary), **values)
+
+    @staticmethod
+    def _summarize(text: str, max_chars: int) -> str:
+        """The first prose lines of the page, cut at a sentence boundary."""
+        parts: List[str] = []
+        size = 0
+        for line in text.splitlines():
+            line = " ".join(line.split())
+            if len(line) < 60 or line.count("|") > 1:
+                continue
+            if sum(c.isdigit() for c in line) > len(line) / 4:
+                continue
+            parts.append(line)
+            size += len(line) + 1
+            if size >= max_chars:
+                break
+        summary = " ".join(parts)
+        if len(summary) <= max_chars:
+            return summary
+        cut = summary[:max_chars]
+        end = cut.rfind(". ")
+        return cut[: end + 1] if end > max_chars // 2 else cut.rstrip() + "..."
+
+    @classmethod
+    def loads(cls, content: str) -> "CompanyProfile":
+        """Parse `dumps` output; anything else is treated as raw page markdown."""
+        if content.startswith("{"):
+            try:
+                raw = json.loads(content)
+                known = {f.name for f in fields(cls)}
+                return cls(**{k: v for k, v in raw.items() if k in known})
+            except (ValueError, TypeError):
+                pass
+        return cls.from_markdown(content)
+
+    def dumps(self) -> str:
+        """Compact JSON, omitting fields that were not found."""
+        return json.dumps(self.to_dict(), separators=(",", ":"), ensure_ascii=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v not in (None, "")}
+
+    def __bool__(self) -> bool:
+        return bool(self.to_dict())
+
+    def render(self) -> str:
+        """The fundamentals on one line, e.g. 'MCap(Cr): 1,234 | P/E: 25.4'."""
+        return " | ".join(
+            f"{label}: {_format(getattr(self, name))}"
+            for name, label in self.LABELS.items()
+            if getattr(self, name) is not None
+        )
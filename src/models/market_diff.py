@@ -0,0 +1,62 @@
+from typing import Any, Dict, List, Optional
+
+
+class SnapshotDiff:
+    """Company names added, removed and changed between two snapshots."""
+
+    __slots__ = ("added", "removed", "changed")
+
+    def __init__(
+        self,
+        added: Optional[List[str]] = None,
+        removed: Optional[List[str]] = None,
+        changed: Optional[List[str]] = None,
+    ):
+        self.added: List[str] = added or []
+        self.removed: List[str] = removed or []
+        self.changed: List[str] = changed or []
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return (
+            f"SnapshotDiff(+{len(self.added)} -{len(self.removed)} ~{len(self.changed)})"
+        )
+
+
+class ChangeEvent:
+    """A notable change published with a new snapshot."""
+
+    LISTED = "listed"
+    DELISTED = "delisted"
+    PRICE_MOVE = "price_move"
+
+    __slots__ = ("kind", "name", "version", "old_price", "new_price", "pct_change")
+
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        version: int,
+        old_price: Optional[float] = None,
+        new_price: Optional[float] = None,
+        pct_change: Optional[float] = None,
+    ):
+        self.kind = kind
+        self.name = name
+        self.version = version
+        self.old_price = old_price
+        self.new_price = new_price
+        self.pct_change = pct_change
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        if self.kind == self.PRICE_MOVE:
+            return (
+                f"ChangeEvent({self.kind}, {self.name!r}, "
+                f"{self.old_price} -> {self.new_price}, {self.pct_change:+.2f}%)"
+            )
+        return f"ChangeEvent({self.kind}, {self.name!r})"
@@ -0,0 +1,49 @@
+import time
+from typing import Any, Mapping, Optional, Tuple, Union
+
+from models.compact_trie import CompactTrie
+from models.market_table import MarketTable
+from models.search_index import SearchIndex
+from models.stock_schema import StockSchema
+from models.trie import Trie
+
+
+class MarketSnapshot:
+    """
+    One fully loaded version of the market table and its indexes.
+
+    A snapshot is built off to the side and never mutated once published, so
+    readers can hold a reference for the duration of a query without locks.
+    """
+
+    __slots__ = (
+        "version", "loaded_at", "schema", "stocks", "trie",
+        "search_index", "table", "ranked",
+    )
+
+    def __init__(
+        self,
+        version: int = 0,
+        schema: Optional[StockSchema] = None,
+        stocks: Optional[Mapping[str, Tuple[Any, ...]]] = None,
+        trie: Optional[Union[Trie, CompactTrie]] = None,
+        search_index: Optional[SearchIndex] = None,
+        table: Optional[MarketTable] = None,
+        ranked: bool = False,
+        loaded_at: Optional[float] = None,
+    ):
+        self.version = version
+        self.loaded_at = loaded_at if loaded_at is not None else time.time()
+        self.schema = schema
+        self.stocks: Mapping[str, Tuple[Any, ...]] = stocks if stocks is not None else {}
+        self.trie: Union[Trie, CompactTrie] = trie if trie is not None else Trie()
+        self.search_index = search_index if search_index is not None else SearchIndex()
+        self.table = table
+        self.ranked = ranked
+
+    def __len__(self) -> int:
+        return len(self.stocks)
+
+    def age(self) -> float:
+        """Seconds since this snapshot was loaded."""
+        return time.time() - self.loaded_at
@@ -0,0 +1,155 @@
+import re
+import operator
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.stock_schema import StockSchema, parse_number
+
+_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "!=": operator.ne,
+    "==": operator.eq,
+    "=": operator.eq,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+_CONDITION_RE = re.compile(r"^\s*(.+?)\s*(>=|<=|!=|==|=|>|<)\s*(\S+)\s*$")
+_BETWEEN_RE = re.compile(r"^\s*(.+?)\s+between\s+(\S+)\s+and\s+(\S+)\s*$", re.IGNORECASE)
+
+# (column, operator symbol, value)
+Condition = Tuple[str, str, float]
+
+
+def _operand(raw: str, text: str) -> float:
+    """A condition's number, written like a table cell ('1,000', '2.5%')."""
+    try:
+        value = parse_number(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValueError(f"Could not parse condition '{text}'")
+    return float(value)
+
+
+class MarketTable:
+    """
+    A columnar, NumPy-backed view of the market snapshot.
+
+    Every numeric column of the schema is held as a float64 array (NaN for
+    missing cells) aligned with `names`, so screening and sorting queries are
+    evaluated with vectorized operations instead of Python loops over rows.
+    """
+
+    def __init__(self, schema: StockSchema, names: Sequence[str], rows: Sequence[Sequence[Any]]):
+        self.schema = schema
+        self.names: List[str] = list(names)
+        self.columns: Dict[str, np.ndarray] = {}
+        for i in sorted(schema.numeric):
+            col = np.fromiter(
+                (np.nan if r[i] is None else r[i] for r in rows),
+                dtype=np.float64,
+                count=len(rows),
+            )
+            self.columns[schema.columns[i]] = col
+
+    @classmethod
+    def from_columns(
+        cls, schema: StockSchema, names: Sequence[str], columns: Dict[str, np.ndarray]
+    ) -> "MarketTable":
+        """Wrap existing float64 column arrays (e.g. memory-mapped) without copying."""
+        table = cls.__new__(cls)
+        table.schema = schema
+        table.names = list(names)
+        table.columns = dict(columns)
+        return table
+
+    def with_rows(
+        self, positions: Sequence[int], rows: Sequence[Sequence[Any]]
+    ) -> "MarketTable":
+        """
+        A copy with the rows at `positions` replaced by `rows`.
+        Columns where none of those cells changed are shared, not copied.
+        """
+        table = MarketTable.from_columns(self.schema, self.names, self.columns)
+        if not len(positions):
+            return table
+        pos = np.asarray(positions, dtype=np.intp)
+        for i in sorted(self.schema.numeric):
+            name = self.schema.columns[i]
+            values = np.fromiter(
+                (np.nan if r[i] is None else r[i] for r in rows),
+                dtype=np.float64,
+                count=len(rows),
+            )
+            old = self.columns[name]
+            if np.array_equal(old[pos], values, equal_nan=True):
+                continue
+            col = np.array(old, dtype=np.float64)
+            col[pos] = values
+            table.columns[name] = col
+        return table
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def resolve_column(self, name: str) -> str:
+        """Map a user-supplied column name (any case, or its attribute name) to a column."""
+        wanted = name.strip().lower()
+        for col in self.columns:
+            if col.lower() == wanted:
+                return col
+        i = self.schema.attr_index.get(StockSchema.sanitize_key(name))
+        if i is not None and self.schema.columns[i] in self.columns:
+            return self.schema.columns[i]
+        raise KeyError(
+            f"Unknown numeric column '{name}'. Available: {', '.join(self.columns)}"
+        )
+
+    @staticmethod
+    def parse_condition(text: str) -> List[Condition]:
+        """Parse 'Volume > 1e6' or 'LTP between 100 and 500' into conditions."""
+        m = _BETWEEN_RE.match(text)
+        if m:
+            col, lo, hi = m.groups()
+            return [(col, ">=", _operand(lo, text)), (col, "<=", _operand(hi, text))]
+        m = _CONDITION_RE.match(text)
+        if not m:
+            raise ValueError(f"Could not parse condition '{text}'")
+        col, op, value = m.groups()
+        return [(col, op, _operand(value, text))]
+
+    def screen(
+        self,
+        conditions: Iterable[Condition] = (),
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        limit: Optional[int] = 10,
+    ) -> np.ndarray:
+        """
+        Return the row positions matching every condition, optionally sorted.
+
+        Rows with a missing value in a filtered or sort column never match.
+        """
+        mask = np.ones(len(self.names), dtype=bool)
+        for col, op, value in conditions:
+            values = self.columns[self.resolve_column(col)]
+            # NaN != x is True, so missing cells are excluded explicitly
+            mask &= ~np.isnan(values)
+            with np.errstate(invalid="ignore"):
+                mask &= _OPS[op](values, value)
+
+        if sort_by is None:
+            idx = np.flatnonzero(mask)
+            return idx[:limit] if limit is not None else idx
+
+        keys = self.columns[self.resolve_column(sort_by)]
+        mask &= ~np.isnan(keys)
+        idx = np.flatnonzero(mask)
+        ordered = -keys[idx] if descending else keys[idx]
+
+        if limit is not None and limit < len(idx):
+            top = np.argpartition(ordered, limit)[:limit]
+            return idx[top[np.argsort(ordered[top], kind="stable")]]
+        return idx[np.argsort(ordered, kind="stable")]
@@ -0,0 +1,377 @@
+import re
+import heapq
+import threading
+from bisect import bisect_left
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9&]+")
+
+# Match quality for a query token against an indexed token
+_EXACT = 3.0
+_PREFIX = 2.0
+_FUZZY = (0.0, 1.0, 0.5)  # indexed by edit distance
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Edit distance between `a` and `b`, or None if it exceeds `max_distance`."""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if len(a) > len(b):
+        a, b = b, a
+    previous = list(range(len(a) + 1))
+    for i, cb in enumerate(b, 1):
+        current = [i]
+        row_min = left = i
+        for j, ca in enumerate(a, 1):
+            # min() is avoided on purpose: this loop is the search hot path
+            cost = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if left + 1 < cost:
+                cost = left + 1
+            current.append(cost)
+            left = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_distance:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+class SearchIndex:
+    """
+    A token-level company search index with typo tolerance.
+
+    Every word of a company's name (and any aliases such as its symbol) is
+    indexed, so "bank" finds "HDFC Bank". Misspelled words are matched with a
+    symmetric-delete index verified by a bounded Levenshtein distance, and
+    results are ranked by match quality, then by whether the name starts with
+    the query, then by score (e.g. traded volume).
+    """
+
+    def __init__(self, max_distance: int = 2, max_prefix_expansions: int = 256):
+        self.max_distance = max_distance
+        self.max_prefix_expansions = max_prefix_expansions
+        self._names: List[str] = []
+        self._scores: List[float] = []
+        self._docs: Dict[str, int] = {}
+        # Tokens each doc is indexed under, to find the lists a change touches
+        self._doc_tokens: List[Tuple[str, ...]] = []
+        # Docs of removed names; filtered out at query time
+        self._removed: Set[int] = set()
+        self._postings: Dict[str, Set[int]] = {}
+        # Deletion variant -> tokens, for fuzzy matching. Built on the first
+        # fuzzy lookup (or `warm`), not per `add`: it is most of the build cost
+        self._deletes: Optional[Dict[str, Set[str]]] = None
+        self._deletes_lock = threading.Lock()
+        # Keys whose sets this index may mutate; None means all of them.
+        # Indexes derived with `updated` share the other sets with their base.
+        self._owned_postings: Optional[Set[str]] = None
+        self._owned_deletes: Optional[Set[str]] = None
+        self._sorted_tokens: Optional[List[str]] = None
+        # token -> (docs where it is the leading word, other docs), each
+        # sorted by descending score; built lazily, then carried over by
+        # `updated` with only the changed tokens re-sorted
+        self._ranked: Optional[Dict[str, Tuple[List[int], List[int]]]] = None
+
+    def __len__(self) -> int:
+        return len(self._names) - len(self._removed)
+
+    @property
+    def removed_ratio(self) -> float:
+        """Share of indexed docs that are tombstones of removed names."""
+        return len(self._removed) / len(self._names) if self._names else 0.0
+
+    def _distance_for(self, token: str) -> int:
+        """Allowed edits for a token; short tokens must match exactly."""
+        if len(token) < 3:
+            return 0
+        if len(token) < 6:
+            return min(1, self.max_distance)
+        return self.max_distance
+
+    @staticmethod
+    def _deletions(token: str, distance: int) -> Set[str]:
+        """`token` and every non-empty string left by deleting up to `distance` characters."""
+        variants = {token}
+        frontier = variants
+        for _ in range(distance):
+            frontier = {
+                w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))
+            }
+            variants |= frontier
+        return variants
+
+    def _deletes_table(self) -> Dict[str, Set[str]]:
+        deletes = self._deletes
+        if deletes is not None:
+            return deletes
+        with self._deletes_lock:
+            if self._deletes is None:
+                deletes = {}
+                for token in self._postings:
+                    for variant in self._deletions(token, self._distance_for(token)):
+                        tokens = deletes.get(variant)
+                        if tokens is None:
+                            deletes[variant] = {token}
+                        else:
+                            tokens.add(token)
+                self._owned_deletes = None
+                self._deletes = deletes
+            return self._deletes
+
+    def warm(self):
+        """Build the lazily built fuzzy and ranking tables ahead of the first query."""
+        self._deletes_table()
+        self._ranked_postings()
+
+    def add(self, name: str, score: Optional[float] = None, aliases: Iterable[str] = ()):
+        """Index `name` under each of its words and those of its aliases."""
+        doc = len(self._names)
+        self._names.append(name)
+        self._scores.append(score if score is not None else float("-inf"))
+        self._docs[name] = doc
+        self._ranked = None
+        tokens = set(tokenize(name)).union(*(tokenize(a) for a in aliases))
+        self._doc_tokens.append(tuple(tokens))
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                if self._deletes is not None:
+                    for variant in self._deletions(token, self._distance_for(token)):
+                        self._own(self._deletes, self._owned_deletes, variant).add(token)
+                self._sorted_tokens = None
+            else:
+                postings = self._own(self._postings, self._owned_postings, token)
+            if self._owned_postings is not None:
+                self._owned_postings.add(token)
+            postings.add(doc)
+
+    @staticmethod
+    def _own(table: Dict[str, Set], owned: Optional[Set[str]], key: str) -> Set:
+        """The set at `table[key]`, copied first if it is shared with another index."""
+        current = table.get(key)
+        if owned is None:
+            if current is None:
+                current = table[key] = set()
+            return current
+        if key not in owned:
+            current = table[key] = set(current) if current is not None else set()
+            owned.add(key)
+        return current
+
+    def updated(
+        self,
+        scores: Dict[str, Optional[float]],
+        removed: Iterable[str] = (),
+        added: Sequence[Tuple[str, Optional[float], Iterable[str]]] = (),
+    ) -> "SearchIndex":
+        """
+        A new index with changed scores, removed names and added names.
+
+        `self` is left untouched and keeps answering queries: the copy shares
+        every posting and deletion set it does not modify, and removed names
+        only become tombstones. Rebuild from scratch once `removed_ratio`
+        grows large. If `self` has ranked its postings, only the lists of
+        tokens whose docs changed are re-sorted for the copy.
+        """
+        new = SearchIndex(self.max_distance, self.max_prefix_expansions)
+        new._names = list(self._names)
+        new._scores = list(self._scores)
+        new._docs = dict(self._docs)
+        new._doc_tokens = list(self._doc_tokens)
+        new._removed = set(self._removed)
+        new._postings = dict(self._postings)
+        new._deletes = dict(self._deletes) if self._deletes is not None else None
+        new._owned_postings = set()
+        new._owned_deletes = set()
+        new._sorted_tokens = self._sorted_tokens
+        changed: List[int] = []
+        for name, score in scores.items():
+            doc = new._docs.get(name)
+            if doc is not None:
+                value = score if score is not None else float("-inf")
+                if new._scores[doc] != value:
+                    new._scores[doc] = value
+                    changed.append(doc)
+        for name in removed:
+            doc = new._docs.pop(name, None)
+            if doc is not None:
+                new._removed.add(doc)
+                changed.append(doc)
+        first_added = len(new._names)
+        for name, score, aliases in added:
+            new.add(name, score, aliases)
+        changed.extend(range(first_added, len(new._names)))
+        if self._sorted_tokens is not None and new._sorted_tokens is None:
+            fresh = {t for doc in range(first_added, len(new._names)) for t in new._doc_tokens[doc]}
+            new._sorted_tokens = list(
+                heapq.merge(self._sorted_tokens, sorted(fresh.difference(self._postings)))
+            )
+        if self._ranked is not None:
+            new._ranked = new._reranked(self._ranked, changed, first_added)
+        return new
+
+    def _reranked(
+        self,
+        base: Dict[str, Tuple[List[int], List[int]]],
+        changed: Iterable[int],
+        first_added: int,
+    ) -> Dict[str, Tuple[List[int], List[int]]]:
+        """`base` with the lists of every token of the `changed` docs re-sorted."""
+        dirty: Set[str] = set()
+        added: Dict[str, List[int]] = {}
+        for doc in changed:
+            tokens = self._doc_tokens[doc]
+            dirty.update(tokens)
+            if doc >= first_added:
+                for token in tokens:
+                    added.setdefault(token, []).append(doc)
+        ranked = dict(base)
+        for token in dirty:
+            lead, rest = base.get(token, ((), ()))
+            # Starting from the previous order, the sort mostly merges runs
+            ranked[token] = self._rank_token(token, chain(lead, rest, added.get(token, ())))
+        return ranked
+
+    def _rank_token(self, token: str, docs: Iterable[int]) -> Tuple[List[int], List[int]]:
+        """Split live `docs` by whether `token` leads the name, each by descending score."""
+        names, scores, removed = self._names, self._scores, self._removed
+        lead: List[int] = []
+        rest: List[int] = []
+        for doc in docs:
+            if doc not in removed:
+                (lead if names[doc].lower().startswith(token) else rest).append(doc)
+        by_score = lambda doc: -scores[doc]  # noqa: E731
+        lead.sort(key=by_score)
+        rest.sort(key=by_score)
+        return lead, rest
+
+    def _ranked_postings(self) -> Dict[str, Tuple[List[int], List[int]]]:
+        if self._ranked is None:
+            self._ranked = {
+                token: self._rank_token(token, docs) for token, docs in self._postings.items()
+            }
+        return self._ranked
+
+    def _prefix_tokens(self, prefix: str) -> List[str]:
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        tokens = self._sorted_tokens
+        out = []
+        i = bisect_left(tokens, prefix)
+        while i < len(tokens) and tokens[i].startswith(prefix):
+            out.append(tokens[i])
+            if len(out) >= self.max_prefix_expansions:
+                break
+            i += 1
+        return out
+
+    def _direct_matches(self, q: str) -> Dict[str, float]:
+        """Indexed tokens equal to or extending query token `q`."""
+        matches: Dict[str, float] = {}
+        if q in self._postings:
+            matches[q] = _EXACT
+        for token in self._prefix_tokens(q):
+            matches.setdefault(token, _PREFIX)
+        return matches
+
+    def _fuzzy_matches(self, q: str, exclude: Dict[str, float]) -> Dict[str, float]:
+        """Indexed tokens within the allowed edit distance of `q`."""
+        matches: Dict[str, float] = {}
+        distance = self._distance_for(q)
+        if not distance:
+            return matches
+        deletes = self._deletes_table()
+        candidates: Set[str] = set()
+        for variant in self._deletions(q, distance):
+            candidates.update(deletes.get(variant, ()))
+        for token in candidates:
+            if token in exclude:
+                continue
+            d = bounded_levenshtein(q, token, distance)
+            if d is not None:
+                matches[token] = _FUZZY[d]
+        return matches
+
+    def _match_token(self, q: str) -> Dict[str, float]:
+        """Indexed tokens matching query token `q`, with their match quality."""
+        matches = self._direct_matches(q)
+        matches.update(self._fuzzy_matches(q, matches))
+        return matches
+
+    def _search_single(self, q: str, limit: int) -> List[str]:
+        """
+        Fast path for one-word queries.
+
+        Matching tokens are grouped by match quality, and each group's
+        score-sorted postings are merged lazily, so only about `limit` docs
+        are touched even when a short prefix matches thousands of names.
+        Fuzzy candidates are only verified when exact and prefix matches
+        cannot fill the result.
+        """
+        ranked = self._ranked_postings()
+        scores = self._scores
+        results: List[int] = []
+        seen: Set[int] = set()
+
+        def take(matches: Dict[str, float]) -> bool:
+            buckets: Dict[float, List[str]] = {}
+            for token, quality in matches.items():
+                buckets.setdefault(quality, []).append(token)
+            for quality in sorted(buckets, reverse=True):
+                for part in (0, 1):
+                    lists = [ranked[t][part] for t in buckets[quality]]
+                    for doc in heapq.merge(*lists, key=lambda d: -scores[d]):
+                        if doc in seen:
+                            continue
+                        seen.add(doc)
+                        results.append(doc)
+                        if len(results) >= limit:
+                            return True
+            return False
+
+        direct = self._direct_matches(q)
+        if not take(direct):
+            take(self._fuzzy_matches(q, direct))
+        return [self._names[d] for d in results]
+
+    def search(self, query: str, limit: int = 5) -> List[str]:
+        """Return up to `limit` names ranked by how well they match `query`."""
+        q_tokens = list(dict.fromkeys(tokenize(query)))
+        if not q_tokens:
+            return []
+        if len(q_tokens) == 1:
+            return self._search_single(q_tokens[0], limit)
+
+        # doc -> (query tokens matched, summed match quality)
+        hits: Dict[int, Tuple[int, float]] = {}
+        for q in q_tokens:
+            best: Dict[int, float] = {}
+            for token, quality in self._match_token(q).items():
+                for doc in self._postings[token]:
+                    if doc in self._removed:
+                        continue
+                    if quality > best.get(doc, 0.0):
+                        best[doc] = quality
+            for doc, quality in best.items():
+                matched, total = hits.get(doc, (0, 0.0))
+                hits[doc] = (matched + 1, total + quality)
+
+        if not hits:
+            return []
+        phrase = " ".join(q_tokens)
+        names, scores = self._names, self._scores
+
+        def rank(doc: int) -> Tuple[int, float, bool, float]:
+            matched, total = hits[doc]
+            return matched, total, names[doc].lower().startswith(phrase), scores[doc]
+
+        return [names[d] for d in heapq.nlargest(limit, hits, key=rank)]
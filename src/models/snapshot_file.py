@@ -0,0 +1,215 @@
+import os
+import json
+import math
+import mmap
+import time
+import struct
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from models.compact_trie import CompactTrie
+from models.stock_schema import StockSchema
+
+_MAGIC = b"STKSNAP1"
+_PREAMBLE = struct.Struct("<8sQ")  # magic, metadata length
+_ALIGN = 8
+FORMAT_VERSION = 2
+
+
+def _padding(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+def _string_column(values: Sequence[str]) -> Tuple[bytes, bytes]:
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = array("q", [0])
+    for b in encoded:
+        offsets.append(offsets[-1] + len(b))
+    return offsets.tobytes(), b"".join(encoded)
+
+
+def write_snapshot(
+    path: str,
+    header: Sequence[str],
+    raw_rows: Sequence[Sequence[Any]],
+    rank_by: str = "Volume",
+) -> int:
+    """
+    Parse a scraped table once and write it as a typed, memory-mappable file.
+
+    Numeric columns are stored as float64 arrays (NaN for missing cells),
+    text columns as offset + UTF-8 blob pairs, and the lower-cased company
+    names and their CompactTrie are stored prebuilt. Returns the row count.
+    """
+    schema = StockSchema.infer(header, raw_rows)
+    name_idx = schema.index.get("Name")
+    rank_idx = schema.index.get(rank_by)
+    if rank_idx not in schema.numeric:
+        rank_idx = None
+
+    rows: List[Tuple[Any, ...]] = []
+    names: List[str] = []
+    seen = set()
+    for raw in raw_rows:
+        row = schema.parse_row(raw)
+        name = str(row[name_idx]).lower() if name_idx is not None else ""
+        if name and name not in seen:
+            seen.add(name)
+            rows.append(row)
+            names.append(name)
+
+    sections: List[bytes] = []
+    offset = 0
+
+    def add(data: bytes) -> List[int]:
+        nonlocal offset
+        where = [offset, len(data)]
+        sections.append(data + b"\0" * _padding(len(data)))
+        offset += len(data) + _padding(len(data))
+        return where
+
+    columns_meta = []
+    for i, col in enumerate(schema.columns):
+        values = [r[i] for r in rows]
+        if i in schema.numeric:
+            kind = "int" if all(v is None or isinstance(v, int) for v in values) else "float"
+            data = np.array(
+                [math.nan if v is None else v for v in values], dtype="<f8"
+            ).tobytes()
+            columns_meta.append({"name": col, "kind": kind, "data": add(data)})
+        else:
+            offsets, blob = _string_column(["" if v is None else str(v) for v in values])
+            columns_meta.append(
+                {"name": col, "kind": "str", "offsets": add(offsets), "data": add(blob)}
+            )
+
+    name_offsets, name_blob = _string_column(names)
+    scores = {n: (r[rank_idx] if rank_idx is not None else None) for n, r in zip(names, rows)}
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "created_at": time.time(),
+        "rows": len(rows),
+        "ranked": rank_idx is not None,
+        "rank_by": rank_by,
+        "columns": columns_meta,
+        "names": {"offsets": add(name_offsets), "data": add(name_blob)},
+        "trie": add(CompactTrie.build(names, scores).to_bytes()),
+    }
+
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    base = _PREAMBLE.size + len(meta_bytes) + _padding(_PREAMBLE.size + len(meta_bytes))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(_MAGIC, len(meta_bytes)))
+        f.write(meta_bytes)
+        f.write(b"\0" * (base - _PREAMBLE.size - len(meta_bytes)))
+        for data in sections:
+            f.write(data)
+    os.replace(tmp, path)
+    return len(rows)
+
+
+class SnapshotFile:
+    """
+    A memory-mapped snapshot written by `write_snapshot`.
+
+    Numeric columns are exposed as zero-copy NumPy arrays and rows are only
+    materialized when looked up, so opening a snapshot parses no cell text.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, meta_len = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a market snapshot file")
+        self.meta: Dict[str, Any] = json.loads(
+            self._mmap[_PREAMBLE.size : _PREAMBLE.size + meta_len].decode("utf-8")
+        )
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(
+                f"Unsupported snapshot format version {self.meta.get('format_version')}"
+            )
+        self._base = _PREAMBLE.size + meta_len + _padding(_PREAMBLE.size + meta_len)
+        self._view = memoryview(self._mmap)
+
+        self.rows: int = self.meta["rows"]
+        self.created_at: float = self.meta["created_at"]
+        self.ranked: bool = self.meta["ranked"]
+        self.rank_by: str = self.meta["rank_by"]
+        columns = self.meta["columns"]
+        self.schema = StockSchema(
+            [c["name"] for c in columns],
+            [c["name"] for c in columns if c["kind"] != "str"],
+        )
+        self._kinds = [c["kind"] for c in columns]
+        self._numeric: Dict[str, np.ndarray] = {}
+        self._text: Dict[int, Tuple[memoryview, memoryview]] = {}
+        for i, c in enumerate(columns):
+            if c["kind"] == "str":
+                self._text[i] = (self._section(c["offsets"]).cast("q"), self._section(c["data"]))
+            else:
+                self._numeric[c["name"]] = np.frombuffer(
+                    self._section(c["data"]), dtype="<f8", count=self.rows
+                )
+        name_offsets = self._section(self.meta["names"]["offsets"]).cast("q")
+        name_blob = self._section(self.meta["names"]["data"])
+        self.names: List[str] = [
+            bytes(name_blob[name_offsets[i] : name_offsets[i + 1]]).decode("utf-8")
+            for i in range(self.rows)
+        ]
+
+    def _section(self, where: Sequence[int]) -> memoryview:
+        start = self._base + where[0]
+        return self._view[start : start + where[1]]
+
+    @property
+    def numeric_columns(self) -> Dict[str, np.ndarray]:
+        return self._numeric
+
+    def trie(self) -> CompactTrie:
+        return CompactTrie.from_buffer(self._section(self.meta["trie"]))
+
+    def text_column(self, name: str) -> List[str]:
+        """Every cell of text column `name`, in row order."""
+        offsets, blob = self._text[self.schema.index[name]]
+        data = bytes(blob)
+        return [data[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(self.rows)]
+
+    def row(self, i: int) -> Tuple[Any, ...]:
+        """Materialize row `i` as a tuple laid out by `schema`."""
+        out: List[Any] = []
+        for col, kind in enumerate(self._kinds):
+            if kind == "str":
+                offsets, blob = self._text[col]
+                out.append(bytes(blob[offsets[i] : offsets[i + 1]]).decode("utf-8"))
+            else:
+                v = float(self._numeric[self.schema.columns[col]][i])
+                out.append(None if math.isnan(v) else int(v) if kind == "int" else v)
+        return tuple(out)
+
+
+class SnapshotRows(Mapping):
+    """A name -> row mapping over a SnapshotFile, materializing rows on access."""
+
+    def __init__(self, snapshot_file: SnapshotFile):
+        self.file = snapshot_file
+        self._index = {name: i for i, name in enumerate(snapshot_file.names)}
+
+    def __getitem__(self, name: str) -> Tuple[Any, ...]:
+        return self.file.row(self._index[name])
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
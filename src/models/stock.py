@@ -1,34 +1,73 @@
-import re
-import weakref
-import hashlib
-import logging
 import asyncio
-from typing import Dict, Any, Optional
+import logging
+from functools import lru_cache
+from typing import Dict, Any, Iterable, Optional, Sequence, Tuple
 from urllib.parse import urlparse
-from concurrent.futures import ThreadPoolExecutor, Future
+from concurrent.futures import Future
 from datetime import datetime
 import threading
 
-from utils.scrapper import CompanyScraper
+from models.company_profile import CompanyProfile
+from models.stock_schema import StockSchema
+from utils.content_cache import CachedPage, ContentCache
+from utils.crawler_pool import CrawlerPool
+from utils.metrics import incr, span
+from utils import scrape_scheduler
+from utils.scrape_scheduler import ScrapeScheduler
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=32)
+def _schema_for_keys(keys: Tuple[str, ...]) -> StockSchema:
+    return StockSchema(keys)
+
+
+class _ScrapeState:
+    """Synchronization and results for a detail scrape, allocated on demand."""
+
+    __slots__ = ("lock", "ready", "future", "details")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.future: Optional[Future] = None
+        self.details: Dict[str, Any] = {}
+
+
 class Stock:
-    _executor = ThreadPoolExecutor(max_workers=4)
+    """
+    A single row of the market table.
+
+    Column values are held in a tuple laid out by a StockSchema shared by
+    every row of the same table; sanitized column names are available as
+    attributes (e.g. `stock.ltp`).
+    """
+
+    __slots__ = ("_schema", "_values", "_url", "_lazy", "_needs_scrape", "_scrape", "__weakref__")
 
-    def __init__(self, **sanitized_fields: Any):
-        self._lock = threading.Lock()
-        self._data: Dict[str, Any] = {}
-        self._key_map: Dict[str, str] = {}
+    # Keys that only exist once the detail page has been scraped
+    DETAIL_KEYS = ("fundamentals", "scraped_at", "scrape_error")
+    # Guards lazy allocation of per-stock scrape state
+    _state_lock = threading.Lock()
+
+    def __init__(self, schema: StockSchema, values: Sequence[Any], lazy: bool = False):
+        self._schema = schema
+        self._values = tuple(values)
         self._url: str = ""
-        self._scrape_future: Optional[Future] = None
-        self._content_ready = threading.Event()
-        self._content_ready.set()  # Initially set since no URL means no scraping needed
+        self._lazy = lazy
+        self._needs_scrape = False
+        self._scrape: Optional[_ScrapeState] = None
+
+    def __getattr__(self, name: str) -> Any:
+        i = self._schema.attr_index.get(name)
+        if i is None:
+            raise AttributeError(name)
+        return self._values[i]
 
-        # set sanitized attributes for convenience
-        for k, v in sanitized_fields.items():
-            setattr(self, k, v)
+    @property
+    def schema(self) -> StockSchema:
+        return self._schema
 
     @property
     def url(self) -> str:
@@ -37,95 +76,167 @@ class Stock:
 
     @url.setter
     def url(self, value: str):
-        """Set the URL and trigger asynchronous scraping if valid."""
+        """Set the URL and trigger asynchronous scraping if valid.
+
+        In lazy mode scraping is deferred until the content is first requested.
+        """
         if value != self._url and self._is_valid_url(value):
             self._url = value
-            self._content_ready.clear()  # Reset the event
-            self._start_scraping()
-
-    def _start_scraping(self):
-        """Start asynchronous scraping task."""
-        if self._scrape_future and not self._scrape_future.done():
-            self._scrape_future.cancel()
-        
-        self._scrape_future = self._executor.submit(self._sync_scrape_wrapper)
-
-    def _sync_scrape_wrapper(self):
-        """Synchronous wrapper for the async scraping method."""
-        loop = None
+            self._needs_scrape = True
+            if not self._lazy:
+                self.fetch_details(interactive=False)
+
+    def fetch_details(self, interactive: bool = True):
+        """
+        Start scraping the detail page unless it was already requested.
+
+        `interactive` scrapes are ones a user is waiting on; they are
+        scheduled ahead of speculative ones, and promote one already queued.
+        """
+        if not self._needs_scrape:
+            if interactive and self.is_scraping():
+                ScrapeScheduler.instance().promote(self._url)
+            return
+        with self._state_lock:
+            if self._scrape is None:
+                self._scrape = _ScrapeState()
+        with self._scrape.lock:
+            if not self._needs_scrape:
+                return
+            self._needs_scrape = False
+            self._scrape.ready.clear()  # Reset the event
+            # Set before the lock is released, so the scrape is never seen as
+            # requested yet not running; settled once its result is recorded
+            future = self._scrape.future = Future()
+        self._start_scraping(future, interactive)
+
+    @classmethod
+    def prefetch(cls, stocks: Iterable["Stock"]):
+        """Start detail scraping for every stock so the fetches overlap."""
+        for stock in stocks:
+            stock.fetch_details()
+
+    @classmethod
+    async def aprefetch(cls, stocks: Iterable["Stock"], timeout: Optional[float] = None) -> int:
+        """
+        Scrape every stock's details concurrently and await them together,
+        for at most `timeout` seconds overall. Returns how many have their
+        details; rejected or failed scrapes do not count.
+        """
+        stocks = list(stocks)
+        cls.prefetch(stocks)
+        await asyncio.gather(*(s.await_content(timeout) for s in stocks))
+        return sum(s.details_ready() for s in stocks)
+
+    async def await_content(self, timeout: Optional[float] = None) -> bool:
+        """
+        Async `wait_for_content`; a timeout leaves the scrape running.
+        A failed scrape counts as finished, like in `wait_for_content`.
+        """
+        self.fetch_details()
+        state = self._scrape
+        if not self.is_scraping():
+            return True
+        with span("stock.detail_wait"):
+            try:
+                # Shielded so giving up here does not cancel the crawl, whose
+                # result still lands in the content cache.
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(state.future)), timeout)
+            except asyncio.TimeoutError:
+                incr("detail_wait_timeouts")
+                return False
+            except asyncio.CancelledError:
+                if state.future.cancelled():
+                    return False
+                raise
+            except Exception:
+                pass  # `_on_scraped` recorded it as the scrape_error
+        return True
+
+    def _start_scraping(self, future: Future, interactive: bool = True):
+        """Queue the detail page on the shared scrape scheduler."""
+        # A cached page needs no scrape at all; a miss is counted by the
+        # scheduler's fetch through the cache
+        page = ContentCache.instance().get(self._url, count_miss=False)
+        if page is not None:
+            self._set_page(page)
+            future.set_result(page)
+            return
+
+        priority = scrape_scheduler.INTERACTIVE if interactive else scrape_scheduler.PREFETCH
+        url = self._url
+        job = ScrapeScheduler.instance().submit(url, priority)
+        job.add_done_callback(lambda f: self._on_scraped(url, f, future))
+
+    def _set_page(self, page: CachedPage):
+        state = self._scrape
+        with state.lock:
+            state.details.pop("scrape_error", None)
+            # Cached pages hold a compact profile; older entries hold markdown
+            state.details["fundamentals"] = CompanyProfile.loads(page.content)
+            state.details["scraped_at"] = datetime.fromtimestamp(page.scraped_at).isoformat()
+        state.ready.set()  # Signal that content is ready
+
+    def _on_scraped(self, url: str, job: Future, future: Future):
+        """Record the result of a scheduled scrape, then settle `future` like `job`."""
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self._scrape_and_update())
+            if url == self._url:
+                self._record_scrape(url, job)
         finally:
-            if loop:
-                loop.close()
+            if job.cancelled():
+                future.cancel()
+            elif job.exception() is not None:
+                future.set_exception(job.exception())
+            else:
+                future.set_result(job.result())
 
-    async def _scrape_and_update(self):
-        """Scrape content and update data."""
-        try:
-            scrapper = CompanyScraper(self._url)
-            content = await scrapper.scrape()
-            
-            with self._lock:
-                self._data["content"] = content
-                self._data["scraped_at"] = datetime.now().isoformat()
-            
-            self._content_ready.set()  # Signal that content is ready
-            logger.info(f"Successfully scraped content from {self._url}")
-            
-        except Exception as e:
-            logger.error(f"Failed to scrape content from {self._url}: {e}")
-            with self._lock:
-                self._data["scrape_error"] = str(e)
-                self._data["scraped_at"] = datetime.now().isoformat()
-            self._content_ready.set()  # Signal completion even on error
+    def _record_scrape(self, url: str, job: Future):
+        error = "Scrape cancelled" if job.cancelled() else job.exception()
+        if error is None:
+            self._set_page(job.result())
+            logger.info("Loaded content for %s", url)
+            return
+        message = str(error) or type(error).__name__
+        logger.error("Failed to scrape content from %s: %s", url, message)
+        state = self._scrape
+        with state.lock:
+            state.details["scrape_error"] = message
+            state.details["scraped_at"] = datetime.now().isoformat()
+        state.ready.set()  # Signal completion even on error
 
     @staticmethod
     def _sanitize_key(key: str) -> str:
-        if key is None:
-            return "_"
-        s = key.strip().lower()
-        s = re.sub(r"[^0-9a-zA-Z_]", "_", s)
-        if s and s[0].isdigit():
-            s = "_" + s
-        if not s:
-            s = "_"
-        return s
+        return StockSchema.sanitize_key(key)
 
     @classmethod
-    def from_dict(cls, d: Dict[str, Any]) -> "Stock":
-        """Factory: sanitize keys and return a Stock instance."""
-
-        original = dict(d)
-        sanitized: Dict[str, Any] = {}
-        key_map: Dict[str, str] = {}
-        for key, val in original.items():
-            safe = cls._sanitize_key(key)
-            base = safe
-            i = 1
-            while safe in sanitized:
-                safe = f"{base}_{i}"
-                i += 1
-            sanitized[safe] = val
-            key_map[key] = safe
-
-        inst = cls(**sanitized)
-        inst._data = original
-        inst._key_map = key_map
-
-        # assign backing url using property to trigger scraping
-        for candidate in ("URL", "Url", "Link"):
-            if candidate in original and original[candidate] and cls._is_valid_url(original[candidate]):
-                inst.url = original[candidate]  # Use property instead of direct assignment
-                break
+    def from_values(
+        cls, schema: StockSchema, values: Sequence[Any], lazy: bool = False
+    ) -> "Stock":
+        """Factory: build a Stock from a row already parsed by `schema`."""
+        inst = cls(schema, values, lazy=lazy)
+
+        # assign backing url using property to trigger (or defer) scraping
+        if schema.url_index is not None:
+            candidate = inst._values[schema.url_index]
+            if candidate and cls._is_valid_url(candidate):
+                inst.url = candidate  # Use property instead of direct assignment
 
         return inst
 
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any], lazy: bool = False) -> "Stock":
+        """Factory: sanitize keys and return a Stock instance.
+
+        With `lazy=True` the detail page is only scraped on first access.
+        """
+        schema = _schema_for_keys(tuple(d.keys()))
+        return cls.from_values(schema, tuple(d.values()), lazy=lazy)
+
     @classmethod
     def shutdown_executor(cls, wait: bool = True):
         try:
-            cls._executor.shutdown(wait=wait)
+            ScrapeScheduler.shutdown_instance(wait=wait)
+            CrawlerPool.shutdown_instance(wait=wait)
         except Exception:
             pass
 
@@ -137,44 +248,107 @@ class Stock:
         except Exception:
             return False
 
+    def _details(self) -> Dict[str, Any]:
+        state = self._scrape
+        if state is None:
+            return {}
+        with state.lock:
+            return dict(state.details)
+
     def to_dict(self) -> Dict[str, Any]:
-        return dict(self._data)
+        data = dict(zip(self._schema.columns, self._values))
+        data.update(self._details())
+        if "fundamentals" in data:
+            data["fundamentals"] = data["fundamentals"].to_dict()
+        return data
 
     def get(self, key: str, default: Any = None) -> Any:
-        return self._data.get(key, default)
+        if key in self.DETAIL_KEYS:
+            self.wait_for_content(timeout=30)
+            return self._details().get(key, default)
+        i = self._schema.index.get(key)
+        return self._values[i] if i is not None else default
 
     def is_scraping(self) -> bool:
         """Check if scraping is currently in progress."""
-        return self._scrape_future is not None and not self._scrape_future.done()
+        state = self._scrape
+        # `ready` is set once the result was recorded, after the future finished
+        return state is not None and state.future is not None and not state.ready.is_set()
+
+    def details_ready(self) -> bool:
+        """True once the detail page was scraped successfully, or if there is none."""
+        if self._needs_scrape or self.is_scraping():
+            return False
+        return "scrape_error" not in self._details()
 
     def wait_for_content(self, timeout: Optional[float] = None) -> bool:
         """Wait for scraping to complete. Returns True if content is ready, False if timeout."""
+        self.fetch_details()
         if not self.is_scraping():
             return True
-        return self._content_ready.wait(timeout=timeout)
+        with span("stock.detail_wait"):
+            ready = self._scrape.ready.wait(timeout=timeout)
+        if not ready:
+            incr("detail_wait_timeouts")
+        return ready
 
-    def pretty(self) -> str:
-        """Return a pretty-printed string representation of the stock data."""
+    @staticmethod
+    def _format_value(v: Any) -> str:
+        return "" if v is None else str(v)
+
+    def summary(self) -> str:
+        """Return the table columns on a single line, without scraped details."""
+        url_index = self._schema.url_index
+        return " | ".join(
+            f"{k}: {self._format_value(v)}"
+            for i, (k, v) in enumerate(zip(self._schema.columns, self._values))
+            if i != url_index
+        )
+
+    def pretty(self, timeout: Optional[float] = 30) -> str:
+        """
+        Return a pretty-printed string representation of the stock data,
+        waiting up to `timeout` seconds for the detail page.
+        """
         # If scraping is in progress, wait for it to complete
-        if self._scrape_future and not self._scrape_future.done():
+        if self.is_scraping() or self._needs_scrape:
             logger.info("Waiting for content scraping to complete...")
-            self._content_ready.wait(timeout=30)  # Wait up to 30 seconds
-        
-        # Get the lock
-        with self._lock:
-            if not self._data:
-                return "(no data)"
-            lines = []
-            for k, v in self._data.items():
-                lines.append(f"{k}: {v}")
-            # if we have fetched content, include a short indicator
-            if "content" in self._data:
-                lines.append("\n--- Extracted content snippet (truncated) ---")
-                lines.append((self._data["content"][:500] + ("..." if len(self._data["content"]) > 500 else "")))
-            return "\n".join(lines)
+        self.wait_for_content(timeout=timeout)
+
+        if not self._values:
+            return "(no data)"
+        lines = [
+            f"{k}: {self._format_value(v)}"
+            for k, v in zip(self._schema.columns, self._values)
+        ]
+        details = self._details()
+        profile = details.pop("fundamentals", None)
+        for k, v in details.items():
+            lines.append(f"{k}: {v}")
+        if profile:
+            lines.append("\n--- Fundamentals ---")
+            lines.append(profile.render() or "(none found)")
+            if profile.summary:
+                lines.append(profile.summary)
+        return "\n".join(lines)
+
+    def compact(self, timeout: Optional[float] = 30) -> str:
+        """
+        The table columns, the fundamentals and the page summary on at most
+        three lines, for tool output. Waits up to `timeout` seconds for details.
+        """
+        self.wait_for_content(timeout=timeout)
+        details = self._details()
+        lines = [self.summary()]
+        profile = details.get("fundamentals")
+        if profile:
+            lines.extend(line for line in (profile.render(), profile.summary) if line)
+        elif "scrape_error" in details:
+            lines.append("(company details unavailable)")
+        return "\n".join(lines)
 
     def __str__(self) -> str:
         return self.pretty()
 
     def __repr__(self) -> str:
-        return f"Stock({list(self._data.keys())})"
+        return f"Stock({list(self._schema.columns)})"
@@ -0,0 +1,115 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Placeholders the market table uses for "no value"
+_EMPTY_MARKERS = {"", "-", "--", "n/a", "na"}
+_URL_COLUMNS = ("URL", "Url", "Link")
+
+
+def parse_number(raw: Any) -> Optional[float]:
+    """Parse a table cell like '1,234.50', '-0.75%' or '12e3' into a number."""
+    if raw is None:
+        return None
+    if isinstance(raw, (int, float)):
+        return raw
+    s = str(raw).strip()
+    if s.lower() in _EMPTY_MARKERS:
+        return None
+    s = s.replace(",", "").rstrip("%").strip()
+    try:
+        if re.fullmatch(r"[+-]?\d+", s):
+            return int(s)
+        return float(s)
+    except ValueError:
+        raise ValueError(f"not a number: {raw!r}")
+
+
+def _number_or_none(raw: Any) -> Optional[float]:
+    """`parse_number`, with unparsable cells read as missing."""
+    try:
+        return parse_number(raw)
+    except ValueError:
+        return None
+
+
+class StockSchema:
+    """
+    Column layout shared by every row loaded from one table.
+
+    Sanitized attribute names and numeric column types are computed once per
+    header instead of once per row.
+    """
+
+    __slots__ = ("columns", "attrs", "index", "attr_index", "numeric", "url_index")
+
+    def __init__(self, columns: Sequence[str], numeric: Iterable[str] = ()):
+        self.columns: Tuple[str, ...] = tuple(c.strip() for c in columns)
+        self.index: Dict[str, int] = {c: i for i, c in enumerate(self.columns)}
+        self.numeric = frozenset(self.index[c] for c in numeric if c in self.index)
+
+        attrs: List[str] = []
+        for col in self.columns:
+            safe = base = self.sanitize_key(col)
+            i = 1
+            while safe in attrs:
+                safe = f"{base}_{i}"
+                i += 1
+            attrs.append(safe)
+        self.attrs: Tuple[str, ...] = tuple(attrs)
+        self.attr_index: Dict[str, int] = {a: i for i, a in enumerate(attrs)}
+
+        self.url_index: Optional[int] = next(
+            (self.index[c] for c in _URL_COLUMNS if c in self.index), None
+        )
+
+    @staticmethod
+    def sanitize_key(key: str) -> str:
+        if key is None:
+            return "_"
+        s = key.strip().lower()
+        s = re.sub(r"[^0-9a-zA-Z_]", "_", s)
+        if s and s[0].isdigit():
+            s = "_" + s
+        if not s:
+            s = "_"
+        return s
+
+    @classmethod
+    def infer(cls, header: Sequence[str], rows: Sequence[Sequence[Any]]) -> "StockSchema":
+        """
+        Build a schema, treating a column as numeric if most of its non-empty
+        cells parse; the cells that do not are read as missing values.
+        """
+        numeric = []
+        for i, col in enumerate(header):
+            if col.strip() in _URL_COLUMNS:
+                continue
+            filled = parsed = 0
+            for r in rows:
+                if i >= len(r) or str(r[i]).strip().lower() in _EMPTY_MARKERS:
+                    continue
+                filled += 1
+                if _number_or_none(r[i]) is not None:
+                    parsed += 1
+            if parsed and parsed * 2 > filled:
+                numeric.append(col.strip())
+        return cls(header, numeric)
+
+    def parse_row(self, values: Sequence[Any]) -> Tuple[Any, ...]:
+        """
+        Strip every cell and convert numeric columns, padding short rows.
+        Numeric cells that do not parse become None.
+        """
+        out: List[Any] = []
+        for i in range(len(self.columns)):
+            v = values[i] if i < len(values) else ""
+            if isinstance(v, str):
+                v = v.strip()
+            if i in self.numeric:
+                v = _number_or_none(v)
+            out.append(v)
+        return tuple(out)
+
+    def value(self, values: Sequence[Any], column: str, default: Any = None) -> Any:
+        i = self.index.get(column)
+        return values[i] if i is not None else default
@@ -1,54 +1,123 @@
-from typing import Dict, List
+import heapq
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 class TrieNode:
     """A node in the trie structure."""
 
+    __slots__ = ("children", "is_end_of_word", "word", "score", "top")
+
     def __init__(self):
         self.children: Dict[str, TrieNode] = {}
         self.is_end_of_word = False
+        # The full word and its ranking score, set on terminal nodes only
+        self.word: Optional[str] = None
+        self.score: Optional[float] = None
+        # Cached best-scoring words under this node, as (-score, word) pairs
+        self.top: Optional[List[Tuple[float, str]]] = None
 
 
 class Trie:
     """A trie data structure for efficient string storage and retrieval."""
 
-    def __init__(self):
-        """Initializes the trie with a root node."""
+    def __init__(self, top_k: int = 10, hot_depth: int = 3):
+        """
+        Initializes the trie with a root node.
+
+        Ranked lookups cache the `top_k` best words at every node within
+        `hot_depth` characters of the root, so short prefixes are answered
+        in O(prefix + k).
+        """
         self.root = TrieNode()
+        self.top_k = top_k
+        self.hot_depth = hot_depth
 
-    def insert(self, word: str):
+    def insert(self, word: str, score: Optional[float] = None):
         """
-        Inserts a word into the trie.
+        Inserts a word into the trie, with an optional ranking score.
         Time complexity: O(L), where L is the length of the word.
         """
         current = self.root
+        current.top = None
         for char in word:
             # Get the node for the character, creating it if it doesn't exist
             current = current.children.setdefault(char, TrieNode())
+            # Any cached ranking on the path may now be stale
+            current.top = None
         current.is_end_of_word = True
+        current.word = word
+        current.score = score
 
-    def _find_words_from_node(self, node: TrieNode, prefix: str) -> List[str]:
-        """
-        A helper function to perform a depth-first search from a given node
-        to find all words.
-        """
-        words = []
-        if node.is_end_of_word:
-            words.append(prefix)
-
-        for char, child_node in node.children.items():
-            words.extend(self._find_words_from_node(child_node, prefix + char))
-
+    def starts_with(self, prefix: str) -> bool:
+        """Returns True if some inserted word starts with the whole `prefix`."""
+        current = self.root
+        for char in (prefix or "").strip().lower():
+            current = current.children.get(char)
+            if current is None:
+                return False
+        return current is not self.root
+
+    @staticmethod
+    def _iter_terminals(node: TrieNode) -> Iterator[TrieNode]:
+        """Iterative pre-order walk yielding every terminal node under `node`."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.is_end_of_word:
+                yield current
+            if current.children:
+                stack.extend(reversed(current.children.values()))
+
+    def _find_words_from_node(
+        self, node: TrieNode, limit: Optional[int] = None
+    ) -> List[str]:
+        """Collect words under `node` in trie order, stopping after `limit`."""
+        words: List[str] = []
+        for terminal in self._iter_terminals(node):
+            words.append(terminal.word)  # type: ignore[arg-type]
+            if limit is not None and len(words) >= limit:
+                break
         return words
 
-    def autocomplete(self, prefix: str) -> List[str]:
+    def _collect_top(self, node: TrieNode, k: int) -> List[Tuple[float, str]]:
+        return heapq.nsmallest(
+            k,
+            (
+                (-t.score if t.score is not None else float("inf"), t.word)
+                for t in self._iter_terminals(node)
+            ),
+        )
+
+    def _ranked_words_from_node(
+        self, node: TrieNode, depth: int, limit: Optional[int]
+    ) -> List[str]:
+        """Return the best-scoring words under `node`, highest score first."""
+        if limit is None:
+            ranked = sorted(
+                (-t.score if t.score is not None else float("inf"), t.word)
+                for t in self._iter_terminals(node)
+            )
+        elif depth <= self.hot_depth and limit <= self.top_k:
+            if node.top is None:
+                node.top = self._collect_top(node, self.top_k)
+            ranked = node.top[:limit]
+        else:
+            ranked = self._collect_top(node, limit)
+        return [word for _, word in ranked]
+
+    def autocomplete(
+        self, prefix: str, limit: Optional[int] = None, ranked: bool = False
+    ) -> List[str]:
         """
         Returns a list of words for autocompletion.
 
-        If the prefix is valid, it returns all words starting with it.
+        If the prefix is valid, it returns words starting with it.
         If the prefix is a misspelling, it suggests words based on the
         longest valid part of the prefix.
         If no part of the prefix is valid, it returns an empty list.
+
+        At most `limit` words are returned; the walk stops as soon as they are
+        found. With `ranked=True` words are ordered by their insert score.
         """
         # normalize input
         prefix = (prefix or "").strip().lower()
@@ -58,30 +127,24 @@ class Trie:
         if not prefix:
             return []
 
-        # 1. Traverse the trie to find the node for the prefix
+        # 1. Traverse the trie to find the node for the prefix. If a character
+        # is not found, the full prefix doesn't exist and we fall back to the
+        # longest valid part of it.
         current = self.root
-        longest_valid_prefix_node = None
-        longest_valid_prefix_str = ""
-
-        for i, char in enumerate(prefix):
-            if char in current.children:
-                current = current.children[char]
-                # Keep track of the last valid node and prefix string
-                longest_valid_prefix_node = current
-                longest_valid_prefix_str = prefix[: i + 1]
-            else:
-                # 2. If a character is not found, the full prefix doesn't exist.
-                # If no part of the prefix was valid (e.g. first char mismatch),
-                # return an empty list instead of returning everything under
-                # the root. Otherwise, return suggestions for the longest
-                # valid prefix found so far.
-                if longest_valid_prefix_str == "" or longest_valid_prefix_node is None:
-                    return []
-
-                return self._find_words_from_node(
-                    longest_valid_prefix_node, longest_valid_prefix_str
-                )
-
-        # 3. If the loop completes, the entire prefix is valid.
-        # Find all words starting from this prefix node.
-        return self._find_words_from_node(current, prefix)
+        depth = 0
+        for char in prefix:
+            child = current.children.get(char)
+            if child is None:
+                break
+            current = child
+            depth += 1
+
+        # 2. If no part of the prefix was valid (e.g. first char mismatch),
+        # return an empty list instead of returning everything under the root.
+        if depth == 0:
+            return []
+
+        # 3. Find words starting from the deepest valid prefix node.
+        if ranked:
+            return self._ranked_words_from_node(current, depth, limit)
+        return self._find_words_from_node(current, limit)
@@ -0,0 +1,283 @@
+import os
+import json
+import uuid
+import asyncio
+import logging
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.types import Receive, Scope, Send
+
+import agent as stock_agent
+from utils.metrics import Metrics
+from utils.scrape_scheduler import ScrapeScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class Admission:
+    """
+    Bounds concurrent agent runs and the queue waiting for them.
+
+    At most `max_concurrency` requests run at once and at most `max_queue`
+    wait for a slot; anything beyond that is rejected immediately so load
+    spikes turn into fast 429s instead of unbounded latency.
+    """
+
+    def __init__(self, max_concurrency: int = 16, max_queue: int = 64):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.running = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def try_enter(self) -> Optional["Admitted"]:
+        """Reserve a place in the queue, or return None if it is full."""
+        if self.waiting >= self.max_queue and self._slots.locked():
+            self.rejected += 1
+            return None
+        self.waiting += 1
+        return Admitted(self)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+        }
+
+
+class Admitted:
+    """
+    One admitted request: queued until `start`, then holding a slot.
+
+    `leave` gives back whichever it holds and must be called exactly once
+    the request is over, however it ended; later calls do nothing.
+    """
+
+    __slots__ = ("_admission", "_running", "_left")
+
+    def __init__(self, admission: Admission):
+        self._admission = admission
+        self._running = False
+        self._left = False
+
+    async def start(self):
+        """Wait for a run slot."""
+        admission = self._admission
+        await admission._slots.acquire()
+        if self._left:  # left while waiting
+            admission._slots.release()
+            return
+        admission.waiting -= 1
+        admission.running += 1
+        self._running = True
+
+    def leave(self):
+        if self._left:
+            return
+        self._left = True
+        admission = self._admission
+        if self._running:
+            admission.running -= 1
+            admission._slots.release()
+        else:
+            admission.waiting -= 1
+
+
+class _AdmittedStream(StreamingResponse):
+    """
+    A streaming response that leaves its admission once it is done.
+
+    Starlette always calls the response an endpoint returned, even when the
+    client is gone before its body starts, so this is the one place where
+    the request is sure to end.
+    """
+
+    def __init__(self, admitted: Admitted, content: AsyncIterator[str], **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self.admitted = admitted
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.admitted.leave()
+
+
+async def _with_deadline(items: AsyncIterator[Any], timeout: float) -> AsyncIterator[Any]:
+    """Re-yield `items`, raising asyncio.TimeoutError once `timeout` seconds have passed."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    iterator = items.__aiter__()
+    while True:
+        try:
+            item = await asyncio.wait_for(iterator.__anext__(), deadline - loop.time())
+        except StopAsyncIteration:
+            return
+        yield item
+
+
+def _event(kind: str, **data: Any) -> str:
+    """One server-sent event line."""
+    return f"data: {json.dumps({'type': kind, **data})}\n\n"
+
+
+def create_app(
+    graph=None,
+    max_concurrency: int = 16,
+    max_queue: int = 64,
+    request_timeout: float = 120.0,
+    refresh: bool = True,
+) -> Starlette:
+    """
+    Build the ASGI app.
+
+    Every session shares the loaded stock service, the crawler pool and one
+    compiled agent graph; conversations are kept apart by using the session
+    id as the graph's `thread_id`. The graph is compiled on startup unless
+    one is passed in (e.g. with a fake model for load tests).
+    """
+    admission = Admission(max_concurrency, max_queue)
+    # Turns of one session run one at a time so its history stays ordered
+    session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+    state: Dict[str, Any] = {"graph": graph}
+    Metrics.instance().register_collector("admission", admission.stats)
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        if state["graph"] is None:
+            state["graph"] = stock_agent.build_agent()
+        if refresh:
+            # Serve the snapshot loaded from disk while the first refresh runs
+            stock_agent.sa.start_background_refresh()
+        try:
+            yield
+        finally:
+            if refresh:
+                stock_agent.sa.shutdown()
+
+    async def stream_answer(
+        admitted: Admitted, message: str, session_id: str
+    ) -> AsyncIterator[str]:
+        lock = session_locks.get(session_id)
+        if lock is None:
+            lock = session_locks[session_id] = asyncio.Lock()
+        config = stock_agent.run_config(session_id)
+        try:
+            await admitted.start()
+        except asyncio.CancelledError:
+            return
+        try:
+            async with lock:
+                yield _event("session", session_id=session_id)
+                direct = await stock_agent.sa.aanswer_directly(message)
+                if direct is not None:
+                    await stock_agent.remember_exchange(state["graph"], config, message, direct)
+                    yield _event("token", content=direct)
+                    yield _event("done", routed=True)
+                    return
+                stream = state["graph"].astream(
+                    {"messages": [{"role": "user", "content": message}]},
+                    config,
+                    stream_mode="messages",
+                )
+                async for chunk, _ in _with_deadline(stream, request_timeout):
+                    if isinstance(chunk, ToolMessage):
+                        yield _event("tool", name=chunk.name)
+                    elif isinstance(chunk, (AIMessageChunk, AIMessage)) and chunk.content:
+                        yield _event("token", content=chunk.content)
+            yield _event("done")
+        except asyncio.TimeoutError:
+            yield _event("error", message="The request timed out.")
+        except Exception as e:
+            logger.exception("Agent run failed for session %s", session_id)
+            yield _event("error", message=str(e))
+        finally:
+            # Frees the slot as soon as the answer is done; the response
+            # leaves again on its way out, which is then a no-op
+            admitted.leave()
+
+    async def chat(request: Request):
+        try:
+            body = await request.json()
+            message = str(body["message"]).strip()
+        except (ValueError, KeyError, TypeError):
+            return JSONResponse({"error": "Expected a JSON body with a 'message'."}, 400)
+        if not message:
+            return JSONResponse({"error": "'message' must not be empty."}, 400)
+        session_id = str(body.get("session_id") or uuid.uuid4().hex)
+        admitted = admission.try_enter()
+        if admitted is None:
+            return JSONResponse(
+                {"error": "Server is busy, try again shortly."},
+                429,
+                headers={"Retry-After": "1"},
+            )
+        # Left by the response once it is done, whether or not the stream ran
+        return _AdmittedStream(
+            admitted,
+            stream_answer(admitted, message, session_id),
+            media_type="text/event-stream",
+            headers={"X-Session-Id": session_id, "Cache-Control": "no-cache"},
+        )
+
+    async def health(request: Request):
+        snapshot = stock_agent.stock_service.snapshot
+        scheduler = ScrapeScheduler.current()
+        return JSONResponse(
+            {
+                "snapshot_version": snapshot.version,
+                "rows": len(snapshot),
+                "snapshot_age_seconds": round(snapshot.age(), 1),
+                **admission.stats(),
+                **stock_agent.sa.router.stats(),
+                "result_cache": stock_agent.sa.result_cache.stats(),
+                "scrapes": scheduler.stats() if scheduler is not None else None,
+            }
+        )
+
+    async def metrics(request: Request):
+        return PlainTextResponse(
+            Metrics.instance().render_prometheus(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    app = Starlette(
+        routes=[
+            Route("/chat", chat, methods=["POST"]),
+            Route("/healthz", health, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.admission = admission
+    return app
+
+
+app = create_app(
+    max_concurrency=int(os.environ.get("STOCK_AGENT_MAX_CONCURRENCY", "16")),
+    max_queue=int(os.environ.get("STOCK_AGENT_MAX_QUEUE", "64")),
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    logging.basicConfig(
+        level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s"
+    )
+    uvicorn.run(
+        app,
+        host=os.environ.get("HOST", "127.0.0.1"),
+        port=int(os.environ.get("PORT", "8000")),
+    )
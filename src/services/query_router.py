@@ -0,0 +1,115 @@
+import re
+import logging
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from services.stock_service_impl import StockServiceImpl
+
+logger = logging.getLogger(__name__)
+
+# Filler around a bare company name, e.g. "show me the share price of infosys"
+_LOOKUP_PREFIX_RE = re.compile(
+    r"^(?:(?:show|get|give)(?: me)? )?(?:the )?(?:(?:stock|share) )?"
+    r"(?:(?:price|quote|data|details|info) )?(?:(?:of|for) )?"
+)
+_LOOKUP_SUFFIX_RE = re.compile(r" (?:stock|shares?|share price|price|quote)$")
+_SCREEN_TEMPLATE = r"^(?:(?:show|list|get)(?: me)? )?(?:the )?(?:top (?P<limit>\d+) )?(?:{})(?: (?:today|now))?$"
+
+# (phrase pattern, title, screen_stocks arguments)
+DEFAULT_SCREENS: List[Tuple[str, str, Dict[str, Any]]] = [
+    (r"(?:top |biggest )?gainers", "Top gainers", {"sort_by": "%Chg", "descending": True}),
+    (r"(?:top |biggest )?losers", "Top losers", {"sort_by": "%Chg", "descending": False}),
+    (
+        r"most active(?: stocks)?|(?:highest|top) volume|volume leaders",
+        "Most active by volume",
+        {"sort_by": "Volume", "descending": True},
+    ),
+]
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case, drop surrounding punctuation and collapse whitespace."""
+    q = re.sub(r"[?!.,]+$", "", (query or "").strip().lower())
+    return " ".join(q.split())
+
+
+class RoutedCall:
+    """A tool call decided without the model."""
+
+    __slots__ = ("tool", "args", "title")
+
+    def __init__(self, tool: str, args: Dict[str, Any], title: str = ""):
+        self.tool = tool
+        self.args = args
+        self.title = title
+
+    def __repr__(self) -> str:
+        return f"RoutedCall({self.tool}, {self.args})"
+
+
+class QueryRouter:
+    """
+    Answers plain lookups without a model round trip.
+
+    A query is routed only if it resolves unambiguously: the whole query
+    (minus filler such as "price of") names exactly one company, or it is
+    one of the known screening phrases such as "top 5 gainers". Anything
+    else returns None and goes to the agent.
+    """
+
+    def __init__(
+        self,
+        stock_service: StockServiceImpl,
+        screens: List[Tuple[str, str, Dict[str, Any]]] = DEFAULT_SCREENS,
+        default_limit: int = 10,
+        max_limit: int = 50,
+    ):
+        self.stock_service = stock_service
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+        self._screens: List[Tuple[Pattern, str, Dict[str, Any]]] = [
+            (re.compile(_SCREEN_TEMPLATE.format(phrase)), title, args)
+            for phrase, title, args in screens
+        ]
+        self.routed = 0
+        self.passed = 0
+
+    def route(self, query: str) -> Optional[RoutedCall]:
+        q = normalize_query(query)
+        call = None
+        if q:
+            call = self._route_screen(q) or self._route_lookup(q)
+        if call is None:
+            self.passed += 1
+        else:
+            self.routed += 1
+            logger.info("Routed %r to %r without the model.", query, call)
+        return call
+
+    def _route_screen(self, q: str) -> Optional[RoutedCall]:
+        table = self.stock_service.table
+        for pattern, title, args in self._screens:
+            m = pattern.match(q)
+            if not m:
+                continue
+            if table is None:
+                return None
+            try:
+                table.resolve_column(args["sort_by"])
+            except KeyError:
+                return None
+            limit = min(int(m.group("limit") or self.default_limit), self.max_limit)
+            return RoutedCall("screen_stocks", {**args, "limit": limit}, title)
+        return None
+
+    def _route_lookup(self, q: str) -> Optional[RoutedCall]:
+        name = self.stock_service.resolve_exact(q)
+        if name is None:
+            stripped = _LOOKUP_SUFFIX_RE.sub("", _LOOKUP_PREFIX_RE.sub("", q, count=1))
+            if stripped != q:
+                name = self.stock_service.resolve_exact(stripped)
+        if name is None:
+            return None
+        return RoutedCall("get_stock_data", {"company_name": name})
+
+    def stats(self) -> Dict[str, int]:
+        return {"routed": self.routed, "passed": self.passed}
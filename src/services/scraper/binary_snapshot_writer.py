@@ -0,0 +1,38 @@
+import logging
+from typing import Any, List, Optional
+
+from models.snapshot_file import write_snapshot
+from .csv_writer import CsvDataWriter
+from .interfaces import DataWriterInterface
+
+logger = logging.getLogger(__name__)
+
+
+class BinarySnapshotWriter(DataWriterInterface):
+    """
+    A class to write data as a typed, memory-mappable market snapshot.
+
+    Optionally also exports the table as CSV to `csv_export_path`.
+    """
+
+    def __init__(self, rank_by: str = "Volume", csv_export_path: Optional[str] = None):
+        self.rank_by = rank_by
+        self.csv_export_path = csv_export_path
+        self._csv_writer = CsvDataWriter()
+
+    def write_data(self, data: List[List[Any]], output_filename: str):
+        """Write data to a binary snapshot file."""
+        if not data:
+            logger.warning("No data provided to write.")
+            return
+
+        # The CSV goes first so the snapshot is never older than it on disk
+        if self.csv_export_path:
+            self._csv_writer.write_data(data, self.csv_export_path)
+
+        try:
+            rows = write_snapshot(output_filename, data[0], data[1:], rank_by=self.rank_by)
+            logger.info("Successfully wrote %d rows to '%s'.", rows, output_filename)
+        except (IOError, ValueError) as e:
+            logger.error("An error occurred while writing the snapshot: %s", e)
+            raise
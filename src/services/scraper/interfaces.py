@@ -11,6 +11,15 @@ class ScraperInterface(ABC):
         pass
 
 
+class DataSinkInterface(ABC):
+    """Interface for an in-memory consumer of freshly scraped data."""
+
+    @abstractmethod
+    def publish(self, data: List[List[Any]]):
+        """Receive a scraped table (header row first)."""
+        pass
+
+
 class DataWriterInterface(ABC):
     """Interface for a data writer."""
 
@@ -2,9 +2,11 @@ import logging
 import requests
 from bs4 import BeautifulSoup, Tag
 from urllib.parse import urljoin
-from typing import List, Any
+from typing import List, Any, Optional
 from .interfaces import ScraperInterface
+from .streaming_table_parser import StreamingTableParser
 from fake_useragent import UserAgent
+from utils.metrics import incr, timed
 
 logger = logging.getLogger(__name__)
 
@@ -12,11 +14,29 @@ logger = logging.getLogger(__name__)
 class MoneyControlScraper(ScraperInterface):
     """A class to scrape stock data tables from Moneycontrol."""
 
-    DEFAULT_URL = "https://www.moneycontrol.com/markets/indian-indices/changeTableData?deviceType=web&exName=N&indicesID=136&selTab=o&subTabOT=o&subTabOPL=cl&selPage=marketTerminal&classic=true"
-
-    def __init__(self, url: str = ""):
-        """Initialize the scraper with a target URL."""
+    URL_TEMPLATE = "https://www.moneycontrol.com/markets/indian-indices/changeTableData?deviceType=web&exName={exchange}&indicesID={index_id}&selTab=o&subTabOT=o&subTabOPL=cl&selPage=marketTerminal&classic=true"
+    DEFAULT_URL = URL_TEMPLATE.format(exchange="N", index_id=136)
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        url: str = "",
+        parser: str = "lxml",
+        session: Optional[requests.Session] = None,
+        timeout: float = 15,
+    ):
+        """
+        Initialize the scraper with a target URL.
+
+        `parser` selects the streaming lxml table parser ("lxml") or the
+        BeautifulSoup reference implementation ("bs4"). Pass a shared
+        `session` to reuse pooled connections across scrapers and refreshes.
+        """
         self.url = url or self.DEFAULT_URL
+        self.parser = parser
+        self.session = session or requests.Session()
+        self.timeout = timeout
         ua = UserAgent()
         self.headers = {
             "User-Agent": ua.random,
@@ -26,64 +46,103 @@ class MoneyControlScraper(ScraperInterface):
             "Connection": "keep-alive",
             "Referer": "https://www.moneycontrol.com/markets/indian-indices/",
         }
+        # Validators and result of the last successful fetch, for conditional requests
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._last_data: List[List[Any]] = []
+
+    @classmethod
+    def url_for_index(cls, index_id: int, exchange: str = "N") -> str:
+        """Return the change-table URL for a Moneycontrol index ID."""
+        return cls.URL_TEMPLATE.format(exchange=exchange, index_id=index_id)
 
+    @timed("scrape.table")
     def scrape(self) -> List[List[Any]]:
         """Scrape the table and return it as a list of lists."""
         try:
             logger.info("Fetching data from %s...", self.url)
-            response = requests.get(self.url, headers=self.headers)
-            response.raise_for_status()
+            headers = dict(self.headers)
+            if self._last_data:
+                if self._etag:
+                    headers["If-None-Match"] = self._etag
+                if self._last_modified:
+                    headers["If-Modified-Since"] = self._last_modified
+            with self.session.get(
+                self.url, headers=headers, stream=True, timeout=self.timeout
+            ) as response:
+                if response.status_code == 304:
+                    logger.info("Data not modified since last fetch.")
+                    incr("table_fetches", status="not_modified")
+                    return self._last_data
+                response.raise_for_status()
+                self._etag = response.headers.get("ETag")
+                self._last_modified = response.headers.get("Last-Modified")
+
+                if self.parser == "bs4":
+                    data = self.parse_with_bs4(response.content)
+                else:
+                    # Rows are parsed as they stream off the socket and the
+                    # connection is closed as soon as the table ends.
+                    data = list(
+                        StreamingTableParser(self.url).iter_rows(
+                            response.iter_content(chunk_size=self.CHUNK_SIZE)
+                        )
+                    )
             logger.info("Data fetched successfully.")
+            incr("table_fetches", status="full")
 
-            soup = BeautifulSoup(response.content, "html.parser")
-            table = soup.find("table")
+            self._last_data = data
+            return data
 
-            if not isinstance(table, Tag):
-                logger.error("Could not find the data table on the page.")
-                return []
+        except requests.exceptions.RequestException as e:
+            logger.error("An error occurred while fetching the URL: %s", e)
+            raise
+        except Exception as e:
+            logger.error("An unexpected error occurred: %s", e)
+            raise
 
-            header_row = [th.get_text(strip=True) for th in table.find_all("th")]
-            header_row.append("URL")
+    def parse_with_bs4(self, content: bytes) -> List[List[Any]]:
+        """Parse a full page with BeautifulSoup; the reference implementation."""
+        soup = BeautifulSoup(content, "html.parser")
+        table = soup.find("table")
 
-            data = [header_row]
+        if not isinstance(table, Tag):
+            logger.error("Could not find the data table on the page.")
+            return []
 
-            tbody = table.find("tbody")
-            if isinstance(tbody, Tag):
-                for row in tbody.find_all("tr"):
-                    if not isinstance(row, Tag):
-                        continue
-                    cells = row.find_all("td")
-                    if not cells:
-                        continue
+        header_row = [th.get_text(strip=True) for th in table.find_all("th")]
+        header_row.append("URL")
 
-                    first_cell = cells[0]
-                    link_tag = first_cell.find("a") if isinstance(first_cell, Tag) else None
+        data = [header_row]
 
-                    stock_name = (
-                        link_tag.get_text(strip=True)
-                        if isinstance(link_tag, Tag)
-                        else first_cell.get_text(strip=True)
-                    )
+        tbody = table.find("tbody")
+        if isinstance(tbody, Tag):
+            for row in tbody.find_all("tr"):
+                if not isinstance(row, Tag):
+                    continue
+                cells = row.find_all("td")
+                if not cells:
+                    continue
 
-                    relative_url = link_tag.get("href", "") if isinstance(link_tag, Tag) else ""
-                    absolute_url = (
-                        urljoin(self.url, str(relative_url)) if relative_url else ""
-                    )
+                first_cell = cells[0]
+                link_tag = first_cell.find("a") if isinstance(first_cell, Tag) else None
 
-                    other_cells_data = [
-                        cell.get_text(strip=True) for cell in cells[1:]
-                    ]
+                stock_name = (
+                    link_tag.get_text(strip=True)
+                    if isinstance(link_tag, Tag)
+                    else first_cell.get_text(strip=True)
+                )
 
-                    csv_row_data = [stock_name] + other_cells_data + [absolute_url]
-                    data.append(csv_row_data)
-            
-            return data
+                relative_url = link_tag.get("href", "") if isinstance(link_tag, Tag) else ""
+                absolute_url = (
+                    urljoin(self.url, str(relative_url)) if relative_url else ""
+                )
 
-        except requests.exceptions.RequestException as e:
-            logger.error("An error occurred while fetching the URL: %s", e)
-            raise
-        except Exception as e:
-            logger.error("An unexpected error occurred: %s", e)
-            raise
-            
-        return []
+                other_cells_data = [
+                    cell.get_text(strip=True) for cell in cells[1:]
+                ]
+
+                csv_row_data = [stock_name] + other_cells_data + [absolute_url]
+                data.append(csv_row_data)
+
+        return data
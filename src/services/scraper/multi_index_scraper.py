@@ -0,0 +1,156 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .interfaces import ScraperInterface
+from .moneycontrol_scraper import MoneyControlScraper
+
+logger = logging.getLogger(__name__)
+
+
+def pooled_session(
+    pool_size: int = 16, retries: int = 3, backoff_factor: float = 0.5
+) -> requests.Session:
+    """A requests Session with keep-alive pooling and retries with backoff."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class MultiIndexScraper(ScraperInterface):
+    """
+    Scrapes several index/exchange tables concurrently into one table.
+
+    Every source is a MoneyControlScraper sharing one pooled session, so
+    refreshes reuse TCP/TLS connections. Fetches run on a thread pool with at
+    most `per_host_limit` requests in flight per host. Rows are merged by
+    company name: the first source listing a company wins, and columns are
+    aligned to the first table's header.
+
+    A source that fails is merged from its last good table, so a transient
+    error does not drop its companies from the snapshot; if it never
+    succeeded, the whole scrape fails and nothing is published.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        max_workers: int = 8,
+        per_host_limit: int = 4,
+        timeout: float = 15,
+        session: Optional[requests.Session] = None,
+    ):
+        self.session = session or pooled_session(pool_size=max_workers)
+        self.scrapers = [
+            MoneyControlScraper(url=url, session=self.session, timeout=timeout)
+            for url in urls
+        ]
+        if not self.scrapers:
+            raise ValueError("MultiIndexScraper needs at least one source URL.")
+        self.per_host_limit = per_host_limit
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="index-scrape"
+        )
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+        # Last table each source returned with rows, by position in `scrapers`
+        self._last_good: Dict[int, List[List[Any]]] = {}
+
+    @classmethod
+    def from_index_ids(
+        cls, index_ids: Iterable[int], exchange: str = "N", **kwargs
+    ) -> "MultiIndexScraper":
+        return cls(
+            [MoneyControlScraper.url_for_index(i, exchange) for i in index_ids], **kwargs
+        )
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._host_lock:
+            sem = self._host_limits.get(host)
+            if sem is None:
+                sem = self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return sem
+
+    def _scrape_one(self, scraper: MoneyControlScraper) -> List[List[Any]]:
+        with self._host_limit(scraper.url):
+            return scraper.scrape()
+
+    @staticmethod
+    def merge(tables: List[List[List[Any]]]) -> List[List[Any]]:
+        """Merge scraped tables into one, de-duplicating rows by company name."""
+        tables = [t for t in tables if t]
+        if not tables:
+            return []
+        header = list(tables[0][0])
+        merged = [header]
+        seen = set()
+        for table in tables:
+            positions = {col: i for i, col in enumerate(table[0])}
+            mapping = [positions.get(col) for col in header]
+            for row in table[1:]:
+                key = str(row[0]).strip().lower() if row else ""
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                merged.append(
+                    [row[i] if i is not None and i < len(row) else "" for i in mapping]
+                )
+        return merged
+
+    def scrape(self) -> List[List[Any]]:
+        """Fetch every source concurrently and return the merged table."""
+        futures = [self._executor.submit(self._scrape_one, s) for s in self.scrapers]
+        tables: List[List[List[Any]]] = []
+        errors = []
+        stale = 0
+        for i, (scraper, future) in enumerate(zip(self.scrapers, futures)):
+            try:
+                table = future.result()
+                if len(table) < 2:
+                    raise ValueError(f"No table rows were scraped from {scraper.url}")
+            except Exception as e:
+                previous = self._last_good.get(i)
+                if previous is None:
+                    logger.error("Failed to scrape %s: %s", scraper.url, e)
+                    errors.append(e)
+                    continue
+                logger.warning(
+                    "Failed to scrape %s (%s); reusing its last good table.", scraper.url, e
+                )
+                stale += 1
+                table = previous
+            else:
+                self._last_good[i] = table
+            tables.append(table)
+
+        if errors:
+            # Publishing without this source would delist all of its companies
+            raise errors[0]
+        data = self.merge(tables)
+        logger.info(
+            "Merged %d rows from %d sources (%d from their last good table).",
+            max(len(data) - 1, 0),
+            len(self.scrapers),
+            stale,
+        )
+        return data
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,116 @@
+import time
+import logging
+import threading
+from datetime import datetime, time as dtime
+from typing import Callable, Optional
+from zoneinfo import ZoneInfo
+
+from .scraping_service import ScrapingService
+
+logger = logging.getLogger(__name__)
+
+
+class MarketHours:
+    """NSE regular trading session, in exchange local time."""
+
+    def __init__(
+        self,
+        open_time: dtime = dtime(9, 15),
+        close_time: dtime = dtime(15, 30),
+        tz: str = "Asia/Kolkata",
+    ):
+        self.open_time = open_time
+        self.close_time = close_time
+        self.tz = ZoneInfo(tz)
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        local = (now or datetime.now(self.tz)).astimezone(self.tz)
+        if local.weekday() >= 5:
+            return False
+        return self.open_time <= local.time() <= self.close_time
+
+
+class RefreshScheduler:
+    """
+    Periodically refreshes market data on a background thread.
+
+    Refreshes run every `interval` seconds while the market is open and every
+    `off_hours_interval` seconds otherwise. `on_refresh` is only called when
+    the scraped table actually changed.
+    """
+
+    def __init__(
+        self,
+        scraping_service: ScrapingService,
+        output_filename: str,
+        on_refresh: Optional[Callable[[], None]] = None,
+        interval: float = 300,
+        off_hours_interval: float = 3600,
+        market_hours: Optional[MarketHours] = None,
+    ):
+        self.scraping_service = scraping_service
+        self.output_filename = output_filename
+        self.on_refresh = on_refresh
+        self.interval = interval
+        self.off_hours_interval = off_hours_interval
+        self.market_hours = market_hours or MarketHours()
+        self.last_checked_at: Optional[float] = None
+        self.last_changed_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background refresh loop."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="market-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def next_delay(self) -> float:
+        return self.interval if self.market_hours.is_open() else self.off_hours_interval
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self.next_delay())
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.refresh()
+
+    def request_refresh(self):
+        """Ask for a refresh now, without waiting for it."""
+        if self._thread and self._thread.is_alive():
+            self._wake.set()
+        else:
+            threading.Thread(
+                target=self.refresh, name="market-refresh-once", daemon=True
+            ).start()
+
+    def refresh(self) -> bool:
+        """Refresh synchronously. Returns True if new data was published."""
+        with self._refresh_lock:
+            try:
+                changed = self.scraping_service.run(output_filename=self.output_filename)
+                self.last_checked_at = time.time()
+                self.last_error = None
+                if changed:
+                    self.last_changed_at = self.last_checked_at
+                    if self.on_refresh is not None:
+                        self.on_refresh()
+                return changed
+            except Exception as e:
+                logger.exception("Scheduled market data refresh failed")
+                self.last_error = str(e)
+                return False
@@ -1,30 +1,114 @@
-from .interfaces import ScraperInterface, DataWriterInterface
+from .interfaces import ScraperInterface, DataWriterInterface, DataSinkInterface
+import hashlib
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Iterable, List, Optional
+
+from utils.metrics import incr, timed
 
 logger = logging.getLogger(__name__)
 
 
 class ScrapingService:
-    """A service to orchestrate scraping and data writing."""
+    """
+    A service to orchestrate scraping and data writing.
+
+    Scraped tables are handed to the registered sinks in-process first, so
+    they are queryable as soon as they are parsed; writing them to disk then
+    happens on a background thread unless `persist_in_background` is False.
+    """
 
     def __init__(
-        self, scraper: ScraperInterface, data_writer: DataWriterInterface
+        self,
+        scraper: ScraperInterface,
+        data_writer: DataWriterInterface,
+        sinks: Iterable[DataSinkInterface] = (),
+        persist_in_background: bool = True,
     ):
         """Initialize the service with a scraper and a data writer."""
         self.scraper = scraper
         self.data_writer = data_writer
+        self.sinks: List[DataSinkInterface] = list(sinks)
+        self.persist_in_background = persist_in_background
+        # Hash of the last table published, used to skip unchanged refreshes
+        self.last_hash: Optional[str] = None
+        # One writer thread, so writes land on disk in scrape order
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scrape-persist")
+        self.pending_write: Optional[Future] = None
+
+    def add_sink(self, sink: DataSinkInterface):
+        """Register an in-memory consumer of scraped tables."""
+        self.sinks.append(sink)
+
+    @staticmethod
+    def content_hash(data: List[List[Any]]) -> str:
+        """Return a stable hash of a scraped table."""
+        digest = hashlib.sha256()
+        for row in data:
+            digest.update("\x1f".join(str(cell) for cell in row).encode("utf-8"))
+            digest.update(b"\x1e")
+        return digest.hexdigest()
+
+    def _publish(self, data: List[List[Any]]):
+        for sink in self.sinks:
+            try:
+                sink.publish(data)
+            except Exception as e:
+                logger.exception("Sink %s failed to take the scraped data: %s", sink, e)
+
+    def _persist(self, data: List[List[Any]], output_filename: str):
+        try:
+            self.data_writer.write_data(data, output_filename)
+        except Exception as e:
+            logger.exception("Failed to persist scraped data to %s: %s", output_filename, e)
+            # Forget the hash so the next refresh retries the write
+            self.last_hash = None
+            raise
 
-    def run(self, output_filename: str):
-        """Run the scraping and writing process."""
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the pending background write. Returns False if it failed."""
+        future = self.pending_write
+        if future is None:
+            return True
+        try:
+            future.result(timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, wait: bool = True):
+        """Stop the writer thread, by default after the pending write lands."""
+        self._writer.shutdown(wait=wait)
+
+    @timed("scrape.refresh")
+    def run(self, output_filename: str) -> bool:
+        """
+        Run the scraping and writing process.
+        Returns True if new data was published, False if nothing changed.
+        """
         try:
             logger.info("Scraping service started.")
             data = self.scraper.scrape()
-            if data:
-                self.data_writer.write_data(data, output_filename)
-                logger.info("Scraping service finished successfully.")
-            else:
+            if not data:
                 logger.warning("No data was scraped.")
+                incr("refreshes", outcome="empty")
+                return False
+
+            content_hash = self.content_hash(data)
+            if content_hash == self.last_hash:
+                logger.info("Scraped data is unchanged; skipping write.")
+                incr("refreshes", outcome="unchanged")
+                return False
+
+            self.last_hash = content_hash
+            self._publish(data)
+            if self.persist_in_background:
+                self.pending_write = self._writer.submit(self._persist, data, output_filename)
+            else:
+                self._persist(data, output_filename)
+            incr("refreshes", outcome="published")
+            logger.info("Scraping service finished successfully.")
+            return True
         except Exception as e:
             logger.error("An error occurred in the scraping service: %s", e)
             raise
-
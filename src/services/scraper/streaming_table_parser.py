@@ -0,0 +1,106 @@
+import logging
+from typing import Any, Iterable, Iterator, List, Optional
+from urllib.parse import urljoin
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+
+def _text(el: Any) -> str:
+    """Concatenate stripped text pieces, like BeautifulSoup's get_text(strip=True)."""
+    return "".join(piece.strip() for piece in el.itertext())
+
+
+class StreamingTableParser:
+    """
+    Extracts the first `<table>` of an HTML page incrementally.
+
+    Chunks are fed to an lxml pull parser as they arrive and rows are yielded
+    as soon as their `</tr>` is seen, so the page is never held as a full
+    tree and parsing stops as soon as the table closes. The output matches
+    MoneyControlScraper's BeautifulSoup path: a header row of every `<th>`
+    plus "URL", then one row per `<tbody>` row with the first cell's link
+    text, the remaining cells and the absolute link URL.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def _row(self, tr: Any) -> Optional[List[str]]:
+        cells = list(tr.iter("td"))
+        if not cells:
+            return None
+        first_cell = cells[0]
+        link_tag = next(first_cell.iter("a"), None)
+        stock_name = _text(link_tag) if link_tag is not None else _text(first_cell)
+        relative_url = link_tag.get("href", "") if link_tag is not None else ""
+        absolute_url = urljoin(self.base_url, relative_url) if relative_url else ""
+        return [stock_name] + [_text(cell) for cell in cells[1:]] + [absolute_url]
+
+    def iter_rows(self, chunks: Iterable[bytes]) -> Iterator[List[str]]:
+        """Yield the header row, then each body row, from streamed HTML chunks."""
+        parser = etree.HTMLPullParser(events=("start", "end"))
+        table: Any = None
+        tbody: Any = None
+        header: List[str] = []
+        header_sent = False
+        table_depth = 0
+
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, el in parser.read_events():
+                tag = el.tag
+                if not isinstance(tag, str):
+                    continue
+
+                if table is None:
+                    if event == "start" and tag == "table":
+                        table = el
+                        table_depth = 1
+                    continue
+
+                if tag == "table":
+                    table_depth += 1 if event == "start" else -1
+                    if table_depth == 0:
+                        if not header_sent:
+                            yield header + ["URL"]
+                        return
+                    continue
+
+                if event == "start":
+                    if tag == "tbody" and tbody is None:
+                        tbody = el
+                        if not header_sent:
+                            header_sent = True
+                            yield header + ["URL"]
+                    continue
+
+                if tag == "th" and not header_sent:
+                    header.append(_text(el))
+                elif tag == "tr" and tbody is not None and self._inside(el, tbody):
+                    row = self._row(el)
+                    # Release the row and anything parsed before it
+                    el.clear()
+                    while el.getprevious() is not None:
+                        del el.getparent()[0]
+                    if row is not None:
+                        yield row
+
+        if table is not None and not header_sent:
+            yield header + ["URL"]
+        elif table is None:
+            logger.error("Could not find the data table on the page.")
+
+    @staticmethod
+    def _inside(el: Any, ancestor: Any) -> bool:
+        parent = el.getparent()
+        while parent is not None:
+            if parent is ancestor:
+                return True
+            parent = parent.getparent()
+        return False
+
+    def parse(self, html: bytes) -> List[List[str]]:
+        """Parse a complete page; returns [] if it has no table."""
+        return list(self.iter_rows([html]))
@@ -1,8 +1,39 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Sequence
 from models.stock import Stock
 
 class StockService(ABC):
     @abstractmethod
-    def find_matches(self, query: str, limit: int = 5) -> List[Stock]:
+    def find_matches(self, query: str, limit: int = 5, lazy: bool = True) -> List[Stock]:
         pass
+
+    @abstractmethod
+    def screen(
+        self,
+        conditions: Sequence[str] = (),
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        limit: int = 10,
+    ) -> List[Stock]:
+        pass
+
+    async def afind_matches(
+        self, query: str, limit: int = 5, timeout: Optional[float] = None
+    ) -> List[Stock]:
+        """
+        Like `find_matches`, but also scrapes the detail pages of all matches
+        concurrently, waiting at most `timeout` seconds in total.
+        """
+        matches = self.find_matches(query, limit=limit, lazy=True)
+        await Stock.aprefetch(matches, timeout=timeout)
+        return matches
+
+    async def ascreen(
+        self,
+        conditions: Sequence[str] = (),
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        limit: int = 10,
+    ) -> List[Stock]:
+        """Screening runs in memory, so this only saves callers a thread hop."""
+        return self.screen(conditions, sort_by=sort_by, descending=descending, limit=limit)
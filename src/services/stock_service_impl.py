@@ -1,69 +1,606 @@
 import os
+import re
+import math
 import csv
 import logging
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from models.compact_trie import CompactTrie
+from models.market_diff import ChangeEvent, SnapshotDiff
+from models.market_snapshot import MarketSnapshot
+from models.market_table import MarketTable
+from models.search_index import SearchIndex
+from models.snapshot_file import SnapshotFile, SnapshotRows
 from models.trie import Trie
 from models.stock import Stock
+from models.stock_schema import StockSchema
 from services.stock_service import StockService
-from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint
+from services.scraper.interfaces import DataSinkInterface
+from utils.metrics import timed
 from datetime import datetime, timedelta
 
+if TYPE_CHECKING:
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+
 logger = logging.getLogger(__name__)
 
+# Legal-form suffixes that users usually leave off a company name
+_NAME_SUFFIX_RE = re.compile(r"\s+(?:ltd|limited|inc|corp|corporation|plc)\.?$")
+
+
+def _symbol_aliases(symbol: Any) -> List[str]:
+    """A row's symbol as a search alias; none for an empty cell."""
+    return [str(symbol)] if symbol not in (None, "") else []
 
-class StockServiceImpl(StockService):
-    def __init__(self, assets_dir: str, csv_name: str = "moneycontrol_stocks.csv"):
+
+class StockServiceImpl(StockService, DataSinkInterface):
+    def __init__(
+        self,
+        assets_dir: str,
+        csv_name: str = "moneycontrol_stocks.csv",
+        rank_by: str = "Volume",
+        index_name: str = "names.trie",
+        snapshot_name: str = "market.snap",
+        price_column: str = "LTP",
+        move_threshold_pct: float = 2.0,
+    ):
         self.assets_dir = assets_dir
+        # Numeric column used to rank autocomplete suggestions
+        self.rank_by = rank_by
         self.csv_path = os.path.join(self.assets_dir, csv_name)
-        self.stocks: Dict[str, Dict[str, str]] = {}
-        self.trie = Trie()
+        # Memory-mapped name index persisted next to the CSV
+        self.index_path = os.path.join(self.assets_dir, index_name)
+        # Binary snapshot written by BinarySnapshotWriter; preferred over the CSV
+        self.snapshot_path = os.path.join(self.assets_dir, snapshot_name)
+        # The published snapshot; replaced wholesale, never mutated
+        self._snapshot = MarketSnapshot()
+        self._reload_lock = threading.Lock()
+        self._reloader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot-reload")
         self.last_boot_time = None
+        # Raw scraped cells of the current snapshot's rows, so unchanged rows
+        # are not re-parsed on the next refresh
+        self._raw_rows: Dict[str, Tuple[Any, ...]] = {}
+        # Change events: a price move is reported once it drifts
+        # `move_threshold_pct` from the price of the last report
+        self.price_column = price_column
+        self.move_threshold_pct = move_threshold_pct
+        self._reference_prices: Dict[str, float] = {}
+        self._listeners: List[Callable[[List[ChangeEvent]], None]] = []
+        # (snapshot, alias -> name) for exact lookups; rebuilt per snapshot
+        self._aliases: Tuple[Optional[MarketSnapshot], Dict[str, Optional[str]]] = (None, {})
+
+    @property
+    def snapshot(self) -> MarketSnapshot:
+        """The current snapshot. Hold on to it for the duration of a query."""
+        return self._snapshot
+
+    # Read-only views of the current snapshot
+    @property
+    def schema(self) -> Optional[StockSchema]:
+        return self._snapshot.schema
+
+    @property
+    def stocks(self) -> Mapping[str, Tuple[Any, ...]]:
+        return self._snapshot.stocks
+
+    @property
+    def trie(self) -> Union[Trie, CompactTrie]:
+        return self._snapshot.trie
+
+    @property
+    def search_index(self) -> SearchIndex:
+        return self._snapshot.search_index
+
+    @property
+    def table(self) -> Optional[MarketTable]:
+        return self._snapshot.table
 
-    def boot(self, checkpointer: Optional[BaseCheckpointSaver] = None):
-        if not os.path.exists(self.csv_path):
+    @property
+    def ranked(self) -> bool:
+        return self._snapshot.ranked
+
+    def subscribe(self, listener: Callable[[List[ChangeEvent]], None]):
+        """Call `listener` with the change events of every published snapshot."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[List[ChangeEvent]], None]):
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def boot(self, checkpointer: Optional["BaseCheckpointSaver"] = None):
+        if self._snapshot_file_is_current():
+            self._load_snapshot_file()
+        elif os.path.exists(self.csv_path):
+            self._load_csv()
+        else:
             logger.warning(
                 "CSV file not found at %s. The agent may not have stock data. You can try running the 'update_stock_data' command.",
                 self.csv_path,
             )
             return
-        self._load_csv()
+        self.last_boot_time = datetime.now()
+        # The fuzzy-match tables are built behind the boot, not inside it
+        self._reloader.submit(self._snapshot.search_index.warm)
+
+    def _snapshot_file_is_current(self) -> bool:
+        """True if a binary snapshot exists and is at least as new as the CSV."""
+        try:
+            snap_mtime = os.path.getmtime(self.snapshot_path)
+        except OSError:
+            return False
+        try:
+            return snap_mtime >= os.path.getmtime(self.csv_path)
+        except OSError:
+            return True
+
+    def _load_snapshot_file(self):
+        """Memory-map the binary snapshot; falls back to the CSV if it is unreadable."""
+        events: List[ChangeEvent] = []
+        with self._reload_lock:
+            try:
+                snapshot_file = SnapshotFile(self.snapshot_path)
+                snapshot = self._snapshot_from_file(snapshot_file)
+            except Exception as e:
+                logger.exception("Failed to load snapshot %s: %s", self.snapshot_path, e)
+                snapshot = None
+            if snapshot is not None:
+                self._raw_rows = {}
+                events = self._swap(snapshot, self._full_diff(snapshot))
+        if snapshot is None:
+            self._load_csv()
+            return
+        self._notify(events)
+        logger.info(
+            "Memory-mapped %d rows from %s (snapshot v%d).",
+            len(snapshot), self.snapshot_path, snapshot.version,
+        )
 
+    def _snapshot_from_file(self, snapshot_file: SnapshotFile) -> MarketSnapshot:
+        schema = snapshot_file.schema
+        names = snapshot_file.names
+        columns = snapshot_file.numeric_columns
+        rank_scores = columns.get(snapshot_file.rank_by) if snapshot_file.ranked else None
+        scores = rank_scores.tolist() if rank_scores is not None else [None] * len(names)
+        # Read straight from the text column, without materializing rows
+        symbols = (
+            snapshot_file.text_column("Symbol")
+            if "Symbol" in schema.index and schema.index["Symbol"] not in schema.numeric
+            else [""] * len(names)
+        )
+
+        search_index = SearchIndex()
+        for name, score, symbol in zip(names, scores, symbols):
+            search_index.add(
+                name,
+                None if score is None or math.isnan(score) else score,
+                aliases=_symbol_aliases(symbol),
+            )
+
+        return MarketSnapshot(
+            version=self._snapshot.version + 1,
+            schema=schema,
+            stocks=SnapshotRows(snapshot_file),
+            trie=snapshot_file.trie(),
+            search_index=search_index,
+            table=MarketTable.from_columns(schema, names, columns),
+            ranked=snapshot_file.ranked,
+            loaded_at=snapshot_file.created_at,
+        )
+
+    def publish(self, data: List[List[Any]]):
+        """Build and publish a snapshot straight from a scraped table."""
+        if not data:
+            return
+        self.load_rows(data[0], data[1:])
+
+    @timed("index.load_rows")
+    def load_rows(self, header: Sequence[str], raw_rows: Sequence[Sequence[Any]]):
+        """Build and publish a snapshot from in-memory rows, without touching disk."""
+        with self._reload_lock:
+            snapshot, events = self._apply_rows(header, raw_rows, persist_index=False)
+        if snapshot is None:
+            return
+        self.last_boot_time = datetime.now()
+        logger.info(
+            "Published %d scraped rows (snapshot v%d).", len(snapshot), snapshot.version
+        )
+        self._notify(events)
+
+    def reload_in_background(self) -> Future:
+        """
+        Rebuild the snapshot on a background thread.
+
+        Queries keep being served from the current snapshot until the new one
+        is published.
+        """
+        return self._reloader.submit(self.boot)
+
+    @timed("index.load_csv")
     def _load_csv(self):
-        self.stocks = {}
+        # Builds are serialized so two refreshes cannot publish out of order.
+        with self._reload_lock:
+            try:
+                with open(self.csv_path, newline="", encoding="utf-8") as f:
+                    reader = csv.reader(f)
+                    header = next(reader, None)
+                    raw_rows = list(reader)
+            except FileNotFoundError:
+                logger.warning(
+                    "CSV file not found when trying to load. Have you run boot()?"
+                )
+                return
+            except Exception as e:
+                logger.exception("Failed to read CSV: %s", e)
+                return
+
+            if not header:
+                logger.warning("CSV file %s has no header; keeping current data.", self.csv_path)
+                return
+            snapshot, events = self._apply_rows(header, raw_rows, persist_index=True)
+        if snapshot is None:
+            return
+
+        logger.info(
+            "Loaded %d rows into memory (snapshot v%d).", len(snapshot), snapshot.version
+        )
+        self._notify(events)
+
+    def _apply_rows(
+        self,
+        header: Sequence[str],
+        raw_rows: Sequence[Sequence[Any]],
+        persist_index: bool,
+    ) -> Tuple[Optional[MarketSnapshot], List[ChangeEvent]]:
+        """
+        Build a snapshot from raw rows and publish it. Must hold `_reload_lock`.
+
+        The table is diffed against the current snapshot when the header is
+        unchanged; otherwise everything is rebuilt.
+        """
+        try:
+            built = self._diff_snapshot(header, raw_rows)
+        except ValueError as e:
+            logger.info("Cannot diff refresh against current data (%s); rebuilding.", e)
+            built = None
         try:
-            with open(self.csv_path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    clean_row = {
-                        k.strip(): (v.strip() if isinstance(v, str) else v)
-                        for k, v in row.items()
+            if built is None:
+                snapshot = self._build_snapshot(header, raw_rows, persist_index)
+                diff = self._full_diff(snapshot)
+                name_idx = snapshot.schema.index.get("Name")
+                self._raw_rows = (
+                    {
+                        str(raw[name_idx]).strip().lower(): tuple(raw)
+                        for raw in raw_rows
+                        if name_idx < len(raw)
                     }
-                    name = clean_row.get("Name", "").strip().lower()
-                    if name:
-                        self.trie.insert(name)
-                        logger.debug("Inserted '%s' into Trie.", name)
-                        self.stocks[name] = clean_row
-        except FileNotFoundError:
-            logger.warning(
-                "CSV file not found when trying to load. Have you run boot()?"
-            )
+                    if name_idx is not None
+                    else {}
+                )
+            else:
+                snapshot, diff, self._raw_rows = built
         except Exception as e:
-            logger.exception("Failed to read CSV: %s", e)
+            logger.exception("Failed to build snapshot; keeping current data: %s", e)
+            return None, []
+        return snapshot, self._swap(snapshot, diff)
+
+    def _swap(self, snapshot: MarketSnapshot, diff: SnapshotDiff) -> List[ChangeEvent]:
+        """Publish `snapshot`, returning its change events. Must hold `_reload_lock`."""
+        events = self._change_events(self._snapshot, snapshot, diff)
+        # Publishing is a single reference assignment; readers see either
+        # the old snapshot or the new one, never a partial load.
+        self._snapshot = snapshot
+        return events
+
+    def _notify(self, events: List[ChangeEvent]):
+        if not events:
+            return
+        logger.info("Snapshot change events: %s", events[:10])
+        for listener in list(self._listeners):
+            try:
+                listener(events)
+            except Exception as e:
+                logger.exception("Change listener %s failed: %s", listener, e)
+
+    def _full_diff(self, snapshot: MarketSnapshot) -> SnapshotDiff:
+        """A diff treating every name present in both snapshots as changed."""
+        old = self._snapshot.stocks
+        return SnapshotDiff(
+            added=[n for n in snapshot.stocks if n not in old],
+            removed=[n for n in old if n not in snapshot.stocks],
+            changed=[n for n in snapshot.stocks if n in old],
+        )
+
+    def _diff_snapshot(
+        self, header: Sequence[str], raw_rows: Sequence[Sequence[Any]]
+    ) -> Optional[Tuple[MarketSnapshot, SnapshotDiff, Dict[str, Tuple[Any, ...]]]]:
+        """
+        Derive the next snapshot from the current one.
+
+        Rows whose raw cells are unchanged are reused without parsing, the
+        name trie keeps its arrays (listings go into its overlay, delistings
+        become tombstones), the search index only indexes the added names and
+        re-sorts the tokens that changed, and only changed rows are written
+        into copies of the affected table columns.
+        Returns None if the header changed.
+        """
+        old = self._snapshot
+        schema = old.schema
+        if not len(old) or schema is None or tuple(schema.columns) != tuple(header):
+            return None
+        name_idx = schema.index.get("Name")
+        if name_idx is None:
+            return None
+
+        raw_by_name: Dict[str, Tuple[Any, ...]] = {}
+        for raw in raw_rows:
+            if name_idx < len(raw):
+                name = str(raw[name_idx]).strip().lower()
+                if name:
+                    raw_by_name[name] = tuple(raw)
+
+        stocks: Dict[str, Tuple[Any, ...]] = {}
+        diff = SnapshotDiff()
+        for name, raw in raw_by_name.items():
+            old_row = old.stocks.get(name)
+            if old_row is not None and self._raw_rows.get(name) == raw:
+                stocks[name] = old_row
+                continue
+            row = schema.parse_row(raw)
+            if old_row is None:
+                diff.added.append(name)
+            elif row != old_row:
+                diff.changed.append(name)
+            else:
+                row = old_row
+            stocks[name] = row
+        diff.removed = [n for n in old.stocks if n not in stocks]
+
+        rank_idx = schema.index.get(self.rank_by) if old.ranked else None
+        symbol_idx = schema.index.get("Symbol")
+        scores = {n: (r[rank_idx] if rank_idx is not None else None) for n, r in stocks.items()}
+
+        if isinstance(old.trie, CompactTrie):
+            trie = old.trie.with_changes(scores, added=diff.added, removed=diff.removed)
+        else:
+            trie = CompactTrie.build(scores, scores)
+
+        # A changed symbol is re-indexed as a removal plus an addition
+        reindexed = list(diff.added)
+        removed = list(diff.removed)
+        if symbol_idx is not None:
+            for name in diff.changed:
+                if stocks[name][symbol_idx] != old.stocks[name][symbol_idx]:
+                    removed.append(name)
+                    reindexed.append(name)
+        search_index = old.search_index.updated(
+            scores,
+            removed=removed,
+            added=[
+                (n, scores[n], _symbol_aliases(stocks[n][symbol_idx]) if symbol_idx is not None else ())
+                for n in reindexed
+            ],
+        )
+        if search_index.removed_ratio > 0.25:
+            search_index = self._build_search_index(schema, stocks, scores)
+
+        names = list(stocks)
+        if old.table is not None and names == old.table.names:
+            positions = {n: i for i, n in enumerate(names)}
+            table = old.table.with_rows(
+                [positions[n] for n in diff.changed], [stocks[n] for n in diff.changed]
+            )
+        else:
+            table = MarketTable(schema, names, list(stocks.values()))
+
+        logger.info("Applied refresh as a diff: %r.", diff)
+        snapshot = MarketSnapshot(
+            version=old.version + 1,
+            schema=schema,
+            stocks=stocks,
+            trie=trie,
+            search_index=search_index,
+            table=table,
+            ranked=old.ranked,
+        )
+        return snapshot, diff, raw_by_name
+
+    def _build_search_index(
+        self,
+        schema: StockSchema,
+        stocks: Mapping[str, Tuple[Any, ...]],
+        scores: Dict[str, Optional[float]],
+    ) -> SearchIndex:
+        symbol_idx = schema.index.get("Symbol")
+        search_index = SearchIndex()
+        for name, row in stocks.items():
+            search_index.add(
+                name,
+                scores.get(name),
+                aliases=_symbol_aliases(row[symbol_idx]) if symbol_idx is not None else (),
+            )
+        return search_index
+
+    def _change_events(
+        self, old: MarketSnapshot, new: MarketSnapshot, diff: SnapshotDiff
+    ) -> List[ChangeEvent]:
+        """Listings, delistings and price moves beyond `move_threshold_pct`."""
+        for name in diff.removed:
+            self._reference_prices.pop(name, None)
+        if not len(old):
+            # Nothing to compare the first load against
+            return []
+
+        events = [ChangeEvent(ChangeEvent.LISTED, n, new.version) for n in diff.added]
+        events.extend(ChangeEvent(ChangeEvent.DELISTED, n, new.version) for n in diff.removed)
+
+        old_idx = old.schema.index.get(self.price_column) if old.schema else None
+        new_idx = new.schema.index.get(self.price_column) if new.schema else None
+        if new_idx is None or new_idx not in new.schema.numeric:
+            return events
+        for name in diff.changed:
+            price = new.stocks[name][new_idx]
+            if price is None:
+                continue
+            reference = self._reference_prices.get(name)
+            if reference is None:
+                reference = old.stocks[name][old_idx] if old_idx is not None else None
+                if not isinstance(reference, (int, float)):
+                    reference = price
+                self._reference_prices[name] = reference
+            if not reference:
+                continue
+            pct = (price - reference) / reference * 100
+            if abs(pct) >= self.move_threshold_pct:
+                events.append(
+                    ChangeEvent(ChangeEvent.PRICE_MOVE, name, new.version, reference, price, pct)
+                )
+                self._reference_prices[name] = price
+        return events
+
+    def _build_snapshot(
+        self,
+        header: Sequence[str],
+        raw_rows: Sequence[Sequence[Any]],
+        persist_index: bool = True,
+    ) -> MarketSnapshot:
+        schema = StockSchema.infer(header, raw_rows)
+        name_idx = schema.index.get("Name")
+        rank_idx = schema.index.get(self.rank_by)
+        if rank_idx not in schema.numeric:
+            rank_idx = None
+
+        stocks: Dict[str, Tuple[Any, ...]] = {}
+        scores: Dict[str, Optional[float]] = {}
+        for raw in raw_rows:
+            row = schema.parse_row(raw)
+            name = str(row[name_idx]).lower() if name_idx is not None else ""
+            if name:
+                scores[name] = row[rank_idx] if rank_idx is not None else None
+                stocks[name] = row
+
+        return MarketSnapshot(
+            version=self._snapshot.version + 1,
+            schema=schema,
+            stocks=stocks,
+            trie=(
+                self._load_name_index(scores)
+                if persist_index
+                else CompactTrie.build(scores, scores)
+            ),
+            search_index=self._build_search_index(schema, stocks, scores),
+            table=MarketTable(schema, list(stocks), list(stocks.values())),
+            ranked=rank_idx is not None,
+        )
+
+    def _load_name_index(self, scores: Dict[str, Optional[float]]) -> CompactTrie:
+        """Memory-map the saved name index, rebuilding it if the CSV is newer."""
+        try:
+            if os.path.getmtime(self.index_path) >= os.path.getmtime(self.csv_path):
+                trie = CompactTrie.load(self.index_path)
+                if len(trie) == len(scores):
+                    logger.info("Memory-mapped name index from %s.", self.index_path)
+                    return trie
+                trie.close()
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("Rebuilding unreadable name index %s: %s", self.index_path, e)
 
-        logger.info("Loaded %d rows into memory.", len(self.stocks))
+        trie = CompactTrie.build(scores, scores)
+        try:
+            trie.save(self.index_path)
+        except OSError as e:
+            logger.warning("Could not save name index to %s: %s", self.index_path, e)
+        return trie
+
+    def _alias_index(self, snap: MarketSnapshot) -> Dict[str, Optional[str]]:
+        """Names without their legal suffix and symbols; None marks an ambiguous alias."""
+        built_for, aliases = self._aliases
+        if built_for is snap:
+            return aliases
+        aliases = {}
+
+        def put(alias: str, name: str):
+            if alias and alias != name:
+                aliases[alias] = name if aliases.get(alias, name) == name else None
+
+        symbol_idx = snap.schema.index.get("Symbol") if snap.schema else None
+        for name in snap.stocks:
+            put(_NAME_SUFFIX_RE.sub("", name), name)
+            if symbol_idx is not None:
+                put(str(snap.stocks[name][symbol_idx]).strip().lower(), name)
+        self._aliases = (snap, aliases)
+        return aliases
+
+    def resolve_exact(self, query: str) -> Optional[str]:
+        """
+        The company `query` names unambiguously: its full name, its name
+        without a legal suffix such as "Ltd", or its symbol. Case-insensitive.
+        """
+        q = " ".join((query or "").lower().split())
+        if not q:
+            return None
+        snap = self._snapshot
+        if q in snap.stocks:
+            return q
+        return self._alias_index(snap).get(q)
 
-    def find_matches(self, query: str, limit: int = 5) -> List[Stock]:
+    def get_stock(self, name: str, lazy: bool = True) -> Optional[Stock]:
+        """The stock with exactly this (lower-cased) name, if listed."""
+        snap = self._snapshot
+        row = snap.stocks.get(name)
+        return Stock.from_values(snap.schema, row, lazy=lazy) if row is not None else None
+
+    @timed("index.find_matches")
+    def find_matches(self, query: str, limit: int = 5, lazy: bool = True) -> List[Stock]:
         if not query:
             return []
+        snap = self._snapshot
         q = query.lower()
-        companies = self.trie.autocomplete(q)
+        # Exact prefixes go through the trie; word-level and misspelled
+        # queries fall back to the fuzzy search index.
+        companies: List[str] = []
+        if snap.trie.starts_with(q):
+            companies = snap.trie.autocomplete(q, limit=limit, ranked=snap.ranked)
+        if len(companies) < limit:
+            for name in snap.search_index.search(q, limit=limit):
+                if name not in companies:
+                    companies.append(name)
         logger.info("Autocomplete suggestions for '%s': %s", q, companies)
 
         matches: List[Stock] = []
         for name in companies:
-            row = self.stocks.get(name)
+            row = snap.stocks.get(name)
             if row:
-                matches.append(Stock.from_dict(row))
+                matches.append(Stock.from_values(snap.schema, row, lazy=lazy))
             if len(matches) >= limit:
                 break
         return matches
+
+    @timed("index.screen")
+    def screen(
+        self,
+        conditions: Sequence[str] = (),
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        limit: int = 10,
+    ) -> List[Stock]:
+        """
+        Run a market-wide screening query over the columnar snapshot.
+
+        `conditions` are strings such as "Volume > 1000000" or
+        "LTP between 100 and 500"; rows must satisfy all of them.
+        """
+        snap = self._snapshot
+        if snap.table is None or snap.schema is None:
+            return []
+        parsed = [c for text in conditions for c in MarketTable.parse_condition(text)]
+        idx = snap.table.screen(parsed, sort_by=sort_by, descending=descending, limit=limit)
+        names = snap.table.names
+        return [
+            Stock.from_values(snap.schema, snap.stocks[names[i]], lazy=True)
+            for i in idx
+        ]
@@ -0,0 +1,336 @@
+import os
+import json
+import zlib
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from models.stock_schema import parse_number
+from services.scraper.interfaces import DataSinkInterface
+
+logger = logging.getLogger(__name__)
+
+# Record layout of the append-only log of the current day
+TICK_DTYPE = np.dtype(
+    [("ts", "<i8"), ("sym", "<i4"), ("_pad", "<i4"), ("price", "<f8"), ("volume", "<f8")]
+)
+# Layout of one symbol's chunk in a compacted day
+CHUNK_DTYPE = np.dtype([("ts", "<i8"), ("price", "<f8"), ("volume", "<f8")])
+
+_SYMBOLS = "symbols.txt"
+_LOG = "ticks.log"
+_CHUNKS = "ticks.z"
+_INDEX = "index.json"
+
+
+def _cell_number(row: Sequence[Any], i: Optional[int]) -> Optional[float]:
+    """The number in cell `i` of `row`; None if it is missing or does not parse."""
+    if i is None or i >= len(row):
+        return None
+    try:
+        return parse_number(row[i])
+    except ValueError:
+        return None
+
+
+class Bar:
+    """One OHLC bar of a symbol's price history."""
+
+    __slots__ = ("start", "open", "high", "low", "close", "volume")
+
+    def __init__(
+        self, start: int, open: float, high: float, low: float, close: float, volume: float
+    ):
+        self.start = start
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class TickStore(DataSinkInterface):
+    """
+    Append-only price history of every refresh, partitioned by trading day.
+
+    Each day lives in its own directory. While the day is open, refreshes
+    are appended as fixed-size records to `ticks.log`, which readers
+    memory-map. Once a later day starts the log is compacted on a background
+    thread: records are grouped per symbol, sorted by time and
+    zlib-compressed into `ticks.z` with a JSON index of chunk offsets, so a
+    query only reads and inflates the chunks of the symbol it asks for.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        price_column: str = "LTP",
+        volume_column: str = "Volume",
+        name_column: str = "Name",
+        tz: str = "Asia/Kolkata",
+    ):
+        self.root = root
+        self.price_column = price_column
+        self.volume_column = volume_column
+        self.name_column = name_column
+        self.tz = ZoneInfo(tz)
+        self._lock = threading.Lock()
+        # Symbol ids of the day currently being appended to
+        self._day: Optional[date] = None
+        self._symbols: Dict[str, int] = {}
+        # Finished days are compacted off the refresh path, one at a time
+        self._compactor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tick-compact")
+        self.pending_compaction: Optional[Future] = None
+        os.makedirs(root, exist_ok=True)
+
+    def _day_of(self, ts: float) -> date:
+        return datetime.fromtimestamp(ts, self.tz).date()
+
+    def _day_dir(self, day: date) -> str:
+        return os.path.join(self.root, day.isoformat())
+
+    def days(self) -> List[date]:
+        """Every day with stored ticks, oldest first."""
+        out = []
+        for entry in os.listdir(self.root):
+            try:
+                out.append(date.fromisoformat(entry))
+            except ValueError:
+                continue
+        return sorted(out)
+
+    def publish(self, data: List[List[Any]]):
+        if data:
+            self.append(data[0], data[1:])
+
+    def append(
+        self,
+        header: Sequence[str],
+        rows: Sequence[Sequence[Any]],
+        timestamp: Optional[float] = None,
+    ) -> int:
+        """Append one refresh of the market table. Returns the number of ticks stored."""
+        ts = time.time() if timestamp is None else timestamp
+        positions = {col: i for i, col in enumerate(header)}
+        try:
+            name_i = positions[self.name_column]
+            price_i = positions[self.price_column]
+        except KeyError as e:
+            raise ValueError(f"Scraped table has no {e} column") from None
+        volume_i = positions.get(self.volume_column)
+
+        finished: List[date] = []
+        with self._lock:
+            day = self._day_of(ts)
+            if day != self._day:
+                finished = self._open_day(day)
+            day_dir = self._day_dir(day)
+
+            records = np.zeros(len(rows), dtype=TICK_DTYPE)
+            new_symbols: List[str] = []
+            n = 0
+            for row in rows:
+                name = str(row[name_i]).strip().lower() if name_i < len(row) else ""
+                # A bad price drops only its row; a bad volume is stored as NaN
+                price = _cell_number(row, price_i)
+                if not name or price is None:
+                    continue
+                sym = self._symbols.get(name)
+                if sym is None:
+                    sym = self._symbols[name] = len(self._symbols)
+                    new_symbols.append(name)
+                volume = _cell_number(row, volume_i)
+                records[n] = (int(ts), sym, 0, price, np.nan if volume is None else volume)
+                n += 1
+
+            # Symbols are written before the ticks that refer to them
+            if new_symbols:
+                with open(os.path.join(day_dir, _SYMBOLS), "a", encoding="utf-8") as f:
+                    f.write("".join(f"{s}\n" for s in new_symbols))
+            with open(os.path.join(day_dir, _LOG), "ab") as f:
+                f.write(records[:n].tobytes())
+        if finished:
+            self.pending_compaction = self._compactor.submit(self._compact_days, finished)
+        return n
+
+    def _open_day(self, day: date) -> List[date]:
+        """Start appending to `day`; returns the earlier days still in log form."""
+        os.makedirs(self._day_dir(day), exist_ok=True)
+        self._day = day
+        self._symbols = {name: i for i, name in enumerate(self._read_symbols(day))}
+        return [
+            past
+            for past in self.days()
+            if past < day and os.path.exists(os.path.join(self._day_dir(past), _LOG))
+        ]
+
+    def _compact_days(self, days: List[date]):
+        for past in days:
+            # A day can be queued twice when the day changes again meanwhile
+            if not os.path.exists(os.path.join(self._day_dir(past), _LOG)):
+                continue
+            try:
+                self.compact(past)
+            except Exception as e:
+                logger.error("Failed to compact ticks of %s: %s", past, e)
+
+    def close(self, wait: bool = True):
+        """Stop the compaction thread, by default after pending compactions finish."""
+        self._compactor.shutdown(wait=wait)
+
+    def _read_symbols(self, day: date) -> List[str]:
+        try:
+            with open(os.path.join(self._day_dir(day), _SYMBOLS), encoding="utf-8") as f:
+                return f.read().splitlines()
+        except FileNotFoundError:
+            return []
+
+    def _read_log(self, day: date) -> np.ndarray:
+        path = os.path.join(self._day_dir(day), _LOG)
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return np.zeros(0, dtype=TICK_DTYPE)
+        # A torn trailing record from a crash mid-append is ignored
+        count = size // TICK_DTYPE.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=TICK_DTYPE)
+        return np.memmap(path, dtype=TICK_DTYPE, mode="r", shape=(count,))
+
+    def compact(self, day: date):
+        """Rewrite a finished day's log as compressed per-symbol chunks."""
+        day_dir = self._day_dir(day)
+        log = self._read_log(day)
+        symbols = self._read_symbols(day)
+        order = np.lexsort((log["ts"], log["sym"]))
+        sorted_log = log[order]
+        del log
+
+        index: Dict[str, List[int]] = {}
+        tmp = os.path.join(day_dir, _CHUNKS + ".tmp")
+        with open(tmp, "wb") as f:
+            bounds = np.flatnonzero(np.diff(sorted_log["sym"])) + 1
+            for chunk in np.split(sorted_log, bounds):
+                if not len(chunk):
+                    continue
+                out = np.empty(len(chunk), dtype=CHUNK_DTYPE)
+                for field in CHUNK_DTYPE.names:
+                    out[field] = chunk[field]
+                data = zlib.compress(out.tobytes(), 6)
+                index[symbols[int(chunk["sym"][0])]] = [f.tell(), len(data), len(chunk)]
+                f.write(data)
+        with open(os.path.join(day_dir, _INDEX + ".tmp"), "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, os.path.join(day_dir, _CHUNKS))
+        os.replace(os.path.join(day_dir, _INDEX + ".tmp"), os.path.join(day_dir, _INDEX))
+        os.remove(os.path.join(day_dir, _LOG))
+        logger.info("Compacted %d ticks of %d symbols for %s.", len(sorted_log), len(index), day)
+
+    def _day_ticks(self, day: date, name: str) -> np.ndarray:
+        day_dir = self._day_dir(day)
+        try:
+            with open(os.path.join(day_dir, _INDEX), encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            index = None
+        if index is not None:
+            entry = index.get(name)
+            if entry is None:
+                return np.zeros(0, dtype=CHUNK_DTYPE)
+            offset, length, _ = entry
+            with open(os.path.join(day_dir, _CHUNKS), "rb") as f:
+                f.seek(offset)
+                return np.frombuffer(zlib.decompress(f.read(length)), dtype=CHUNK_DTYPE)
+
+        # Still in log form: scan the memory-mapped records of this symbol only
+        symbols = self._read_symbols(day)
+        try:
+            sym = symbols.index(name)
+        except ValueError:
+            return np.zeros(0, dtype=CHUNK_DTYPE)
+        log = self._read_log(day)
+        hits = log[log["sym"] == sym]
+        out = np.empty(len(hits), dtype=CHUNK_DTYPE)
+        for field in CHUNK_DTYPE.names:
+            out[field] = hits[field]
+        return out
+
+    def ticks(self, name: str, start: float, end: Optional[float] = None) -> np.ndarray:
+        """Ticks of `name` (lower-cased company name) with `start <= ts < end`, by time."""
+        end = time.time() + 1 if end is None else end
+        name = name.strip().lower()
+        first, last = self._day_of(start), self._day_of(end)
+        parts = []
+        for day in self.days():
+            if first <= day <= last:
+                chunk = self._day_ticks(day, name)
+                parts.append(chunk[(chunk["ts"] >= start) & (chunk["ts"] < end)])
+        if not parts:
+            return np.zeros(0, dtype=CHUNK_DTYPE)
+        out = np.concatenate(parts)
+        return out[np.argsort(out["ts"], kind="stable")]
+
+    def ohlc(
+        self, name: str, start: float, end: Optional[float] = None, interval: float = 3600
+    ) -> List[Bar]:
+        """
+        Aggregate ticks into OHLC bars of `interval` seconds aligned to `start`.
+
+        Bar volume is the growth of the cumulative day volume within the bar.
+        """
+        data = self.ticks(name, start, end)
+        if not len(data):
+            return []
+        ts, price, volume = data["ts"], data["price"], data["volume"]
+        buckets = ((ts - start) // interval).astype(np.int64)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        ends = np.concatenate((starts[1:], [len(ts)])) - 1
+
+        highs = np.maximum.reduceat(price, starts)
+        lows = np.minimum.reduceat(price, starts)
+        last_volume = volume[ends]
+        # Day volume resets at the open, so a drop means a new day began
+        prev_volume = np.concatenate(([np.nan], last_volume[:-1]))
+        new_day = np.array(
+            [self._day_of(ts[s]) for s in starts], dtype="datetime64[D]"
+        )
+        same_day = np.concatenate(([False], new_day[1:] == new_day[:-1]))
+        first_volume = np.where(same_day, prev_volume, volume[starts])
+        bar_volume = np.nan_to_num(last_volume - first_volume)
+
+        return [
+            Bar(
+                start=int(start + buckets[s] * interval),
+                open=float(price[s]),
+                high=float(highs[i]),
+                low=float(lows[i]),
+                close=float(price[e]),
+                volume=float(max(bar_volume[i], 0.0)),
+            )
+            for i, (s, e) in enumerate(zip(starts, ends))
+        ]
+
+    def change(
+        self, name: str, start: float, end: Optional[float] = None
+    ) -> Optional[Tuple[float, float, float]]:
+        """(first price, last price, percent change) over the window, or None."""
+        data = self.ticks(name, start, end)
+        if not len(data):
+            return None
+        first, last = float(data["price"][0]), float(data["price"][-1])
+        pct = (last - first) / first * 100 if first else float("nan")
+        return first, last, pct
+
+    def day_start(self, day: Optional[date] = None) -> float:
+        """Epoch seconds of local midnight of `day` (today by default)."""
+        day = day or datetime.now(self.tz).date()
+        return datetime(day.year, day.month, day.day, tzinfo=self.tz).timestamp()
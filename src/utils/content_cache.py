@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedPage:
+    """A scraped company page and the time it was fetched."""
+
+    url: str
+    content: str
+    scraped_at: float
+    size: int = 0
+
+    def __post_init__(self):
+        if not self.size:
+            self.size = len(self.content.encode("utf-8"))
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.time()) - self.scraped_at
+
+
+class ContentCache:
+    """
+    A TTL + LRU cache of scraped page markdown keyed by URL.
+
+    Entries live in memory up to `max_bytes` of content and are optionally
+    mirrored to `disk_dir` so they survive restarts. Concurrent requests for
+    the same URL share a single in-flight scrape.
+    """
+
+    _instance: Optional["ContentCache"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        ttl_seconds: float = 900,
+        max_bytes: int = 32 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._entries: "OrderedDict[str, CachedPage]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def instance(cls) -> "ContentCache":
+        """Return the shared cache, creating a memory-only one on first use."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def configure(cls, **kwargs) -> "ContentCache":
+        """Replace the shared cache with one built from `kwargs`."""
+        with cls._instance_lock:
+            cls._instance = cls(**kwargs)
+            return cls._instance
+
+    def _is_fresh(self, page: CachedPage) -> bool:
+        return page.age() <= self.ttl_seconds
+
+    def _disk_path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir or "", f"{digest}.json")
+
+    def _read_disk(self, url: str) -> Optional[CachedPage]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(url), encoding="utf-8") as f:
+                raw = json.load(f)
+            return CachedPage(
+                url=raw["url"], content=raw["content"], scraped_at=raw["scraped_at"]
+            )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable cache file for %s: %s", url, e)
+            return None
+
+    def _write_disk(self, page: CachedPage):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(page.url)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"url": page.url, "content": page.content, "scraped_at": page.scraped_at},
+                    f,
+                )
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Could not persist cache entry for %s: %s", page.url, e)
+
+    def _store(self, page: CachedPage):
+        with self._lock:
+            old = self._entries.pop(page.url, None)
+            if old is not None:
+                self._bytes -= old.size
+            if page.size > self.max_bytes:
+                return
+            self._entries[page.url] = page
+            self._bytes += page.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def get(self, url: str, count_miss: bool = True) -> Optional[CachedPage]:
+        """
+        Return a fresh cached page for `url`, or None.
+
+        Pass `count_miss=False` for a check that is followed by a `fetch` on
+        a miss, so the miss is not counted twice.
+        """
+        with self._lock:
+            page = self._entries.get(url)
+            if page is not None:
+                if self._is_fresh(page):
+                    self._entries.move_to_end(url)
+                    self.hits += 1
+                    return page
+                del self._entries[url]
+                self._bytes -= page.size
+
+        page = self._read_disk(url)
+        if page is not None and self._is_fresh(page):
+            self._store(page)
+            with self._lock:
+                self.hits += 1
+            return page
+
+        if count_miss:
+            with self._lock:
+                self.misses += 1
+        return None
+
+    def put(self, url: str, content: str) -> CachedPage:
+        """Record freshly scraped content for `url`."""
+        page = CachedPage(url=url, content=content, scraped_at=time.time())
+        self._store(page)
+        self._write_disk(page)
+        return page
+
+    async def fetch(self, url: str, loader: Callable[[], Awaitable[str]]) -> CachedPage:
+        """
+        Return a fresh page for `url`, calling `loader` on a miss.
+
+        Only one loader runs per URL at a time; other callers await its result.
+        """
+        page = self.get(url)
+        if page is not None:
+            return page
+
+        with self._lock:
+            inflight = self._inflight.get(url)
+            owner = inflight is None
+            if owner:
+                inflight = self._inflight[url] = Future()
+
+        if not owner:
+            return await asyncio.wrap_future(inflight)
+
+        try:
+            page = self.put(url, await loader())
+            inflight.set_result(page)
+            return page
+        except BaseException as e:
+            inflight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "inflight": len(self._inflight),
+            }
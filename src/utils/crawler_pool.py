@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Coroutine, Optional
+
+if TYPE_CHECKING:
+    # crawl4ai takes most of a second to import; it is loaded on first crawl
+    from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlerPool:
+    """
+    A process-wide headless browser shared by all company page scrapes.
+
+    The pool owns one persistent event loop running on a daemon thread and a
+    single long-lived AsyncWebCrawler bound to that loop. Scrape jobs are
+    submitted to the loop and at most `max_pages` pages are open at once, so
+    each lookup pays page-fetch time instead of browser-launch time.
+    """
+
+    _instance: Optional["CrawlerPool"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_pages: int = 4, browser_config: Optional["BrowserConfig"] = None):
+        self.max_pages = max_pages
+        self.browser_config = browser_config
+        self._crawler: Optional["AsyncWebCrawler"] = None
+        self._crawler_lock = asyncio.Lock()
+        self._pages = asyncio.Semaphore(max_pages)
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="crawler-pool", daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def instance(cls) -> "CrawlerPool":
+        """Return the shared pool, creating it on first use."""
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance._closed:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def shutdown_instance(cls, wait: bool = True):
+        """Shut down the shared pool if one was created."""
+        with cls._instance_lock:
+            pool, cls._instance = cls._instance, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _get_crawler(self) -> "AsyncWebCrawler":
+        async with self._crawler_lock:
+            if self._crawler is None:
+                from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+                if self.browser_config is None:
+                    self.browser_config = BrowserConfig(headless=True)
+                crawler = AsyncWebCrawler(config=self.browser_config)
+                await crawler.start()
+                self._crawler = crawler
+                logger.info("Started shared headless browser.")
+            return self._crawler
+
+    async def crawl(self, url: str, config: "CrawlerRunConfig") -> Any:
+        """Fetch a URL in a pooled browser page. Must run on the pool loop."""
+        crawler = await self._get_crawler()
+        async with self._pages:
+            return await crawler.arun(url=url, config=config)
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """Schedule a coroutine on the pool loop from any thread."""
+        if self._closed:
+            coro.close()
+            raise RuntimeError("CrawlerPool has been shut down.")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _close(self, wait: bool):
+        current = asyncio.current_task()
+        pending = [t for t in asyncio.all_tasks() if t is not current]
+        if not wait:
+            for task in pending:
+                task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if self._crawler is not None:
+            await self._crawler.close()
+            self._crawler = None
+
+    def shutdown(self, wait: bool = True, timeout: float = 30):
+        """Close the browser and stop the pool loop."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(wait), self._loop).result(
+                timeout=timeout
+            )
+        except Exception:
+            logger.exception("Error closing shared headless browser")
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=timeout)
+            if not self._thread.is_alive():
+                self._loop.close()
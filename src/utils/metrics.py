@@ -0,0 +1,338 @@
+import os
+import json
+import time
+import random
+import inspect
+import logging
+import functools
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds, from index lookups to model calls
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# A metric name plus its sorted (label, value) pairs
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Mapping[str, Any]) -> MetricKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+
+
+def _display(key: MetricKey) -> str:
+    """'tool{tool=get_stock_data}' style name for logs and snapshots."""
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+def _flatten(prefix: str, value: Any, out: Dict[str, float]):
+    """Numeric leaves of a stats dict, as 'prefix_key_subkey' gauges."""
+    if isinstance(value, Mapping):
+        for k, v in value.items():
+            _flatten(f"{prefix}_{k}", v, out)
+    elif isinstance(value, (bool, int, float)):
+        out[_metric_name(prefix)] = float(value)
+
+
+class _SpanStats:
+    __slots__ = ("calls", "errors", "counts", "sum", "max")
+
+    def __init__(self, buckets: int):
+        self.calls = 0
+        self.errors = 0
+        # One count per bucket plus the +Inf overflow
+        self.counts = [0] * (buckets + 1)
+        self.sum = 0.0
+        self.max = 0.0
+
+    @property
+    def sampled(self) -> int:
+        return sum(self.counts)
+
+    def quantile(self, bounds: Sequence[float], q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket."""
+        total = self.sampled
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = bounds[i - 1] if i > 0 else 0.0
+                upper = bounds[i] if i < len(bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+
+class _Span:
+    """Times one call of a span; see `Metrics.span`."""
+
+    __slots__ = ("_metrics", "_key", "_start")
+
+    def __init__(self, metrics: "Metrics", key: MetricKey):
+        self._metrics = metrics
+        self._key = key
+        self._start: Optional[float] = None
+
+    def __enter__(self) -> "_Span":
+        if self._metrics.sampled():
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        start = self._start
+        elapsed = None if start is None else time.perf_counter() - start
+        self._metrics._record(self._key, elapsed, exc_type is not None)
+        return False
+
+
+class Metrics:
+    """
+    In-process timing spans, counters and gauges for the hot paths.
+
+    Every span call is counted, and a `sample_rate` fraction of calls is
+    also timed into a fixed-bucket histogram, so production can keep the
+    per-call cost to a counter increment. Registered collectors turn the
+    existing `stats()` dicts into gauges at export time. Everything is
+    exported as Prometheus text (`render_prometheus`) or as a JSON summary
+    logged every `log_interval` seconds.
+    """
+
+    _instance: Optional["Metrics"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        prefix: str = "stock_agent",
+        log_interval: float = 0.0,
+    ):
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._spans: Dict[MetricKey, _SpanStats] = {}
+        self._counters: Dict[MetricKey, float] = {}
+        self._collectors: Dict[str, Callable[[], Mapping[str, Any]]] = {}
+        self._stop = threading.Event()
+        self._reporter: Optional[threading.Thread] = None
+        if log_interval > 0:
+            self.start_log_reporter(log_interval)
+
+    @classmethod
+    def instance(cls) -> "Metrics":
+        """
+        Return the shared registry, creating it on first use from
+        STOCK_AGENT_METRICS_SAMPLE and STOCK_AGENT_METRICS_LOG_INTERVAL.
+        """
+        inst = cls._instance
+        if inst is not None:
+            return inst
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(
+                    sample_rate=float(os.environ.get("STOCK_AGENT_METRICS_SAMPLE", "1")),
+                    log_interval=float(os.environ.get("STOCK_AGENT_METRICS_LOG_INTERVAL", "0")),
+                )
+            return cls._instance
+
+    @classmethod
+    def configure(cls, **kwargs) -> "Metrics":
+        """Replace the shared registry with one built from `kwargs`, keeping its collectors."""
+        with cls._instance_lock:
+            old, cls._instance = cls._instance, cls(**kwargs)
+        if old is not None:
+            old.stop_log_reporter()
+            with old._lock:
+                cls._instance._collectors.update(old._collectors)
+        return cls._instance
+
+    def sampled(self) -> bool:
+        """Whether the current call should be timed."""
+        rate = self.sample_rate
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+    def span(self, name: str, **labels: Any) -> _Span:
+        """Context manager counting and (if sampled) timing the block as `name`."""
+        return _Span(self, _key(name, labels))
+
+    def observe(self, name: str, seconds: float, failed: bool = False, **labels: Any):
+        """Record a span measured elsewhere, e.g. across two callbacks."""
+        self._record(_key(name, labels), seconds if self.sampled() else None, failed)
+
+    def _record(self, key: MetricKey, elapsed: Optional[float], failed: bool):
+        with self._lock:
+            stats = self._spans.get(key)
+            if stats is None:
+                stats = self._spans[key] = _SpanStats(len(self.buckets))
+            stats.calls += 1
+            if failed:
+                stats.errors += 1
+            if elapsed is not None:
+                stats.counts[bisect_left(self.buckets, elapsed)] += 1
+                stats.sum += elapsed
+                if elapsed > stats.max:
+                    stats.max = elapsed
+
+    def incr(self, name: str, value: float = 1, **labels: Any):
+        """Add `value` to the counter `name`."""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def register_collector(self, name: str, collect: Callable[[], Mapping[str, Any]]):
+        """Export the numeric values `collect()` returns as `name_*` gauges."""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def _gauges(self) -> Dict[str, float]:
+        with self._lock:
+            collectors = list(self._collectors.items())
+        gauges: Dict[str, float] = {}
+        for name, collect in collectors:
+            try:
+                _flatten(name, collect() or {}, gauges)
+            except Exception:
+                logger.exception("Metrics collector %s failed", name)
+        return gauges
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-span call counts and latency estimates (ms), counters and gauges."""
+        with self._lock:
+            spans = {
+                _display(key): {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "sampled": s.sampled,
+                    "mean_ms": round(s.sum / s.sampled * 1000, 3) if s.sampled else 0.0,
+                    "p50_ms": round(s.quantile(self.buckets, 0.5) * 1000, 3),
+                    "p95_ms": round(s.quantile(self.buckets, 0.95) * 1000, 3),
+                    "max_ms": round(s.max * 1000, 3),
+                }
+                for key, s in sorted(self._spans.items())
+            }
+            counters = {_display(key): v for key, v in sorted(self._counters.items())}
+        return {"spans": spans, "counters": counters, "gauges": self._gauges()}
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        p = self.prefix
+        lines: List[str] = []
+        with self._lock:
+            spans = sorted(
+                ((("span", name),) + labels, s.calls, s.errors, list(s.counts), s.sum)
+                for (name, labels), s in self._spans.items()
+            )
+            counters = sorted(self._counters.items())
+        if spans:
+            lines.append(f"# HELP {p}_span_seconds Duration of sampled calls of each span.")
+            lines.append(f"# TYPE {p}_span_seconds histogram")
+            for labels, _, _, counts, total in spans:
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f'{p}_span_seconds_bucket{{{_labels(labels)},le="{le}"}} {cumulative}'
+                    )
+                lines.append(f"{p}_span_seconds_sum{{{_labels(labels)}}} {total!r}")
+                lines.append(f"{p}_span_seconds_count{{{_labels(labels)}}} {cumulative}")
+            for metric, index, help_text in (
+                ("span_calls", 1, "Calls of each span, sampled or not."),
+                ("span_errors", 2, "Calls of each span that raised."),
+            ):
+                lines.append(f"# HELP {p}_{metric}_total {help_text}")
+                lines.append(f"# TYPE {p}_{metric}_total counter")
+                for span in spans:
+                    lines.append(f"{p}_{metric}_total{{{_labels(span[0])}}} {span[index]}")
+        typed = set()
+        for (name, labels), value in counters:
+            metric = f"{p}_{_metric_name(name)}_total"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            suffix = "{" + _labels(labels) + "}" if labels else ""
+            lines.append(f"{metric}{suffix} {value:g}")
+        for name, value in sorted(self._gauges().items()):
+            lines.append(f"# TYPE {p}_{name} gauge")
+            lines.append(f"{p}_{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def start_log_reporter(self, interval: float):
+        """Log `snapshot()` as one JSON line every `interval` seconds."""
+        if self._reporter is not None:
+            return
+        self._reporter = threading.Thread(
+            target=self._report_loop, args=(interval,), name="metrics-log", daemon=True
+        )
+        self._reporter.start()
+
+    def stop_log_reporter(self):
+        self._stop.set()
+
+    def _report_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                logger.info("metrics %s", json.dumps(self.snapshot(), separators=(",", ":")))
+            except Exception:
+                logger.exception("Failed to log metrics")
+
+
+def span(name: str, **labels: Any) -> _Span:
+    """`Metrics.span` on the shared registry."""
+    return Metrics.instance().span(name, **labels)
+
+
+def incr(name: str, value: float = 1, **labels: Any):
+    """`Metrics.incr` on the shared registry."""
+    Metrics.instance().incr(name, value, **labels)
+
+
+def timed(name: str, **labels: Any) -> Callable[[Callable], Callable]:
+    """Decorator recording every call of a function or coroutine as span `name`."""
+    key = _key(name, labels)
+
+    def decorate(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _Span(Metrics.instance(), key):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Span(Metrics.instance(), key):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,71 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from utils.metrics import Metrics
+
+
+class ModelCallMetrics(BaseCallbackHandler):
+    """
+    Records every chat model call as a `model` span, labelled with the
+    model name, and counts the input and output tokens it reports.
+
+    Pass it in a run's `callbacks` so it sees the model calls of that run.
+    """
+
+    # Cheap enough to run on the event loop rather than in an executor
+    run_inline = True
+
+    def __init__(self, metrics: Optional[Metrics] = None):
+        self.metrics = metrics
+        self._started: Dict[UUID, Tuple[str, float]] = {}
+
+    @property
+    def ignore_chain(self) -> bool:
+        return True
+
+    @property
+    def ignore_agent(self) -> bool:
+        return True
+
+    @property
+    def ignore_retriever(self) -> bool:
+        return True
+
+    def _start(self, run_id: UUID, serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any]):
+        metadata = kwargs.get("metadata") or {}
+        model = metadata.get("ls_model_name") or (serialized or {}).get("name") or "unknown"
+        self._started[run_id] = (str(model), time.perf_counter())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id, serialized, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id, serialized, kwargs)
+
+    def _finish(self, run_id: UUID, failed: bool) -> Optional[str]:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return None
+        model, t0 = started
+        metrics = self.metrics or Metrics.instance()
+        metrics.observe("model", time.perf_counter() - t0, failed=failed, model=model)
+        return model
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        model = self._finish(run_id, failed=False)
+        if model is None:
+            return
+        metrics = self.metrics or Metrics.instance()
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    metrics.incr("model_tokens", usage.get("input_tokens", 0), model=model, kind="input")
+                    metrics.incr("model_tokens", usage.get("output_tokens", 0), model=model, kind="output")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._finish(run_id, failed=True)
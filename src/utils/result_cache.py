@@ -0,0 +1,77 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class ResultCache:
+    """
+    A bounded LRU cache of rendered tool results and answers.
+
+    Keys are scoped to the market snapshot version they were computed from:
+    the first lookup made against a newer version drops every entry, so a
+    published snapshot invalidates the cache without any explicit hook.
+    Entries also expire after `ttl_seconds`, since rendered results embed
+    scraped detail pages that age independently of the snapshot.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 900):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _sync_version(self, version: int) -> bool:
+        """Move to `version` if it is newer; False if it is already outdated."""
+        if self._version is not None and version < self._version:
+            return False
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+        return True
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key) if self._sync_version(version) else None
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, version: int, value: Any):
+        with self._lock:
+            if not self._sync_version(version):
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "version": self._version,
+            }
@@ -0,0 +1,344 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from utils.content_cache import ContentCache
+from utils.crawler_pool import CrawlerPool
+from utils.scrapper import CompanyScraper
+
+logger = logging.getLogger(__name__)
+
+# Job priorities, most urgent first
+INTERACTIVE = 0  # a user is waiting on the result
+PREFETCH = 1  # speculative, nobody is waiting yet
+
+# Fetches one URL within the given number of seconds
+FetchFn = Callable[[str, float], Awaitable[Any]]
+
+
+class ScrapeRejected(RuntimeError):
+    """Set on a job's future when the scrape queue is full."""
+
+
+class _Job:
+    __slots__ = ("url", "domain", "priority", "seq", "deadline", "enqueued_at", "future", "task")
+
+    def __init__(self, url: str, priority: int, seq: int, deadline: float):
+        self.url = url
+        self.domain = urlparse(url).netloc.lower()
+        self.priority = priority
+        self.seq = seq
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+        self.future: Future = Future()
+        self.task: Optional[asyncio.Task] = None
+
+    def rank(self) -> Tuple[int, int]:
+        return self.priority, self.seq
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 1)
+
+
+async def _fetch_page(url: str, timeout: float) -> Any:
+    """Fetch a company page's profile through the content cache."""
+    scraper = CompanyScraper(url)
+    return await ContentCache.instance().fetch(
+        url, lambda: scraper.scrape_profile(timeout=timeout)
+    )
+
+
+class ScrapeScheduler:
+    """
+    Runs detail-page scrapes on the shared crawler pool, one job per URL.
+
+    Jobs wait in a bounded queue and are started most urgent first, at most
+    `max_active` at a time and at most one per `domain_interval` seconds per
+    host. When the queue is full an interactive job evicts the newest
+    prefetch job; anything else is rejected. Every job has a deadline:
+    queued jobs past it are dropped, and running ones are cancelled, which
+    also closes their browser page.
+    """
+
+    _instance: Optional["ScrapeScheduler"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        pool: Optional[CrawlerPool] = None,
+        max_queue: int = 256,
+        max_active: Optional[int] = None,
+        domain_interval: float = 0.25,
+        interactive_timeout: float = 45.0,
+        prefetch_timeout: float = 300.0,
+        fetch: Optional[FetchFn] = None,
+    ):
+        self.pool = pool or CrawlerPool.instance()
+        self.max_queue = max_queue
+        self.max_active = max_active or self.pool.max_pages
+        self.domain_interval = domain_interval
+        self.timeouts = {INTERACTIVE: interactive_timeout, PREFETCH: prefetch_timeout}
+        self._fetch = fetch or _fetch_page
+        self._lock = threading.Lock()
+        self._queue: List[_Job] = []
+        self._jobs: Dict[str, _Job] = {}  # queued or running, by URL
+        self._domain_next: Dict[str, float] = {}
+        self._seq = 0
+        self._closed = False
+        self._wake = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_active)
+        self._wait_times: Deque[float] = deque(maxlen=1024)
+        self._run_times: Deque[float] = deque(maxlen=1024)
+        self.counters: Dict[str, int] = dict.fromkeys(
+            (
+                "submitted", "deduplicated", "rejected", "evicted", "expired",
+                "completed", "failed", "timed_out", "cancelled",
+            ),
+            0,
+        )
+        self._dispatcher = self.pool.submit(self._dispatch())
+
+    @classmethod
+    def instance(cls) -> "ScrapeScheduler":
+        """Return the shared scheduler, creating it on first use."""
+        with cls._instance_lock:
+            inst = cls._instance
+            if inst is None or inst._closed or inst.pool is not CrawlerPool.instance():
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def configure(cls, **kwargs) -> "ScrapeScheduler":
+        """Replace the shared scheduler with one built from `kwargs`."""
+        with cls._instance_lock:
+            old, cls._instance = cls._instance, cls(**kwargs)
+        if old is not None:
+            old.shutdown()
+        return cls._instance
+
+    @classmethod
+    def current(cls) -> Optional["ScrapeScheduler"]:
+        """The shared scheduler if one is running, without starting one."""
+        inst = cls._instance
+        return inst if inst is not None and not inst._closed else None
+
+    @classmethod
+    def shutdown_instance(cls, wait: bool = True):
+        """Shut down the shared scheduler if one was created."""
+        with cls._instance_lock:
+            inst, cls._instance = cls._instance, None
+        if inst is not None:
+            inst.shutdown(wait=wait)
+
+    def submit(self, url: str, priority: int = PREFETCH) -> Future:
+        """
+        Queue a scrape of `url` and return a future for its result.
+
+        A URL that is already queued or running shares that job's future,
+        which is promoted if the new request is more urgent.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.counters["submitted"] += 1
+            job = self._jobs.get(url)
+            if job is not None:
+                self.counters["deduplicated"] += 1
+                if priority < job.priority:
+                    job.priority = priority
+                    job.deadline = max(job.deadline, now + self.timeouts[priority])
+                return job.future
+            if self._closed:
+                return self._rejected("The scrape scheduler has been shut down.")
+            if len(self._queue) >= self.max_queue and not self._evict_for(priority):
+                return self._rejected(f"Scrape queue is full ({self.max_queue} jobs).")
+            self._seq += 1
+            job = _Job(url, priority, self._seq, now + self.timeouts[priority])
+            self._queue.append(job)
+            self._jobs[url] = job
+        job.future.add_done_callback(lambda f, job=job: self._on_done(job, f))
+        self.pool.loop.call_soon_threadsafe(self._wake.set)
+        return job.future
+
+    def promote(self, url: str):
+        """Mark a queued or running scrape of `url` as awaited by a user."""
+        with self._lock:
+            job = self._jobs.get(url)
+            if job is not None and job.priority > INTERACTIVE:
+                job.priority = INTERACTIVE
+
+    def _rejected(self, reason: str) -> Future:
+        self.counters["rejected"] += 1
+        future: Future = Future()
+        future.set_exception(ScrapeRejected(reason))
+        return future
+
+    def _evict_for(self, priority: int) -> bool:
+        """Drop the newest less urgent queued job to make room. Caller holds the lock."""
+        victims = [j for j in self._queue if j.priority > priority]
+        if not victims:
+            return False
+        victim = max(victims, key=_Job.rank)
+        self._drop(victim)
+        self.counters["evicted"] += 1
+        victim.future.set_exception(ScrapeRejected("Evicted by a more urgent scrape."))
+        return True
+
+    def _drop(self, job: _Job):
+        """Forget a queued job. Caller holds the lock."""
+        self._queue.remove(job)
+        if self._jobs.get(job.url) is job:
+            del self._jobs[job.url]
+
+    def _on_done(self, job: _Job, future: Future):
+        # Only a caller cancelling the future needs handling here
+        if not future.cancelled():
+            return
+        with self._lock:
+            if job in self._queue:
+                self._drop(job)
+            elif self._jobs.get(job.url) is job:
+                del self._jobs[job.url]
+            self.counters["cancelled"] += 1
+            task = job.task
+        if task is not None:
+            self.pool.loop.call_soon_threadsafe(task.cancel)
+
+    def _next_job(self) -> Tuple[Optional[_Job], Optional[float]]:
+        """
+        Take the most urgent job whose host may be hit now, or return how
+        long to wait before one could be (None if the queue is empty).
+        """
+        now = time.monotonic()
+        best: Optional[_Job] = None
+        wait: Optional[float] = None
+        with self._lock:
+            for job in list(self._queue):
+                if job.deadline <= now:
+                    self._drop(job)
+                    self.counters["expired"] += 1
+                    job.future.set_exception(
+                        asyncio.TimeoutError(f"Scrape of {job.url} expired in the queue.")
+                    )
+                    continue
+                ready_at = self._domain_next.get(job.domain, 0.0)
+                if ready_at > now:
+                    delay = min(ready_at, job.deadline) - now
+                    wait = delay if wait is None else min(wait, delay)
+                elif best is None or job.rank() < best.rank():
+                    best = job
+            if best is not None:
+                self._queue.remove(best)
+                self._domain_next[best.domain] = now + self.domain_interval
+                self._wait_times.append(now - best.enqueued_at)
+        return best, wait
+
+    async def _dispatch(self):
+        while True:
+            await self._slots.acquire()
+            job = None
+            while job is None:
+                self._wake.clear()
+                job, wait = self._next_job()
+                if job is None:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+            job.task = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: _Job):
+        started = time.monotonic()
+        try:
+            if job.future.done():  # cancelled while it was being started
+                return
+            remaining = job.deadline - started
+            try:
+                result = await asyncio.wait_for(self._fetch(job.url, remaining), remaining)
+            except asyncio.TimeoutError:
+                self.counters["timed_out"] += 1
+                logger.warning("Scrape of %s missed its %.1fs deadline", job.url, remaining)
+                self._settle(job, exc=asyncio.TimeoutError(f"Scrape of {job.url} timed out."))
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    self.counters["cancelled"] += 1
+                    self._settle(job, exc=asyncio.CancelledError())
+                raise
+            except Exception as e:
+                self.counters["failed"] += 1
+                self._settle(job, exc=e)
+            else:
+                self.counters["completed"] += 1
+                self._settle(job, result=result)
+        finally:
+            self._run_times.append(time.monotonic() - started)
+            with self._lock:
+                if self._jobs.get(job.url) is job:
+                    del self._jobs[job.url]
+            self._slots.release()
+
+    @staticmethod
+    def _settle(job: _Job, result: Any = None, exc: Optional[BaseException] = None):
+        if job.future.done():
+            return
+        if exc is not None:
+            job.future.set_exception(exc)
+        else:
+            job.future.set_result(result)
+
+    async def _close(self, wait: bool):
+        running = [j.task for j in self._jobs.values() if j.task is not None]
+        if not wait:
+            for task in running:
+                task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    def shutdown(self, wait: bool = True, timeout: float = 30):
+        """
+        Stop dispatching, fail every queued job and wait for (or cancel)
+        the running ones.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            queued, self._queue = self._queue, []
+            for job in queued:
+                self._jobs.pop(job.url, None)
+        for job in queued:
+            self._settle(job, exc=ScrapeRejected("The scrape scheduler has been shut down."))
+        self._dispatcher.cancel()
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(wait), self.pool.loop).result(
+                timeout=timeout
+            )
+        except Exception:
+            logger.exception("Error stopping running scrapes")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = {
+                "interactive": sum(j.priority == INTERACTIVE for j in self._queue),
+                "prefetch": sum(j.priority != INTERACTIVE for j in self._queue),
+            }
+            running = len(self._jobs) - len(self._queue)
+            waits = [t * 1000 for t in self._wait_times]
+            runs = [t * 1000 for t in self._run_times]
+        return {
+            "queued": queued,
+            "running": running,
+            "max_queue": self.max_queue,
+            "max_active": self.max_active,
+            **self.counters,
+            "queue_wait_ms": {"p50": _percentile(waits, 50), "p95": _percentile(waits, 95)},
+            "run_ms": {"p50": _percentile(runs, 50), "p95": _percentile(runs, 95)},
+        }
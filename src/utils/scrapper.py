@@ -1,11 +1,35 @@
-import requests
-from bs4 import BeautifulSoup
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode, BrowserConfig
-from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
-from crawl4ai.content_filter_strategy import PruningContentFilter
+import asyncio
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 from abc import ABC, abstractmethod
 
-from abc import ABC, abstractmethod
+from models.company_profile import CompanyProfile
+from utils.crawler_pool import CrawlerPool
+from utils.metrics import timed
+
+if TYPE_CHECKING:
+    from crawl4ai import CrawlerRunConfig
+
+
+@lru_cache(maxsize=1)
+def _company_crawler_config() -> "CrawlerRunConfig":
+    # Imported on first scrape rather than when the module loads
+    from crawl4ai import CrawlerRunConfig, CacheMode
+    from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+    from crawl4ai.content_filter_strategy import PruningContentFilter
+
+    return CrawlerRunConfig(
+        cache_mode=CacheMode.BYPASS,
+        excluded_tags=["nav", "footer", "aside"],
+        remove_overlay_elements=True,
+        markdown_generator=DefaultMarkdownGenerator(
+            content_filter=PruningContentFilter(
+                threshold=0.48, threshold_type="fixed", min_word_threshold=0
+            ),
+            options={"ignore_links": True},
+        ),
+    )
+
 
 class Scraper(ABC):
     @abstractmethod
@@ -18,23 +42,25 @@ class AsyncScraper(ABC):
         pass
 
 class CompanyScraper(AsyncScraper):
-    def __init__(self, url: str):
+    def __init__(self, url: str, pool: Optional[CrawlerPool] = None):
         self.url = url
-        self.browserConfig = BrowserConfig(headless=True)
-        self.crawler_config = CrawlerRunConfig(
-            cache_mode=CacheMode.BYPASS,
-            excluded_tags=["nav", "footer", "aside"],
-            remove_overlay_elements=True,
-            markdown_generator=DefaultMarkdownGenerator(
-                content_filter=PruningContentFilter(
-                    threshold=0.48, threshold_type="fixed", min_word_threshold=0
-                ),
-                options={"ignore_links": True},
-            ),
-        )
+        self.pool = pool or CrawlerPool.instance()
 
-    async def scrape(self) -> str:
-        async with AsyncWebCrawler(config=self.browserConfig) as crawler:
-            result = await crawler.arun(url=self.url, config=self.crawler_config)
-            return result.markdown # type: ignore
+    @timed("scrape.company")
+    async def scrape(self, timeout: Optional[float] = None) -> str:
+        # The browser gives up on the page itself once `timeout` has passed
+        config = _company_crawler_config()
+        if timeout is not None:
+            config = config.clone(page_timeout=max(1000, int(timeout * 1000)))
+        # The shared browser is bound to the pool loop; hop onto it when
+        # awaited from anywhere else.
+        crawl = self.pool.crawl(self.url, config)
+        if asyncio.get_running_loop() is self.pool.loop:
+            result = await crawl
+        else:
+            result = await asyncio.wrap_future(self.pool.submit(crawl))
+        return result.markdown # type: ignore
 
+    async def scrape_profile(self, timeout: Optional[float] = None) -> str:
+        """Scrape the page and keep only its fundamentals and a short summary, as JSON."""
+        return CompanyProfile.from_markdown(await self.scrape(timeout=timeout)).dumps()
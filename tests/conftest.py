@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The packages under src are imported as top-level modules, as the app does
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,12 @@
+from agent import StockAgent
+from services.scraper.multi_index_scraper import MultiIndexScraper
+from services.stock_service_impl import StockServiceImpl
+
+
+def test_shutdown_closes_the_table_scrapers(tmp_path, monkeypatch):
+    closed = []
+    monkeypatch.setattr(MultiIndexScraper, "close", lambda self: closed.append(self))
+    agent = StockAgent(StockServiceImpl(assets_dir=str(tmp_path)))
+    scraper = agent.scraping_service.scraper
+    agent.shutdown()
+    assert closed == [scraper]
@@ -0,0 +1,55 @@
+from models.compact_trie import CompactTrie
+
+SCORES = {
+    "tata motors": 700.0,
+    "tata steel": 600.0,
+    "tata power": None,
+    "tcs": 900.0,
+    "hdfc bank": 800.0,
+}
+
+
+def test_autocomplete_sorted_and_ranked():
+    trie = CompactTrie.build(SCORES, SCORES)
+    assert trie.autocomplete("tata") == ["tata motors", "tata power", "tata steel"]
+    assert trie.autocomplete("t", ranked=True) == [
+        "tcs", "tata motors", "tata steel", "tata power",
+    ]
+    assert trie.autocomplete("t", limit=2, ranked=True) == ["tcs", "tata motors"]
+    # A misspelled prefix falls back to its longest valid part
+    assert trie.autocomplete("tatx", limit=1) == ["tata motors"]
+    assert not trie.starts_with("x")
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = str(tmp_path / "names.trie")
+    CompactTrie.build(SCORES, SCORES).save(path)
+    trie = CompactTrie.load(path)
+    try:
+        assert len(trie) == len(SCORES)
+        assert trie.autocomplete("ta", ranked=True) == ["tata motors", "tata steel", "tata power"]
+    finally:
+        trie.close()
+
+
+def test_with_changes_matches_a_fresh_build(tmp_path):
+    base = CompactTrie.build(SCORES, SCORES)
+    scores = dict(SCORES, **{"tata power": 1000.0, "tata elxsi": 650.0})
+    del scores["tata steel"]
+    trie = base.with_changes(scores, added=["tata elxsi"], removed=["tata steel"])
+    fresh = CompactTrie.build(scores, scores)
+    for prefix in ("t", "ta", "tata", "tata s", "tata e", "h"):
+        for ranked in (False, True):
+            assert trie.autocomplete(prefix, ranked=ranked) == fresh.autocomplete(
+                prefix, ranked=ranked
+            )
+    assert base.autocomplete("tata s") == ["tata steel"]
+
+    # The overlay and tombstones are folded in when the trie is saved
+    path = str(tmp_path / "names.trie")
+    trie.save(path)
+    loaded = CompactTrie.load(path)
+    try:
+        assert loaded.words() == fresh.words()
+    finally:
+        loaded.close()
@@ -0,0 +1,92 @@
+from models.company_profile import CompanyProfile
+
+PAGE = """
+# [Acme Industries Ltd](https://example.com/acme)
+
+![logo](https://example.com/logo.png)
+
+Acme Industries is a diversified manufacturer of industrial pumps, valves and motors with plants across India. The company also exports to more than forty countries. It was founded in 1962.
+
+| Metric | Value |
+|---|---|
+| **Market Cap** | ₹ 1.25 L Cr |
+| Stock P/E | 24.6 |
+| Industry PE | 31.2 |
+| Price to Book | 4.10 |
+| Book Value | ₹ 312.5 |
+| EPS (TTM) | 48.30 |
+| Dividend Yield | 0.85 % |
+| Face Value | ₹ 2 |
+| ROE | 17.4 % |
+| Debt to Equity | 0.12 |
+| 52 Week Range | 1,020.00 - 1,480.50 |
+"""
+
+
+def test_extracts_fundamentals_from_markdown():
+    profile = CompanyProfile.from_markdown(PAGE)
+    assert profile.market_cap == 125000
+    assert profile.pe == 24.6
+    assert profile.industry_pe == 31.2
+    assert profile.pb == 4.1
+    assert profile.book_value == 312.5
+    assert profile.eps == 48.3
+    assert profile.dividend_yield == 0.85
+    assert profile.face_value == 2
+    assert profile.roe == 17.4
+    assert profile.debt_to_equity == 0.12
+    assert (profile.week52_low, profile.week52_high) == (1020.0, 1480.5)
+
+
+def test_market_cap_scale_and_explicit_52_week_bounds():
+    profile = CompanyProfile.from_markdown(
+        "Mkt Cap: 4.5 k Cr\n52 Wk High: 900\n52 Wk Low: 600\n52 Week Range: 1 - 2"
+    )
+    assert profile.market_cap == 4500
+    # Explicit high/low win over the range
+    assert (profile.week52_low, profile.week52_high) == (600, 900)
+
+
+def test_summary_keeps_prose_and_strips_markdown():
+    profile = CompanyProfile.from_markdown(PAGE)
+    assert profile.summary.startswith("Acme Industries is a diversified manufacturer")
+    assert "](" not in profile.summary and "|" not in profile.summary
+
+    short = CompanyProfile.from_markdown(PAGE, max_summary=120)
+    assert len(short.summary) <= 120
+    assert short.summary.endswith(".")
+
+
+def test_missing_fields_stay_none():
+    profile = CompanyProfile.from_markdown("Nothing useful here.")
+    assert profile.pe is None and profile.market_cap is None
+    assert not profile
+    assert profile.render() == ""
+
+
+def test_dumps_and_loads_round_trip():
+    profile = CompanyProfile.from_markdown(PAGE)
+    text = profile.dumps()
+    assert "null" not in text
+    assert CompanyProfile.loads(text) == profile
+
+
+def test_loads_treats_other_content_as_markdown():
+    assert CompanyProfile.loads("P/E: 12.5").pe == 12.5
+    assert CompanyProfile.loads("{not json} P/E: 7").pe == 7
+    assert CompanyProfile.loads('{"pe": 3, "unknown": 1}') == CompanyProfile(pe=3)
+
+
+def test_render():
+    profile = CompanyProfile(market_cap=123456.789, pe=25.4, week52_low=10.0)
+    assert profile.render() == "MCap(Cr): 123,456.79 | P/E: 25.4 | 52wL: 10"
+    assert profile
+    assert CompanyProfile(summary="Only prose.")
+
+
+def test_pe_label_variants():
+    assert CompanyProfile.from_markdown("Stock P/E: 18.2").pe == 18.2
+    assert CompanyProfile.from_markdown("TTM PE 9.5").pe == 9.5
+    # The sector figure is not the company's own P/E
+    profile = CompanyProfile.from_markdown("Sector P/E: 30")
+    assert (profile.pe, profile.industry_pe) == (None, 30)
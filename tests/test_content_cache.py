@@ -0,0 +1,75 @@
+import time
+import asyncio
+
+import pytest
+
+from utils.content_cache import ContentCache
+
+
+def test_get_put_and_ttl():
+    cache = ContentCache(ttl_seconds=60)
+    assert cache.get("u") is None
+    page = cache.put("u", "body")
+    assert cache.get("u") is page
+    page.scraped_at = time.time() - 61
+    assert cache.get("u") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 0)
+
+
+def test_lru_eviction_by_bytes():
+    cache = ContentCache(max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    cache.get("a")
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    # A page larger than the whole cache is not kept
+    cache.put("big", "x" * 11)
+    assert cache.get("big") is None
+    assert cache.stats()["bytes"] <= 10
+
+
+def test_disk_mirror_survives_a_new_cache(tmp_path):
+    ContentCache(disk_dir=str(tmp_path)).put("u", "body")
+    page = ContentCache(disk_dir=str(tmp_path)).get("u")
+    assert page is not None and page.content == "body"
+
+
+def test_fetch_runs_one_loader_per_url():
+    cache = ContentCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "body"
+
+    async def main():
+        return await asyncio.gather(*(cache.fetch("u", loader) for _ in range(5)))
+
+    pages = asyncio.run(main())
+    assert len(calls) == 1
+    assert {p.content for p in pages} == {"body"}
+    assert asyncio.run(cache.fetch("u", loader)).content == "body"
+    assert len(calls) == 1
+
+
+def test_fetch_shares_a_loader_failure():
+    cache = ContentCache()
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            cache.fetch("u", loader), cache.fetch("u", loader), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.stats()["inflight"] == 0
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.fetch("u", loader))
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from models.market_table import MarketTable
+from models.stock_schema import StockSchema
+
+HEADER = ["Name", "LTP", "Volume"]
+ROWS = [
+    ["alpha", 100.0, 5000.0],
+    ["beta", 250.0, None],
+    ["gamma", None, 1000.0],
+    ["delta", 40.0, 9000.0],
+]
+
+
+@pytest.fixture
+def table():
+    schema = StockSchema(HEADER, numeric=["LTP", "Volume"])
+    return MarketTable(schema, [r[0] for r in ROWS], ROWS)
+
+
+def names(table, idx):
+    return [table.names[i] for i in idx]
+
+
+@pytest.mark.parametrize(
+    "op, value, expected",
+    [
+        (">", 100, ["beta"]),
+        (">=", 100, ["alpha", "beta"]),
+        ("<", 100, ["delta"]),
+        ("<=", 100, ["alpha", "delta"]),
+        ("==", 100, ["alpha"]),
+        ("=", 100, ["alpha"]),
+        ("!=", 100, ["beta", "delta"]),
+    ],
+)
+def test_screen_operators_skip_missing_cells(table, op, value, expected):
+    # gamma has no LTP and must not match any operator, including !=
+    assert names(table, table.screen([("LTP", op, value)], limit=None)) == expected
+
+
+def test_screen_ands_conditions(table):
+    conditions = MarketTable.parse_condition("LTP between 50 and 300")
+    conditions += MarketTable.parse_condition("Volume > 1,000")
+    assert names(table, table.screen(conditions, limit=None)) == ["alpha"]
+
+
+def test_screen_sort_drops_missing_keys(table):
+    idx = table.screen(sort_by="volume", descending=True, limit=None)
+    assert names(table, idx) == ["delta", "alpha", "gamma"]
+    idx = table.screen([("LTP", "!=", 0)], sort_by="Volume", descending=False, limit=1)
+    assert names(table, idx) == ["alpha"]
+
+
+def test_screen_all_missing_column_matches_nothing():
+    schema = StockSchema(HEADER, numeric=["LTP", "Volume"])
+    table = MarketTable(schema, ["a", "b"], [["a", None, 1.0], ["b", None, 2.0]])
+    assert np.isnan(table.columns["LTP"]).all()
+    assert len(table.screen([("LTP", "!=", 5)], limit=None)) == 0
+
+
+def test_parse_condition_rejects_garbage():
+    with pytest.raises(ValueError):
+        MarketTable.parse_condition("LTP is high")
+    with pytest.raises(KeyError):
+        MarketTable(StockSchema(HEADER, numeric=["LTP"]), [], []).screen([("PE", ">", 1)])
+
+
+def test_parse_condition_reads_numbers_like_table_cells():
+    assert MarketTable.parse_condition("Volume between 1,000 and 2,000") == [
+        ("Volume", ">=", 1000.0),
+        ("Volume", "<=", 2000.0),
+    ]
+    assert MarketTable.parse_condition("%Chg >= 2.5%") == [("%Chg", ">=", 2.5)]
+    assert MarketTable.parse_condition("LTP < 1,200.50") == [("LTP", "<", 1200.5)]
+    with pytest.raises(ValueError):
+        MarketTable.parse_condition("LTP between low and 5")
@@ -0,0 +1,130 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from utils.metrics import Metrics, incr, span, timed
+from utils.model_metrics import ModelCallMetrics
+
+
+@pytest.fixture
+def metrics():
+    # A registry of its own, without the collectors other tests registered
+    old, Metrics._instance = Metrics._instance, None
+    yield Metrics.configure()
+    Metrics._instance = old
+
+
+def test_span_counts_times_and_errors():
+    m = Metrics(buckets=(0.1, 1.0))
+    with m.span("lookup", kind="name"):
+        pass
+    with pytest.raises(ValueError):
+        with m.span("lookup", kind="name"):
+            raise ValueError("bad")
+    m.observe("lookup", 5.0, kind="name")
+
+    stats = m.snapshot()["spans"]["lookup{kind=name}"]
+    assert (stats["calls"], stats["errors"], stats["sampled"]) == (3, 1, 3)
+    assert stats["max_ms"] == 5000.0
+    assert 0 < stats["p50_ms"] <= 100.0
+    # Interpolated inside the overflow bucket, capped at the max
+    assert 1000.0 < stats["p95_ms"] <= 5000.0
+
+
+def test_unsampled_calls_are_counted_but_not_timed():
+    m = Metrics(sample_rate=0)
+    for _ in range(3):
+        with m.span("hot"):
+            pass
+    stats = m.snapshot()["spans"]["hot"]
+    assert (stats["calls"], stats["sampled"], stats["mean_ms"]) == (3, 0, 0.0)
+
+
+def test_counters_and_collectors(metrics):
+    incr("cache_hits")
+    incr("cache_hits", 2)
+    incr("tokens", 5, kind="input")
+    metrics.register_collector("pool", lambda: {"size": 4, "busy": {"now": 1}, "name": "x"})
+    metrics.register_collector("broken", lambda: 1 / 0)
+
+    snap = metrics.snapshot()
+    assert snap["counters"] == {"cache_hits": 3, "tokens{kind=input}": 5}
+    assert snap["gauges"] == {"pool_size": 4.0, "pool_busy_now": 1.0}
+
+
+def test_timed_wraps_functions_and_coroutines(metrics):
+    @timed("work", kind="sync")
+    def work(x):
+        return x * 2
+
+    @timed("work", kind="async")
+    async def awork(x):
+        return x + 1
+
+    assert work(2) == 4 and work.__name__ == "work"
+    assert asyncio.run(awork(2)) == 3
+    with span("work", kind="sync"):
+        pass
+
+    spans = Metrics.instance().snapshot()["spans"]
+    assert spans["work{kind=sync}"]["calls"] == 2
+    assert spans["work{kind=async}"]["calls"] == 1
+
+
+def test_configure_keeps_collectors(metrics):
+    metrics.register_collector("pool", lambda: {"size": 2})
+    incr("old")
+    fresh = Metrics.configure(sample_rate=0.5)
+    assert fresh is Metrics.instance() and fresh.sample_rate == 0.5
+    assert fresh.snapshot()["counters"] == {}
+    assert fresh.snapshot()["gauges"] == {"pool_size": 2.0}
+
+
+def test_render_prometheus():
+    m = Metrics(buckets=(0.1, 1.0), prefix="app")
+    m.observe("query", 0.05, route="a")
+    m.observe("query", 0.5, route="a")
+    m.observe("query", 2.0, failed=True, route="a")
+    m.incr("hits", 3)
+    m.incr("tokens", 7, kind='in"put')
+    m.register_collector("cache", lambda: {"size": 10})
+
+    lines = m.render_prometheus().splitlines()
+    assert "# TYPE app_span_seconds histogram" in lines
+    assert 'app_span_seconds_bucket{span="query",route="a",le="0.1"} 1' in lines
+    assert 'app_span_seconds_bucket{span="query",route="a",le="1.0"} 2' in lines
+    assert 'app_span_seconds_bucket{span="query",route="a",le="+Inf"} 3' in lines
+    assert 'app_span_seconds_sum{span="query",route="a"} 2.55' in lines
+    assert 'app_span_seconds_count{span="query",route="a"} 3' in lines
+    assert 'app_span_calls_total{span="query",route="a"} 3' in lines
+    assert 'app_span_errors_total{span="query",route="a"} 1' in lines
+    assert "app_hits_total 3" in lines
+    assert 'app_tokens_total{kind="in\\"put"} 7' in lines
+    assert "# TYPE app_cache_size gauge" in lines
+    assert "app_cache_size 10" in lines
+
+
+def test_model_call_metrics():
+    m = Metrics()
+    handler = ModelCallMetrics(m)
+    ok, failed = uuid4(), uuid4()
+    handler.on_chat_model_start({}, [], run_id=ok, metadata={"ls_model_name": "gpt"})
+    handler.on_chat_model_start({"name": "Other"}, [], run_id=failed)
+    message = AIMessage(
+        content="hi", usage_metadata={"input_tokens": 10, "output_tokens": 3, "total_tokens": 13}
+    )
+    handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=ok)
+    handler.on_llm_error(RuntimeError("down"), run_id=failed)
+    # An end without a start is ignored
+    handler.on_llm_end(LLMResult(generations=[]), run_id=uuid4())
+
+    snap = m.snapshot()
+    assert snap["spans"]["model{model=gpt}"]["calls"] == 1
+    assert snap["spans"]["model{model=Other}"]["errors"] == 1
+    assert snap["counters"] == {
+        "model_tokens{kind=input,model=gpt}": 10,
+        "model_tokens{kind=output,model=gpt}": 3,
+    }
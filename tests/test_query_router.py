@@ -0,0 +1,60 @@
+import pytest
+
+from services.query_router import QueryRouter, normalize_query
+from services.stock_service_impl import StockServiceImpl
+
+HEADER = ["Name", "Symbol", "LTP", "%Chg", "Volume"]
+ROWS = [
+    ["Infosys Ltd", "INFY", "1500", "1.5", "900"],
+    ["Tata Motors Ltd", "TATAMOTORS", "900", "-2.0", "700"],
+    ["Tata Steel Ltd", "TATASTEEL", "150", "0.5", "600"],
+]
+
+
+@pytest.fixture
+def router(tmp_path):
+    service = StockServiceImpl(assets_dir=str(tmp_path))
+    service.load_rows(HEADER, ROWS)
+    return QueryRouter(service, max_limit=20)
+
+
+def test_normalize_query():
+    assert normalize_query("  Price of   INFOSYS?! ") == "price of infosys"
+    assert normalize_query(None) == ""
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["Infosys", "infosys ltd", "INFY", "show me the share price of infosys", "infosys stock"],
+)
+def test_unambiguous_lookups_are_routed(router, query):
+    call = router.route(query)
+    assert (call.tool, call.args) == ("get_stock_data", {"company_name": "infosys ltd"})
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["tata", "price of tata", "should I buy infosys", "compare infosys and tata steel", ""],
+)
+def test_ambiguous_or_open_questions_go_to_the_model(router, query):
+    assert router.route(query) is None
+
+
+def test_screens(router):
+    call = router.route("Top 5 gainers today")
+    assert call.tool == "screen_stocks"
+    assert call.args == {"sort_by": "%Chg", "descending": True, "limit": 5}
+    assert router.route("losers").args["descending"] is False
+    assert router.route("show me the most active stocks").args == {
+        "sort_by": "Volume", "descending": True, "limit": 10,
+    }
+    assert router.route("top 500 gainers").args["limit"] == 20
+    assert router.stats() == {"routed": 4, "passed": 0}
+
+
+def test_screens_need_their_column(tmp_path):
+    service = StockServiceImpl(assets_dir=str(tmp_path))
+    service.load_rows(["Name", "LTP"], [["Infosys Ltd", "1500"]])
+    router = QueryRouter(service)
+    assert router.route("top gainers") is None
+    assert router.stats() == {"routed": 0, "passed": 1}
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from services.scraper.refresh_scheduler import MarketHours, RefreshScheduler
+
+
+class FakeScrapingService:
+    def __init__(self, results):
+        self.results = list(results)
+
+    def run(self, output_filename=None):
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_refresh_records_changes_without_a_callback():
+    service = FakeScrapingService([False, True, RuntimeError("site down")])
+    scheduler = RefreshScheduler(service, "stocks.csv")
+
+    assert scheduler.refresh() is False
+    assert scheduler.last_checked_at is not None
+    assert scheduler.last_changed_at is None
+
+    assert scheduler.refresh() is True
+    assert scheduler.last_changed_at == scheduler.last_checked_at
+
+    changed_at = scheduler.last_changed_at
+    assert scheduler.refresh() is False
+    assert scheduler.last_error == "site down"
+    assert scheduler.last_changed_at == changed_at
+
+
+def test_on_refresh_runs_only_for_changed_data():
+    calls = []
+    service = FakeScrapingService([True, False])
+    scheduler = RefreshScheduler(service, "stocks.csv", on_refresh=lambda: calls.append(1))
+    scheduler.refresh()
+    scheduler.refresh()
+    assert calls == [1]
+
+
+def test_market_hours():
+    hours = MarketHours()
+    tz = hours.tz
+    assert hours.is_open(datetime(2024, 5, 6, 10, 0, tzinfo=tz))  # Monday
+    assert not hours.is_open(datetime(2024, 5, 6, 16, 0, tzinfo=tz))
+    assert not hours.is_open(datetime(2024, 5, 4, 10, 0, tzinfo=tz))  # Saturday
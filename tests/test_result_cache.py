@@ -0,0 +1,37 @@
+from utils.result_cache import ResultCache
+
+
+def test_version_bump_invalidates_entries():
+    cache = ResultCache()
+    cache.put("q", 1, "old")
+    assert cache.get("q", 1) == "old"
+
+    assert cache.get("q", 2) is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["entries"] == 0
+
+    cache.put("q", 2, "new")
+    assert cache.get("q", 2) == "new"
+
+
+def test_outdated_version_is_neither_served_nor_stored():
+    cache = ResultCache()
+    cache.put("q", 3, "current")
+    cache.put("q", 2, "stale")
+    assert cache.get("q", 2) is None
+    assert cache.get("q", 3) == "current"
+
+
+def test_lru_eviction_and_ttl():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1, 1)
+    cache.put("b", 1, 2)
+    cache.get("a", 1)
+    cache.put("c", 1, 3)
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == 1
+    assert cache.stats()["evictions"] == 1
+
+    expiring = ResultCache(ttl_seconds=-1)
+    expiring.put("a", 1, 1)
+    assert expiring.get("a", 1) is None
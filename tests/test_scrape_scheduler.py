@@ -0,0 +1,117 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from utils.crawler_pool import CrawlerPool
+from utils.scrape_scheduler import INTERACTIVE, PREFETCH, ScrapeRejected, ScrapeScheduler
+
+
+@pytest.fixture
+def pool():
+    pool = CrawlerPool(max_pages=1)
+    yield pool
+    pool.shutdown()
+
+
+class BlockingFetch:
+    """A fetch that records its URLs and holds each one until released."""
+
+    def __init__(self):
+        self.urls = []
+        self.release = threading.Event()
+
+    async def __call__(self, url, timeout):
+        self.urls.append(url)
+        while not self.release.is_set():
+            await asyncio.sleep(0.005)
+        return url.upper()
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out waiting for the scheduler"
+        time.sleep(0.005)
+
+
+def make(pool, fetch, **kwargs):
+    kwargs.setdefault("max_queue", 1)
+    return ScrapeScheduler(pool=pool, max_active=1, domain_interval=0, fetch=fetch, **kwargs)
+
+
+def test_full_queue_rejects_and_interactive_evicts_prefetch(pool):
+    fetch = BlockingFetch()
+    scheduler = make(pool, fetch)
+    try:
+        running = scheduler.submit("https://a.example/1")
+        wait_until(lambda: scheduler.stats()["running"] == 1)
+        queued = scheduler.submit("https://a.example/2", PREFETCH)
+
+        with pytest.raises(ScrapeRejected):
+            scheduler.submit("https://a.example/3", PREFETCH).result(timeout=0)
+        # A duplicate shares the queued job instead of taking a slot
+        assert scheduler.submit("https://a.example/2", PREFETCH) is queued
+
+        urgent = scheduler.submit("https://a.example/4", INTERACTIVE)
+        with pytest.raises(ScrapeRejected):
+            queued.result(timeout=0)
+
+        fetch.release.set()
+        assert running.result(timeout=2) == "HTTPS://A.EXAMPLE/1"
+        assert urgent.result(timeout=2) == "HTTPS://A.EXAMPLE/4"
+        stats = scheduler.stats()
+        assert (stats["rejected"], stats["evicted"], stats["deduplicated"]) == (1, 1, 1)
+        assert fetch.urls == ["https://a.example/1", "https://a.example/4"]
+    finally:
+        fetch.release.set()
+        scheduler.shutdown()
+
+
+def test_running_job_is_cancelled_at_its_deadline(pool):
+    fetch = BlockingFetch()
+    scheduler = make(pool, fetch, prefetch_timeout=0.1)
+    try:
+        future = scheduler.submit("https://a.example/slow")
+        with pytest.raises(asyncio.TimeoutError):
+            future.result(timeout=2)
+        assert scheduler.stats()["timed_out"] == 1
+    finally:
+        fetch.release.set()
+        scheduler.shutdown()
+
+
+def test_queued_job_expires_at_its_deadline(pool):
+    fetch = BlockingFetch()
+    scheduler = make(pool, fetch, interactive_timeout=10, prefetch_timeout=0.1)
+    try:
+        running = scheduler.submit("https://a.example/1", INTERACTIVE)
+        wait_until(lambda: scheduler.stats()["running"] == 1)
+        queued = scheduler.submit("https://a.example/2", PREFETCH)
+        time.sleep(0.2)
+        fetch.release.set()
+        assert running.result(timeout=2) == "HTTPS://A.EXAMPLE/1"
+        with pytest.raises(asyncio.TimeoutError):
+            queued.result(timeout=2)
+        assert scheduler.stats()["expired"] == 1
+        assert fetch.urls == ["https://a.example/1"]
+    finally:
+        fetch.release.set()
+        scheduler.shutdown()
+
+
+def test_shutdown_rejects_queued_and_new_jobs(pool):
+    fetch = BlockingFetch()
+    scheduler = make(pool, fetch)
+    running = scheduler.submit("https://a.example/1")
+    wait_until(lambda: scheduler.stats()["running"] == 1)
+    queued = scheduler.submit("https://a.example/2")
+    # Let the running job finish only once shutdown has dropped the queue
+    threading.Timer(0.1, fetch.release.set).start()
+    scheduler.shutdown()
+    with pytest.raises(ScrapeRejected):
+        queued.result(timeout=0)
+    assert running.result(timeout=0) == "HTTPS://A.EXAMPLE/1"
+    with pytest.raises(ScrapeRejected):
+        scheduler.submit("https://a.example/3").result(timeout=0)
@@ -0,0 +1,52 @@
+from models.search_index import SearchIndex, bounded_levenshtein
+
+NAMES = {
+    "hdfc bank ltd": 900.0,
+    "icici bank ltd": 800.0,
+    "reliance industries ltd": 1000.0,
+    "tata motors ltd": 700.0,
+    "tata steel ltd": 600.0,
+}
+
+
+def build(names=NAMES):
+    index = SearchIndex()
+    for name, score in names.items():
+        index.add(name, score)
+    return index
+
+
+def test_bounded_levenshtein():
+    assert bounded_levenshtein("tata", "tata", 2) == 0
+    assert bounded_levenshtein("relaince", "reliance", 2) == 2
+    assert bounded_levenshtein("steel", "bank", 2) is None
+
+
+def test_exact_word_matches_rank_by_score():
+    index = build()
+    assert index.search("bank") == ["hdfc bank ltd", "icici bank ltd"]
+    assert index.search("tata", limit=1) == ["tata motors ltd"]
+
+
+def test_fuzzy_word_matches():
+    index = build()
+    assert index.search("relaince")[0] == "reliance industries ltd"
+    assert index.search("tata steal")[0] == "tata steel ltd"
+
+
+def test_updated_matches_a_fresh_build():
+    index = build()
+    index.search("bank")  # ranks the postings, which `updated` carries over
+    new = index.updated(
+        {"icici bank ltd": 950.0},
+        removed=["tata steel ltd"],
+        added=[("axis bank ltd", 2000.0, ())],
+    )
+    names = dict(NAMES, **{"icici bank ltd": 950.0, "axis bank ltd": 2000.0})
+    del names["tata steel ltd"]
+    fresh = build(names)
+    for query in ("bank", "tata", "steel", "axis", "ltd"):
+        assert new.search(query) == fresh.search(query)
+    # The base index still answers from its own snapshot
+    assert index.search("bank") == ["hdfc bank ltd", "icici bank ltd"]
+    assert len(new) == len(index)
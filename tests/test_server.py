@@ -0,0 +1,121 @@
+import json
+import asyncio
+
+import httpx
+from langchain_core.messages import AIMessageChunk
+
+from server import Admission, create_app
+
+
+class FakeGraph:
+    """Streams one token per run, after `gate` opens."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def astream(self, inputs, config, stream_mode=None):
+        await self.gate.wait()
+        yield AIMessageChunk(content="hi"), {}
+
+
+def events(body):
+    return [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+def test_admission_bounds_running_and_waiting():
+    async def main():
+        admission = Admission(max_concurrency=1, max_queue=1)
+        first = admission.try_enter()
+        await first.start()
+        queued = admission.try_enter()
+        assert admission.try_enter() is None
+        assert admission.stats()["rejected"] == 1
+        assert (admission.running, admission.waiting) == (1, 1)
+
+        # A queued request that goes away gives its place back
+        queued.leave()
+        queued.leave()
+        assert admission.waiting == 0
+        second = admission.try_enter()
+        waiter = asyncio.ensure_future(second.start())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        first.leave()
+        await waiter
+        assert (admission.running, admission.waiting) == (1, 0)
+        second.leave()
+        assert (admission.running, admission.waiting) == (0, 0)
+
+    asyncio.run(main())
+
+
+def test_busy_server_answers_429():
+    async def main():
+        graph = FakeGraph()
+        graph.gate.clear()
+        app = create_app(graph=graph, max_concurrency=1, max_queue=0, refresh=False)
+        admission = app.state.admission
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.ensure_future(
+                client.post("/chat", json={"message": "hello there", "session_id": "s1"})
+            )
+            while admission.running == 0:
+                await asyncio.sleep(0.001)
+            busy = await client.post("/chat", json={"message": "hello again"})
+            assert busy.status_code == 429
+            assert busy.headers["Retry-After"] == "1"
+
+            graph.gate.set()
+            response = await first
+            assert response.headers["X-Session-Id"] == "s1"
+            assert [e["type"] for e in events(response.text)] == ["session", "token", "done"]
+
+            assert (await client.post("/chat", json={"message": "hi"})).status_code == 200
+            assert (await client.post("/chat", json={"message": " "})).status_code == 400
+        assert admission.stats()["rejected"] == 1
+        assert (admission.running, admission.waiting) == (0, 0)
+
+    asyncio.run(main())
+
+
+def test_client_gone_before_the_stream_starts_frees_its_place():
+    async def main():
+        app = create_app(graph=FakeGraph(), max_concurrency=1, max_queue=1, refresh=False)
+        admission = app.state.admission
+        body = json.dumps({"message": "hello there"}).encode()
+        messages = []
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            # A slow client: the disconnect is seen before the body starts
+            if message["type"] == "http.response.start":
+                await asyncio.sleep(0.01)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/chat",
+            "raw_path": b"/chat",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"content-type", b"application/json")],
+            "client": ("test", 1),
+            "server": ("test", 80),
+            "state": {},
+        }
+        for _ in range(3):
+            messages[:] = [
+                {"type": "http.request", "body": body, "more_body": False},
+                {"type": "http.disconnect"},
+            ]
+            await app(scope, receive, send)
+            assert (admission.running, admission.waiting) == (0, 0)
+
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+import math
+
+from models.snapshot_file import SnapshotFile, SnapshotRows, write_snapshot
+from services.stock_service_impl import StockServiceImpl
+
+HEADER = ["Name", "Symbol", "LTP", "Volume", "URL"]
+ROWS = [
+    ["HDFC Bank Ltd", "HDFCBANK", "1,500.25", "900", "https://x/hdfc"],
+    ["Tata Motors Ltd", "", "900", "-", "https://x/tata"],
+    ["Tata Steel Ltd", "TATASTEEL", "150.5", "600", ""],
+    ["HDFC Bank Ltd", "DUP", "1", "1", ""],  # duplicate names keep the first row
+]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "market.snap")
+    assert write_snapshot(path, HEADER, ROWS) == 3
+    snap = SnapshotFile(path)
+    assert snap.names == ["hdfc bank ltd", "tata motors ltd", "tata steel ltd"]
+    assert snap.ranked and snap.rank_by == "Volume"
+    assert [snap.schema.columns[i] for i in sorted(snap.schema.numeric)] == ["LTP", "Volume"]
+    assert snap.row(0) == ("HDFC Bank Ltd", "HDFCBANK", 1500.25, 900, "https://x/hdfc")
+    assert snap.row(1) == ("Tata Motors Ltd", "", 900, None, "https://x/tata")
+    assert math.isnan(snap.numeric_columns["Volume"][1])
+    assert snap.text_column("Symbol") == ["HDFCBANK", "", "TATASTEEL"]
+
+    rows = SnapshotRows(snap)
+    assert len(rows) == 3 and "tata steel ltd" in rows
+    assert rows["tata steel ltd"][2] == 150.5
+    assert snap.trie().autocomplete("tata", ranked=True) == ["tata steel ltd", "tata motors ltd"]
+
+
+def test_boot_from_snapshot(tmp_path):
+    write_snapshot(str(tmp_path / "market.snap"), HEADER, ROWS)
+    service = StockServiceImpl(assets_dir=str(tmp_path))
+    service.boot()
+    snap = service.snapshot
+    assert len(snap) == 3
+    assert snap.table.screen([("Volume", ">", 0)], limit=None).tolist() == [0, 2]
+
+    # A missing rank value sorts last rather than anywhere, and an empty
+    # symbol is not indexed as an alias
+    assert snap.search_index.search("tata") == ["tata steel ltd", "tata motors ltd"]
+    assert snap.search_index.search("none") == []
+    assert service.resolve_exact("tatasteel") == "tata steel ltd"
+    assert [s.name for s in service.find_matches("tata stel", limit=1)] == ["Tata Steel Ltd"]
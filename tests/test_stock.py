@@ -0,0 +1,119 @@
+import asyncio
+import threading
+
+import pytest
+
+from models.company_profile import CompanyProfile
+from models.stock import Stock
+from utils.content_cache import ContentCache
+from utils.crawler_pool import CrawlerPool
+from utils.scrape_scheduler import ScrapeScheduler
+
+URL = "https://www.example.com/stocks/"
+
+
+class FakeFetch:
+    """Serves a profile for every URL through the content cache, like `_fetch_page`."""
+
+    def __init__(self):
+        self.urls = []
+        self.failing = set()
+        self.release = threading.Event()
+        self.release.set()
+
+    async def __call__(self, url, timeout):
+        self.urls.append(url)
+        while not self.release.is_set():
+            await asyncio.sleep(0.005)
+        if url in self.failing:
+            raise RuntimeError("boom")
+
+        async def load():
+            return CompanyProfile(pe=12.5, summary="A company.").dumps()
+
+        return await ContentCache.instance().fetch(url, load)
+
+
+@pytest.fixture
+def fetch():
+    ContentCache.configure()
+    fetch = FakeFetch()
+    ScrapeScheduler.configure(pool=CrawlerPool.instance(), domain_interval=0, fetch=fetch)
+    yield fetch
+    fetch.release.set()
+    ScrapeScheduler.shutdown_instance()
+    CrawlerPool.shutdown_instance()
+    ContentCache.configure()
+
+
+def make(name, lazy=True):
+    return Stock.from_dict({"Name": name, "LTP": 10.0, "URL": URL + name}, lazy=lazy)
+
+
+def test_lazy_stock_scrapes_on_first_request(fetch):
+    stock = make("alpha")
+    assert stock.name == "alpha" and stock.ltp == 10.0
+    assert not stock.is_scraping() and not stock.details_ready()
+    assert fetch.urls == []
+
+    assert stock.wait_for_content(timeout=2)
+    assert stock.details_ready()
+    assert stock.get("fundamentals").pe == 12.5
+    assert "P/E: 12.5" in stock.compact()
+    assert fetch.urls == [URL + "alpha"]
+
+
+def test_eager_stock_starts_scraping_when_built(fetch):
+    stock = make("beta", lazy=False)
+    assert stock.wait_for_content(timeout=2)
+    assert fetch.urls == [URL + "beta"]
+
+
+def test_cached_page_needs_no_scrape(fetch):
+    ContentCache.instance().put(URL + "gamma", CompanyProfile(pe=3.0).dumps())
+    stock = make("gamma")
+    stock.fetch_details()
+    assert stock.details_ready()
+    assert stock.get("fundamentals").pe == 3.0
+    assert fetch.urls == []
+
+
+def test_scrape_is_visible_as_soon_as_it_is_requested(fetch, monkeypatch):
+    fetch.release.clear()
+    seen = []
+    start = Stock._start_scraping
+
+    def spy(self, *args, **kwargs):
+        # Another thread looking at the stock before the job is queued
+        seen.append((self.is_scraping(), self.details_ready()))
+        return start(self, *args, **kwargs)
+
+    monkeypatch.setattr(Stock, "_start_scraping", spy)
+    stock = make("delta")
+    stock.fetch_details()
+    assert seen == [(True, False)]
+    assert stock.is_scraping()
+    assert not stock.wait_for_content(timeout=0.05)
+    fetch.release.set()
+    assert stock.wait_for_content(timeout=2) and stock.details_ready()
+
+
+def test_failed_scrape_does_not_fail_the_prefetch(fetch):
+    good, bad = make("epsilon"), make("zeta")
+    fetch.failing.add(URL + "zeta")
+    fetch.release.clear()
+    threading.Timer(0.05, fetch.release.set).start()
+    assert asyncio.run(Stock.aprefetch([good, bad], timeout=2)) == 1
+    assert not bad.is_scraping() and not bad.details_ready()
+    assert "(company details unavailable)" in bad.compact()
+    assert asyncio.run(bad.await_content(timeout=2))
+
+
+def test_cold_page_counts_one_miss(fetch):
+    stock = make("eta")
+    assert stock.wait_for_content(timeout=2)
+    cache = ContentCache.instance()
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    make("eta").fetch_details()
+    assert (cache.hits, cache.misses) == (1, 1)
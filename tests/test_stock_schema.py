@@ -0,0 +1,24 @@
+from models.stock_schema import StockSchema
+
+HEADER = ["Name", "LTP", "Volume", "URL"]
+
+
+def test_infer_types_columns_by_majority_of_filled_cells():
+    rows = [
+        ["Alpha", "1,200.50", "-", "https://x/a"],
+        ["Beta", "n/a", "", "https://x/b"],
+        ["Gamma", "300", "10", "https://x/c"],
+        ["123", "450", "", "https://x/d"],
+    ]
+    schema = StockSchema.infer(HEADER, rows)
+    assert [schema.columns[i] for i in sorted(schema.numeric)] == ["LTP", "Volume"]
+    assert schema.parse_row(rows[0]) == ("Alpha", 1200.5, None, "https://x/a")
+    # An unparsable cell in a numeric column is read as missing
+    assert schema.parse_row(rows[1])[1] is None
+
+
+def test_mostly_text_column_stays_text():
+    rows = [["Alpha", "12", "", ""], ["Beta", "n/a", "", ""], ["Gamma", "high", "", ""]]
+    schema = StockSchema.infer(HEADER, rows)
+    assert not schema.numeric
+    assert schema.parse_row(["Alpha"]) == ("Alpha", "", "", "")
@@ -0,0 +1,83 @@
+import pytest
+
+from models.compact_trie import CompactTrie
+from models.market_diff import ChangeEvent
+from services.stock_service_impl import StockServiceImpl
+
+HEADER = ["Name", "Symbol", "LTP", "Volume"]
+ROWS = [
+    ["HDFC Bank Ltd", "HDFCBANK", "1500.00", "900"],
+    ["ICICI Bank Ltd", "ICICIBANK", "1000.00", "800"],
+    ["Tata Motors Ltd", "TATAMOTORS", "900.00", "700"],
+    ["Tata Steel Ltd", "TATASTEEL", "150.00", "600"],
+]
+
+
+@pytest.fixture
+def service(tmp_path):
+    svc = StockServiceImpl(assets_dir=str(tmp_path))
+    svc.load_rows(HEADER, ROWS)
+    return svc
+
+
+def test_resolve_exact(service):
+    assert service.resolve_exact("HDFC  Bank Ltd") == "hdfc bank ltd"
+    assert service.resolve_exact("hdfc bank") == "hdfc bank ltd"
+    assert service.resolve_exact("tatasteel") == "tata steel ltd"
+    assert service.resolve_exact("tata") is None
+    assert service.resolve_exact("") is None
+
+
+def test_find_matches_prefix_and_fuzzy(service):
+    assert [s.name for s in service.find_matches("tata")] == [
+        "Tata Motors Ltd",
+        "Tata Steel Ltd",
+    ]
+    assert [s.name for s in service.find_matches("bank", limit=1)] == ["HDFC Bank Ltd"]
+    assert service.find_matches("tata motrs", limit=1)[0].name == "Tata Motors Ltd"
+    assert service.find_matches("") == []
+
+
+def test_screen(service):
+    stocks = service.screen(["LTP between 500 and 1200"], sort_by="Volume")
+    assert [s.name for s in stocks] == ["ICICI Bank Ltd", "Tata Motors Ltd"]
+
+
+def test_reload_publishes_change_events(service):
+    received = []
+    service.subscribe(received.append)
+    version = service.snapshot.version
+    rows = [
+        ["HDFC Bank Ltd", "HDFCBANK", "1560.00", "900"],  # +4%
+        ["ICICI Bank Ltd", "ICICIBANK", "1010.00", "800"],  # +1%
+        ["Tata Motors Ltd", "TATAMOTORS", "900.00", "700"],
+        ["Axis Bank Ltd", "AXISBANK", "1100.00", "500"],
+    ]
+    service.load_rows(HEADER, rows)
+
+    assert len(received) == 1
+    events = {(e.kind, e.name): e for e in received[0]}
+    assert set(events) == {
+        (ChangeEvent.LISTED, "axis bank ltd"),
+        (ChangeEvent.DELISTED, "tata steel ltd"),
+        (ChangeEvent.PRICE_MOVE, "hdfc bank ltd"),
+    }
+    move = events[(ChangeEvent.PRICE_MOVE, "hdfc bank ltd")]
+    assert (move.old_price, move.new_price) == (1500.0, 1560.0)
+    assert move.pct_change == pytest.approx(4.0)
+    assert all(e.version == version + 1 for e in received[0])
+
+    snap = service.snapshot
+    assert isinstance(snap.trie, CompactTrie)
+    assert snap.trie.autocomplete("tata") == ["tata motors ltd"]
+    assert "axis bank ltd" in snap.search_index.search("axis")
+    assert service.resolve_exact("tatasteel") is None
+
+
+def test_price_moves_accumulate_from_the_last_report(service):
+    received = []
+    service.subscribe(received.append)
+    for price in ("1515.00", "1530.00"):  # +1%, then +2% from the first load
+        service.load_rows(HEADER, [["HDFC Bank Ltd", "HDFCBANK", price, "900"]] + ROWS[1:])
+    moves = [e for batch in received for e in batch if e.kind == ChangeEvent.PRICE_MOVE]
+    assert [(e.old_price, e.new_price) for e in moves] == [(1500.0, 1530.0)]
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from services.scraper.moneycontrol_scraper import MoneyControlScraper
+from services.scraper.streaming_table_parser import StreamingTableParser
+
+BASE_URL = "https://www.moneycontrol.com/markets/indian-indices/"
+FIXTURE = os.path.join(
+    os.path.dirname(__file__), "..", "benchmarks", "fixtures", "moneycontrol_table.html"
+)
+
+EDGE_CASES = b"""<html><body>
+<table><thead><tr><th>Company <b>Name</b></th><th>LTP</th><th> </th><th>Volume</th></tr></thead>
+<tbody>
+<tr><td><a href="/india/stockpricequote/a/A01"><b>Alpha</b> Ltd</a> NSE</td><td>1,234.50</td><td></td><td>-</td></tr>
+<tr><td>No Link Corp</td><td> 12 </td><td><span>x</span></td><td></td></tr>
+<tr><td><a href="https://other.example/b">Beta</a></td><td>5</td><td>1</td><td>2</td></tr>
+</tbody></table>
+<table><tbody><tr><td>Second table</td></tr></tbody></table>
+</body></html>"""
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def reference(html):
+    return MoneyControlScraper(url=BASE_URL).parse_with_bs4(html)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 4096, MoneyControlScraper.CHUNK_SIZE])
+def test_streaming_parser_matches_bs4_on_the_fixture(chunk_size):
+    with open(FIXTURE, "rb") as f:
+        html = f.read()
+    expected = reference(html)
+    actual = list(StreamingTableParser(BASE_URL).iter_rows(chunked(html, chunk_size)))
+    assert len(actual) > 1
+    assert actual[0][-1] == "URL"
+    assert actual == expected
+
+
+@pytest.mark.parametrize("chunk_size", [5, 64, len(EDGE_CASES)])
+def test_streaming_parser_matches_bs4_on_edge_cases(chunk_size):
+    expected = reference(EDGE_CASES)
+    actual = list(StreamingTableParser(BASE_URL).iter_rows(chunked(EDGE_CASES, chunk_size)))
+    assert actual == expected
+    assert actual[0] == ["CompanyName", "LTP", "", "Volume", "URL"]
+    assert actual[1] == [
+        "AlphaLtd", "1,234.50", "", "-",
+        "https://www.moneycontrol.com/india/stockpricequote/a/A01",
+    ]
+    assert actual[2] == ["No Link Corp", "12", "x", "", ""]
+
+
+def test_page_without_a_table():
+    html = b"<html><body><p>maintenance</p></body></html>"
+    assert StreamingTableParser(BASE_URL).parse(html) == reference(html) == []
@@ -0,0 +1,78 @@
+import math
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from services.tick_store import TickStore
+
+HEADER = ["Name", "LTP", "Volume"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TickStore(str(tmp_path / "ticks"))
+    yield store
+    store.close()
+
+
+def at(store, day, hour, minute=0):
+    return datetime(day.year, day.month, day.day, hour, tzinfo=store.tz).timestamp() + minute * 60
+
+
+def test_bad_cells_do_not_drop_the_refresh(store):
+    day = date(2024, 5, 6)
+    rows = [["A", "100", "10"], ["B", "n/a", "5"], ["C", "12,0.5", "x"], ["D", "7"], [""]]
+    assert store.append(HEADER, rows, timestamp=at(store, day, 10)) == 3
+    a = store.ticks("a", at(store, day, 0), at(store, day, 23))
+    assert (a["price"][0], a["volume"][0]) == (100.0, 10.0)
+    c = store.ticks("C", at(store, day, 0), at(store, day, 23))
+    assert c["price"][0] == 120.5 and math.isnan(c["volume"][0])
+    d = store.ticks("d", at(store, day, 0), at(store, day, 23))
+    assert d["price"][0] == 7.0 and math.isnan(d["volume"][0])
+    assert len(store.ticks("b", at(store, day, 0), at(store, day, 23))) == 0
+
+
+def test_missing_columns_are_rejected(store):
+    with pytest.raises(ValueError):
+        store.append(["Name", "Volume"], [["A", "1"]])
+
+
+def test_ohlc_and_change(store):
+    day = date(2024, 5, 6)
+    for minute, price, volume in [(0, 100, 10), (20, 110, 30), (40, 90, 35), (70, 95, 50)]:
+        store.append(HEADER, [["A", str(price), str(volume)]], timestamp=at(store, day, 10, minute))
+    start = at(store, day, 10)
+    bars = store.ohlc("a", start, at(store, day, 12), interval=3600)
+    assert [(b.open, b.high, b.low, b.close) for b in bars] == [(100, 110, 90, 90), (95, 95, 95, 95)]
+    assert [b.volume for b in bars] == [25.0, 15.0]
+    first, last, pct = store.change("a", start, at(store, day, 12))
+    assert (first, last) == (100.0, 95.0) and pct == pytest.approx(-5.0)
+    assert store.change("zz", start) is None
+
+
+def test_finished_days_are_compacted_and_still_queryable(tmp_path):
+    root = str(tmp_path / "ticks")
+    store = TickStore(root)
+    day1 = date(2024, 5, 6)
+    day2 = day1 + timedelta(days=1)
+    for hour in (10, 11):
+        store.append(HEADER, [["A", str(hour), "1"], ["B", "5", "1"]], timestamp=at(store, day1, hour))
+    store.append(HEADER, [["A", "20", "1"]], timestamp=at(store, day2, 10))
+    store.pending_compaction.result(timeout=10)
+    store.close()
+
+    day_dir = tmp_path / "ticks" / day1.isoformat()
+    assert (day_dir / "ticks.z").exists() and not (day_dir / "ticks.log").exists()
+
+    reopened = TickStore(root)
+    try:
+        reopened.append(HEADER, [["B", "6", "2"]], timestamp=at(reopened, day2, 11))
+        a = reopened.ticks("a", at(reopened, day1, 0), at(reopened, day2, 23))
+        assert a["price"].tolist() == [10.0, 11.0, 20.0]
+        assert np.all(np.diff(a["ts"]) > 0)
+        b = reopened.ticks("b", at(reopened, day1, 0), at(reopened, day2, 23))
+        assert b["price"].tolist() == [5.0, 5.0, 6.0]
+        assert reopened.days() == [day1, day2]
+    finally:
+        reopened.close()